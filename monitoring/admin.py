@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProductType, Store, Product, BeerProduct
+from .models import ProductType, Store, Product, BeerProduct, AlertRule, AlertEvent
 
 
 @admin.register(ProductType)
@@ -28,3 +28,20 @@ class ProductAdmin(admin.ModelAdmin):
 @admin.register(BeerProduct)
 class BeerProductAdmin(ProductAdmin):
     pass
+
+
+@admin.register(AlertRule)
+class AlertRuleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'threshold', 'product', 'product_type', 'store', 'is_active')
+    list_filter = ('kind', 'is_active')
+    search_fields = ('name',)
+    raw_id_fields = ('product',)
+    list_select_related = ('product', 'product_type', 'store')
+
+
+@admin.register(AlertEvent)
+class AlertEventAdmin(admin.ModelAdmin):
+    list_display = ('rule', 'product', 'store', 'previous_value', 'value', 'threshold', 'created_at', 'delivered_at')
+    list_filter = ('rule__kind', 'delivered_at')
+    raw_id_fields = ('product',)
+    list_select_related = ('rule', 'product', 'store')
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Q
+
+from monitoring.analytics.summaries import SummaryDelta
+from monitoring.changes import ProductState
+from monitoring.models import AlertEvent, AlertRule, StoreSummary
+
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+# ("product", id), ("product_type", id), ("store", id) або ("all", None)
+ScopeKey = Tuple[str, Optional[int]]
+ALL_SCOPE: ScopeKey = ("all", None)
+
+
+def shelf_price(state: ProductState) -> Decimal:
+    return state.regular_price if state.promo_price is None else state.promo_price
+
+
+def _scope_key(product_id, product_type_id, store_id) -> ScopeKey:
+    if product_id is not None:
+        return "product", product_id
+    if product_type_id is not None:
+        return "product_type", product_type_id
+    if store_id is not None:
+        return "store", store_id
+    return ALL_SCOPE
+
+
+class ThresholdIndex:
+    """Пороги правил, відсортовані в межах кожного scope: перетин шукається бінарно."""
+
+    def __init__(self, rules: Iterable[Tuple[int, ScopeKey, Decimal]]) -> None:
+        grouped: Dict[ScopeKey, List[Tuple[Decimal, int]]] = defaultdict(list)
+        for rule_id, scope, threshold in rules:
+            grouped[scope].append((threshold, rule_id))
+        self.thresholds: Dict[ScopeKey, List[Decimal]] = {}
+        self.rule_ids: Dict[ScopeKey, List[int]] = {}
+        for scope, entries in grouped.items():
+            entries.sort()
+            self.thresholds[scope] = [threshold for threshold, _ in entries]
+            self.rule_ids[scope] = [rule_id for _, rule_id in entries]
+
+    def crossed(self, scopes: Iterable[ScopeKey], low: Decimal, high: Decimal) -> Iterable[Tuple[int, Decimal]]:
+        # Правила з low < threshold <= high
+        for scope in scopes:
+            thresholds = self.thresholds.get(scope)
+            if not thresholds:
+                continue
+            start, end = bisect_right(thresholds, low), bisect_right(thresholds, high)
+            for position in range(start, end):
+                yield self.rule_ids[scope][position], thresholds[position]
+
+
+def _load_rules(kind: str, scope: Q) -> ThresholdIndex:
+    rows = AlertRule.objects.filter(is_active=True, kind=kind).filter(
+        scope | Q(product__isnull=True, product_type__isnull=True, store__isnull=True)
+    ).values_list("id", "product_id", "product_type_id", "store_id", "threshold")
+    return ThresholdIndex(
+        (rule_id, _scope_key(product_id, product_type_id, store_id), threshold)
+        for rule_id, product_id, product_type_id, store_id, threshold in rows
+    )
+
+
+class AlertDelta:
+    """Перевіряє пачку змін продуктів на правила сповіщень і пише спрацювання в outbox.
+
+    Правила вибираються лише для продуктів, типів і магазинів з пачки, тож ціна
+    пропорційна кількості змін, а не правилам × продуктам. Має йти після SummaryDelta:
+    нові середні знижки магазинів читаються з уже оновлених StoreSummary.
+    """
+
+    def __init__(self) -> None:
+        # (новий стан, ціна до, ціна після) для продуктів, що подешевшали
+        self.price_drops: List[Tuple[ProductState, Decimal, Decimal]] = []
+        # Лише накопичує дельти магазинів, щоб відновити середню знижку до пачки
+        self.store_totals = SummaryDelta()
+
+    def add_change(self, old_state: Optional[ProductState], new_state: Optional[ProductState]) -> None:
+        if old_state is not None and new_state is not None and new_state.is_active:
+            before, after = shelf_price(old_state), shelf_price(new_state)
+            if after < before:
+                self.price_drops.append((new_state, before, after))
+        self.store_totals.add_change(old_state, new_state)
+
+    def flush(self) -> None:
+        events = self._price_events() + self._store_events()
+        self.price_drops = []
+        self.store_totals = SummaryDelta()
+        if events:
+            AlertEvent.objects.bulk_create(events, batch_size=1000)
+            logger.info(f"{len(events)} price alerts fired")
+
+    def _price_events(self) -> List[AlertEvent]:
+        if not self.price_drops:
+            return []
+        states = [state for state, _, _ in self.price_drops]
+        index = _load_rules(AlertRule.KIND_PRICE_BELOW, (
+            Q(product_id__in={state.id for state in states})
+            | Q(product_type_id__in={state.product_type_id for state in states})
+            | Q(store_id__in={state.store_id for state in states})
+        ))
+
+        events = []
+        for state, before, after in self.price_drops:
+            scopes = (
+                ("product", state.id), ("product_type", state.product_type_id), ("store", state.store_id), ALL_SCOPE,
+            )
+            for rule_id, threshold in index.crossed(scopes, after, before):
+                events.append(AlertEvent(
+                    rule_id=rule_id, product_id=state.id, store_id=state.store_id,
+                    previous_value=before, value=after, threshold=threshold,
+                ))
+        return events
+
+    def _store_events(self) -> List[AlertEvent]:
+        deltas = {
+            store_id: delta for store_id, delta in self.store_totals.stores.items()
+            if delta.get("promo_count") or delta.get("sum_discount_percent")
+        }
+        if not deltas:
+            return []
+
+        risen: Dict[int, Tuple[Decimal, Decimal]] = {}
+        summaries = StoreSummary.objects.filter(store_id__in=list(deltas)).values_list(
+            "store_id", "promo_count", "sum_discount_percent"
+        )
+        for store_id, promo_count, sum_discount_percent in summaries:
+            delta = deltas[store_id]
+            before = _average(
+                sum_discount_percent - delta.get("sum_discount_percent", 0), promo_count - delta.get("promo_count", 0)
+            )
+            after = _average(sum_discount_percent, promo_count)
+            if after > before:
+                risen[store_id] = (before, after)
+        if not risen:
+            return []
+
+        index = _load_rules(AlertRule.KIND_STORE_DISCOUNT_ABOVE, Q(store_id__in=list(risen)))
+        return [
+            AlertEvent(rule_id=rule_id, store_id=store_id, previous_value=before, value=after, threshold=threshold)
+            for store_id, (before, after) in risen.items()
+            for rule_id, threshold in index.crossed((("store", store_id), ALL_SCOPE), before, after)
+        ]
+
+
+def _average(total: float, count: int) -> Decimal:
+    if count <= 0:
+        return Decimal(0)
+    return Decimal(total / count).quantize(CENT)
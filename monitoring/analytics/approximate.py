@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from monitoring.analytics.filters import NO_FILTERS, AnalyticsFilters
+from monitoring.analytics.report_statistics import (
+    summarize_avg_prices,
+    summarize_price_ranges,
+    summarize_store_statistics,
+)
+from monitoring.analytics.histogram import (
+    BUCKETING_EQUAL_WIDTH,
+    BUCKETING_FIXED,
+    DEFAULT_BUCKET_COUNT,
+    PriceEdges,
+    bucket_labels,
+    data_driven_edges,
+    edges_for_type,
+    histogram_rows,
+    kopecks_to_edges,
+    quantile_fractions,
+    validate_bucketing,
+)
+from monitoring.analytics.sketches import (
+    DEFAULT_KLL_K,
+    HyperLogLog,
+    KLLSketch,
+    ReservoirSample,
+    kll_rank_error,
+)
+from monitoring.changes import get_data_version
+from monitoring.models import Product, ProductType, Store
+from monitoring.prices import KOPECKS_PER_UAH, to_kopecks
+
+
+logger = logging.getLogger(__name__)
+
+# Листок: (тип продукту, місто, магазин активний); зрізи за типом і містом — їх об'єднання
+LeafKey = Tuple[int, str, bool]
+
+
+def _uah(kopecks: Optional[float]) -> Optional[float]:
+    return None if kopecks is None else kopecks / KOPECKS_PER_UAH
+
+
+class GroupSketch:
+    """Точні лічильники та суми плюс скетчі цін, магазинів і вибірка для однієї групи."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.regular_sum_kop = 0
+        self.promo_count = 0
+        self.promo_sum_kop = 0
+        self.prices = KLLSketch()
+        self.stores = HyperLogLog()
+        self.sample = ReservoirSample()
+
+    def update(self, regular_kop: np.ndarray, promo_kop: np.ndarray, store_ids: np.ndarray) -> None:
+        has_promo = promo_kop >= 0
+        self.count += len(regular_kop)
+        self.regular_sum_kop += int(regular_kop.sum())
+        self.promo_count += int(has_promo.sum())
+        self.promo_sum_kop += int(promo_kop[has_promo].sum())
+        self.prices.update(regular_kop)
+        self.stores.update(store_ids)
+        self.sample.update(regular_kop)
+
+    def merge(self, other: "GroupSketch") -> "GroupSketch":
+        self.count += other.count
+        self.regular_sum_kop += other.regular_sum_kop
+        self.promo_count += other.promo_count
+        self.promo_sum_kop += other.promo_sum_kop
+        self.prices.merge(other.prices)
+        self.stores.merge(other.stores)
+        self.sample.merge(other.sample)
+        return self
+
+    def price_summary(self) -> Dict[str, Any]:
+        p25, median, p75 = self.prices.quantiles([0.25, 0.5, 0.75])
+        std = self.sample.std()
+        return {
+            "p25_price": _uah(p25),
+            "median_price": _uah(median),
+            "p75_price": _uah(p75),
+            "std_price": _uah(std),
+            "stores_estimate": self.stores.estimate(),
+            "error_bounds": {
+                "quantile_rank": self.prices.rank_error,
+                "stores_relative": self.stores.relative_error,
+                "sample_mean_95": _uah(self.sample.mean_error()),
+            },
+        }
+
+
+# Скетчі зібрані лише за типом і містом — інші розрізи наближено не відтворити
+SUPPORTED_FILTERS = {
+    "get_avg_prices_by_product_type": ("product_type_ids",),
+    "get_store_statistics_by_city": ("city",),
+    "get_products_by_price_ranges": ("product_type_ids",),
+}
+
+
+def require_supported_filters(report: str, filters: AnalyticsFilters) -> None:
+    """ValueError, якщо звіт report не можна наближено відфільтрувати за filters."""
+    unsupported = filters.unsupported(*SUPPORTED_FILTERS[report])
+    if unsupported:
+        raise ValueError(f"approximate mode cannot be filtered by: {', '.join(unsupported)}")
+
+
+def _merge_groups(groups: Dict[Any, List[GroupSketch]]) -> Dict[Any, GroupSketch]:
+    merged = {}
+    for key, sketches in groups.items():
+        target = GroupSketch()
+        for sketch in sketches:
+            target.merge(sketch)
+        merged[key] = target
+    return merged
+
+
+class CatalogSketches:
+    """Скетчі активних продуктів, зібрані за один потоковий прохід по таблиці."""
+
+    def __init__(
+        self,
+        leaves: Dict[LeafKey, GroupSketch],
+        type_names: Dict[int, str],
+        city_store_counts: Dict[str, int],
+        data_version: Optional[int] = None,
+    ) -> None:
+        self.leaves = leaves
+        self.type_names = type_names
+        self.city_store_counts = city_store_counts
+        self.data_version = data_version
+        self.built_at = time.time()
+
+        by_type, by_city = defaultdict(list), defaultdict(list)
+        for (product_type_id, city, store_active), sketch in leaves.items():
+            by_type[product_type_id].append(sketch)
+            # Статистика міст, як і в ORM, враховує лише активні магазини
+            if store_active:
+                by_city[city].append(sketch)
+        self.by_product_type = _merge_groups(by_type)
+        self.by_city = _merge_groups(by_city)
+
+    @classmethod
+    def build(cls, chunk_size: int = 10000, data_version: Optional[int] = None) -> "CatalogSketches":
+        type_names = dict(ProductType.objects.values_list("id", "name"))
+        city_store_counts = {
+            row["city"]: row["store_count"]
+            for row in Store.objects.filter(is_active=True).values("city").annotate(store_count=Count("id"))
+        }
+
+        rows = Product.objects.filter(is_active=True).values_list(
+            "product_type_id", "store__city", "store__is_active", "store_id", "regular_price", "promo_price"
+        ).iterator(chunk_size=chunk_size)
+
+        leaves: Dict[LeafKey, GroupSketch] = {}
+        chunk: Dict[LeafKey, List[Tuple[int, int, int]]] = defaultdict(list)
+        buffered = 0
+        for product_type_id, city, store_active, store_id, regular_price, promo_price in rows:
+            promo_kop = -1 if promo_price is None else to_kopecks(promo_price)
+            chunk[(product_type_id, city, store_active)].append((to_kopecks(regular_price), promo_kop, store_id))
+            buffered += 1
+            if buffered >= chunk_size:
+                cls._flush_chunk(leaves, chunk)
+                buffered = 0
+        cls._flush_chunk(leaves, chunk)
+
+        sketches = cls(leaves, type_names, city_store_counts, data_version=data_version)
+        logger.info(f"Catalog sketches built: {len(leaves)} leaf groups, version {data_version}")
+        return sketches
+
+    @staticmethod
+    def _flush_chunk(leaves: Dict[LeafKey, GroupSketch], chunk: Dict[LeafKey, List[Tuple[int, int, int]]]) -> None:
+        for key, values in chunk.items():
+            columns = np.array(values, dtype=np.int64)
+            leaves.setdefault(key, GroupSketch()).update(columns[:, 0], columns[:, 1], columns[:, 2])
+        chunk.clear()
+
+
+class ApproximateAnalyticsEngine:
+    """Наближені звіти зі скетчів; кожен рядок містить межі похибки."""
+
+    _lock = threading.Lock()
+    _rebuild_lock = threading.Lock()
+    _current: Optional[CatalogSketches] = None
+
+    def __init__(self, sketches: CatalogSketches) -> None:
+        self.sketches = sketches
+
+    @classmethod
+    def current(cls) -> "ApproximateAnalyticsEngine":
+        # Скетчі перебудовуються після зміни даних, але не частіше ніж раз на
+        # ANALYTICS_SKETCH_REFRESH_SECONDS — у наближеному режимі це допустима застарілість.
+        # Перебудова йде у фоновому потоці; запити тим часом отримують попередні скетчі.
+        version = get_data_version()
+        current = cls._current
+        if current is None:
+            # Перша побудова — синхронно: віддавати ще нічого
+            with cls._lock:
+                if cls._current is None:
+                    cls._current = CatalogSketches.build(data_version=version)
+                return cls(cls._current)
+        if current.data_version != version and \
+                time.time() - current.built_at >= settings.ANALYTICS_SKETCH_REFRESH_SECONDS:
+            cls._rebuild_in_background(version)
+        return cls(current)
+
+    @classmethod
+    def _rebuild_in_background(cls, version: int) -> None:
+        if not cls._rebuild_lock.acquire(blocking=False):
+            return  # уже перебудовується
+
+        def rebuild():
+            try:
+                cls._current = CatalogSketches.build(data_version=version)
+            except Exception:
+                logger.exception("Catalog sketches rebuild failed")
+            finally:
+                cls._rebuild_lock.release()
+
+        cls._start(rebuild)
+
+    @staticmethod
+    def _start(target) -> None:
+        def run():
+            try:
+                target()
+            finally:
+                # Потік тримає власне з'єднання з БД
+                connection.close()
+
+        threading.Thread(target=run, name="sketch-rebuild", daemon=True).start()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._current = None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "data_version": self.sketches.data_version,
+            "stale": self.sketches.data_version != get_data_version(),
+            "built_at": self.sketches.built_at,
+            "quantile_rank_error": kll_rank_error(DEFAULT_KLL_K),
+            "stores_relative_error": HyperLogLog().relative_error,
+            "confidence": {"quantile_rank": 0.99, "stores_relative": 0.68, "sample_mean_95": 0.95},
+        }
+
+    def get_avg_prices_by_product_type(self, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+        require_supported_filters("get_avg_prices_by_product_type", filters)
+        result = []
+        for product_type_id, sketch in self.sketches.by_product_type.items():
+            if not sketch.count:
+                continue
+            if filters.product_type_ids is not None and product_type_id not in filters.product_type_ids:
+                continue
+            result.append({
+                "id": product_type_id,
+                "product_type_name": self.sketches.type_names.get(product_type_id),
+                "avg_regular_price": _uah(sketch.regular_sum_kop / sketch.count),
+                "avg_promo_price": _uah(sketch.promo_sum_kop / sketch.promo_count) if sketch.promo_count else None,
+                "product_count": sketch.count,
+                **sketch.price_summary(),
+            })
+        result.sort(key=lambda row: -row["avg_regular_price"])
+        return result
+
+    def get_store_statistics_by_city(self, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+        require_supported_filters("get_store_statistics_by_city", filters)
+        result = []
+        for city_name, store_count in self.sketches.city_store_counts.items():
+            if not filters.matches_city(city_name):
+                continue
+            sketch = self.sketches.by_city.get(city_name) or GroupSketch()
+            result.append({
+                "city": city_name,
+                "store_count": store_count,
+                "total_products": sketch.count,
+                "avg_price": _uah(sketch.regular_sum_kop / sketch.count) if sketch.count else None,
+                "promo_products_count": sketch.promo_count,
+                **sketch.price_summary(),
+            })
+        result.sort(key=lambda row: -row["store_count"])
+        return result
+
+    def get_products_by_price_ranges(
+        self,
+        filters: AnalyticsFilters = NO_FILTERS,
+        edges: Optional[PriceEdges] = None,
+        bucketing: str = BUCKETING_FIXED,
+        bucket_count: int = DEFAULT_BUCKET_COUNT,
+    ) -> List[Dict[str, Any]]:
+        validate_bucketing(bucketing, bucket_count)
+        require_supported_filters("get_products_by_price_ranges", filters)
+
+        counts: Dict[Tuple[str, int], int] = {}
+        labels: Dict[str, List[str]] = {}
+        count_errors: Dict[str, int] = {}
+        total = 0
+        for product_type_id, sketch in self.sketches.by_product_type.items():
+            if not sketch.count:
+                continue
+            # Відсоток — від усіх продуктів, як і в точному звіті
+            total += sketch.count
+            if filters.product_type_ids is not None and product_type_id not in filters.product_type_ids:
+                continue
+            product_type_name = self.sketches.type_names.get(product_type_id)
+            prices = sketch.prices
+
+            if bucketing == BUCKETING_FIXED:
+                type_edges = edges_for_type(edges, product_type_name)
+            elif bucketing == BUCKETING_EQUAL_WIDTH:
+                type_edges = data_driven_edges(np.array([prices.min_value, prices.max_value]), bucketing, bucket_count)
+            else:
+                type_edges = kopecks_to_edges(prices.quantiles(quantile_fractions(bucket_count)))
+
+            # Кожен збережений елемент KLL представляє weight вихідних значень
+            values, weights = prices.weighted_items()
+            edges_kop = np.array([to_kopecks(edge) for edge in type_edges], dtype=np.float64)
+            buckets = np.bincount(
+                np.searchsorted(edges_kop, values, side="right"), weights=weights, minlength=len(type_edges) + 1
+            )
+
+            labels[product_type_name] = bucket_labels(type_edges)
+            count_errors[product_type_name] = math.ceil(2 * prices.rank_error * sketch.count)
+            for bucket in np.flatnonzero(buckets):
+                counts[(product_type_name, int(bucket))] = int(round(buckets[bucket]))
+
+        result = histogram_rows(counts, labels, total)
+        for row in result:
+            row["count_error"] = count_errors[row["product_type_name"]]
+        return result
+
+    def get_avg_prices_by_product_type_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_avg_prices(self.get_avg_prices_by_product_type(**kwargs))
+
+    def get_store_statistics_by_city_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_store_statistics(self.get_store_statistics_by_city(**kwargs))
+
+    def get_products_by_price_ranges_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_price_ranges(self.get_products_by_price_ranges(**kwargs))
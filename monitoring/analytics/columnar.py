@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from monitoring.analytics.histogram import (
+    BUCKETING_FIXED,
+    DEFAULT_BUCKET_COUNT,
+    PriceEdges,
+    build_price_histogram,
+)
+from monitoring.analytics.filters import NO_FILTERS, AnalyticsFilters, day_bounds
+from monitoring.analytics.report_statistics import ReportStatisticsMixin
+from monitoring.changes import get_data_version
+from monitoring.models import Product, ProductType, Store
+from monitoring.prices import from_kopecks, to_kopecks
+
+
+logger = logging.getLogger(__name__)
+
+NO_PROMO = -1
+
+
+def _store_mask(snapshot: "ColumnarProductSnapshot", filters: AnalyticsFilters) -> np.ndarray:
+    mask = np.ones(len(snapshot.store_ids), dtype=bool)
+    if filters.city is not None:
+        city_matches = np.array([filters.matches_city(name) for name in snapshot.city_names], dtype=bool)
+        mask &= city_matches[snapshot.store_city_codes]
+    if filters.store_ids is not None:
+        mask &= np.isin(np.array(snapshot.store_ids, dtype=np.int64), filters.store_ids)
+    return mask
+
+
+def _product_mask(
+    snapshot: "ColumnarProductSnapshot", filters: AnalyticsFilters, with_store: bool = True
+) -> np.ndarray:
+    mask = np.ones(len(snapshot), dtype=bool)
+    if filters.is_empty:
+        return mask
+    if with_store and filters.has_store_filters:
+        mask &= _store_mask(snapshot, filters)[snapshot.store_codes]
+    if filters.product_type_ids is not None:
+        type_ids = set(filters.product_type_ids)
+        mask &= np.isin(snapshot.type_codes, [code for code, type_id in enumerate(snapshot.type_ids) if type_id in type_ids])
+    if filters.min_price is not None:
+        mask &= snapshot.regular_kop >= to_kopecks(filters.min_price)
+    if filters.max_price is not None:
+        mask &= snapshot.regular_kop <= to_kopecks(filters.max_price)
+    start, end = day_bounds(filters.date_from, filters.date_to)
+    if start is not None:
+        mask &= snapshot.created_at >= int(start.timestamp())
+    if end is not None:
+        mask &= snapshot.created_at < int(end.timestamp())
+    return mask
+
+
+def _month_starts(first: int, last: int) -> List[datetime]:
+    # Початки місяців у поточному поясі від місяця first до місяця last (секунди epoch)
+    current_timezone = timezone.get_current_timezone()
+    start = datetime.fromtimestamp(first, current_timezone)
+    year, month = start.year, start.month
+    months = []
+    while True:
+        month_start = timezone.make_aware(datetime(year, month, 1), current_timezone)
+        if month_start.timestamp() > last:
+            return months
+        months.append(month_start)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class ColumnarProductSnapshot:
+    """Активні продукти у вигляді компактних NumPy-колонок.
+
+    Ціни зберігаються в копійках (int64), магазин/тип/місто — щільними
+    int-кодами, created_at — секундами epoch.
+    """
+
+    def __init__(
+        self,
+        product_ids: np.ndarray,
+        regular_kop: np.ndarray,
+        promo_kop: np.ndarray,
+        created_at: np.ndarray,
+        type_codes: np.ndarray,
+        store_codes: np.ndarray,
+        type_ids: List[int],
+        type_names: List[str],
+        store_ids: List[int],
+        store_names: List[str],
+        store_city_codes: np.ndarray,
+        store_active: np.ndarray,
+        city_names: List[str],
+        data_version: Optional[int] = None,
+    ) -> None:
+        self.product_ids = product_ids
+        self.regular_kop = regular_kop
+        self.promo_kop = promo_kop
+        self.created_at = created_at
+        self.type_codes = type_codes
+        self.store_codes = store_codes
+        self.type_ids = type_ids
+        self.type_names = type_names
+        self.store_ids = store_ids
+        self.store_names = store_names
+        self.store_city_codes = store_city_codes
+        self.store_active = store_active
+        self.city_names = city_names
+        self.data_version = data_version
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes for column in (
+                self.product_ids, self.regular_kop, self.promo_kop,
+                self.created_at, self.type_codes, self.store_codes,
+            )
+        )
+
+    @classmethod
+    def load(cls, chunk_size: int = 10000, data_version: Optional[int] = None) -> "ColumnarProductSnapshot":
+        type_ids, type_names = [], []
+        for type_id, name in ProductType.objects.values_list("id", "name").order_by("id"):
+            type_ids.append(type_id)
+            type_names.append(name)
+        type_index = {type_id: code for code, type_id in enumerate(type_ids)}
+
+        store_ids, store_names, store_cities, store_active = [], [], [], []
+        city_names: List[str] = []
+        city_index: Dict[str, int] = {}
+        for store_id, name, city, is_active in Store.objects.values_list("id", "name", "city", "is_active").order_by("id"):
+            store_ids.append(store_id)
+            store_names.append(name)
+            store_active.append(is_active)
+            if city not in city_index:
+                city_index[city] = len(city_names)
+                city_names.append(city)
+            store_cities.append(city_index[city])
+        store_index = {store_id: code for code, store_id in enumerate(store_ids)}
+
+        count = Product.objects.filter(is_active=True).count()
+        product_ids = np.empty(count, dtype=np.int64)
+        regular_kop = np.empty(count, dtype=np.int64)
+        promo_kop = np.empty(count, dtype=np.int64)
+        created_at = np.empty(count, dtype=np.int64)
+        type_codes = np.empty(count, dtype=np.int32)
+        store_codes = np.empty(count, dtype=np.int32)
+
+        rows = Product.objects.filter(is_active=True).values_list(
+            "id", "regular_price", "promo_price", "created_at", "product_type_id", "store_id"
+        ).order_by("id").iterator(chunk_size=chunk_size)
+
+        position = 0
+        for product_id, regular_price, promo_price, created, product_type_id, store_id in rows:
+            # Продукти, додані між count() та скануванням, підуть у наступний знімок
+            if position >= count:
+                break
+            product_ids[position] = product_id
+            regular_kop[position] = to_kopecks(regular_price)
+            promo_kop[position] = NO_PROMO if promo_price is None else to_kopecks(promo_price)
+            created_at[position] = int(created.timestamp())
+            type_codes[position] = type_index[product_type_id]
+            store_codes[position] = store_index[store_id]
+            position += 1
+
+        snapshot = cls(
+            product_ids=product_ids[:position],
+            regular_kop=regular_kop[:position],
+            promo_kop=promo_kop[:position],
+            created_at=created_at[:position],
+            type_codes=type_codes[:position],
+            store_codes=store_codes[:position],
+            type_ids=type_ids,
+            type_names=type_names,
+            store_ids=store_ids,
+            store_names=store_names,
+            store_city_codes=np.array(store_cities, dtype=np.int32),
+            store_active=np.array(store_active, dtype=bool),
+            city_names=city_names,
+            data_version=data_version,
+        )
+        logger.info(f"Columnar snapshot loaded: {len(snapshot)} products, {snapshot.nbytes} bytes")
+        return snapshot
+
+
+class ColumnarAnalyticsEngine(ReportStatisticsMixin):
+    """Векторизовані аналоги шести звітів AnalyticsRepository; підсумки рахуються з їхніх рядків."""
+
+    _lock = threading.Lock()
+    _current: Optional[ColumnarProductSnapshot] = None
+
+    def __init__(self, snapshot: ColumnarProductSnapshot) -> None:
+        self.snapshot = snapshot
+
+    @classmethod
+    def current(cls) -> "ColumnarAnalyticsEngine":
+        # Знімок перебудовується після зміни версії даних, але не частіше ніж раз на
+        # ANALYTICS_COLUMNAR_REFRESH_SECONDS. Сканує один потік; решта тим часом
+        # отримують попередній знімок і не чекають на блокування.
+        version = get_data_version()
+        current = cls._current
+        if current is not None and not cls._is_due(current, version):
+            return cls(current)
+        if not cls._lock.acquire(blocking=current is None):
+            return cls(current)
+        try:
+            current = cls._current
+            if current is None or cls._is_due(current, version):
+                current = cls._current = ColumnarProductSnapshot.load(data_version=version)
+        finally:
+            cls._lock.release()
+        return cls(current)
+
+    @staticmethod
+    def _is_due(snapshot: ColumnarProductSnapshot, version: int) -> bool:
+        return snapshot.data_version != version and \
+            time.time() - snapshot.loaded_at >= settings.ANALYTICS_COLUMNAR_REFRESH_SECONDS
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._current = None
+
+    def get_avg_prices_by_product_type(self, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        type_count = len(snapshot.type_ids)
+        mask = _product_mask(snapshot, filters)
+        type_codes = snapshot.type_codes[mask]
+        regular_kop = snapshot.regular_kop[mask]
+        promo_kop = snapshot.promo_kop[mask]
+        has_promo = promo_kop != NO_PROMO
+
+        counts = np.bincount(type_codes, minlength=type_count)
+        regular_sums = np.bincount(type_codes, weights=regular_kop, minlength=type_count)
+        promo_counts = np.bincount(type_codes[has_promo], minlength=type_count)
+        promo_sums = np.bincount(type_codes[has_promo], weights=promo_kop[has_promo], minlength=type_count)
+
+        codes = np.flatnonzero(counts)
+        avg_regular = regular_sums[codes] / counts[codes] / 100.0
+        codes = codes[np.argsort(-avg_regular, kind="stable")]
+
+        return [
+            {
+                "id": snapshot.type_ids[code],
+                "product_type_name": snapshot.type_names[code],
+                "avg_regular_price": float(regular_sums[code] / counts[code] / 100.0),
+                "avg_promo_price": float(promo_sums[code] / promo_counts[code] / 100.0) if promo_counts[code] else None,
+                "product_count": int(counts[code]),
+            }
+            for code in codes
+        ]
+
+    def get_store_statistics_by_city(self, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        city_count = len(snapshot.city_names)
+        has_promo = snapshot.promo_kop != NO_PROMO
+
+        # Фільтри магазину звужують і магазини, і продукти; фільтри продукту — лише продукти
+        stores = snapshot.store_active & _store_mask(snapshot, filters)
+        store_counts = np.bincount(snapshot.store_city_codes[stores], minlength=city_count)
+
+        in_store = stores[snapshot.store_codes] & _product_mask(snapshot, filters, with_store=False)
+        product_cities = snapshot.store_city_codes[snapshot.store_codes][in_store]
+        product_counts = np.bincount(product_cities, minlength=city_count)
+        price_sums = np.bincount(product_cities, weights=snapshot.regular_kop[in_store], minlength=city_count)
+        promo_counts = np.bincount(product_cities[has_promo[in_store]], minlength=city_count)
+
+        codes = np.flatnonzero(store_counts)
+        codes = codes[np.argsort(-store_counts[codes], kind="stable")]
+
+        return [
+            {
+                "city": snapshot.city_names[code],
+                "store_count": int(store_counts[code]),
+                "total_products": int(product_counts[code]),
+                "avg_price": float(price_sums[code] / product_counts[code] / 100.0) if product_counts[code] else None,
+                "promo_products_count": int(promo_counts[code]),
+            }
+            for code in codes
+        ]
+
+    def get_top_expensive_products(
+        self,
+        limit: int = 10,
+        filters: AnalyticsFilters = NO_FILTERS,
+        after: Optional[Tuple[Decimal, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        mask = _product_mask(snapshot, filters)
+        if after is not None:
+            after_kop, after_id = to_kopecks(after[0]), int(after[1])
+            mask &= (snapshot.regular_kop < after_kop) | (
+                (snapshot.regular_kop == after_kop) & (snapshot.product_ids > after_id)
+            )
+
+        positions = np.flatnonzero(mask)
+        if limit <= 0 or not len(positions):
+            return []
+
+        candidates = positions
+        if limit < len(positions):
+            prices = snapshot.regular_kop[positions]
+            threshold = np.partition(prices, len(prices) - limit)[len(prices) - limit]
+            above = positions[prices > threshold]
+            # На межі з однаковими цінами беремо менші id
+            ties = positions[prices == threshold]
+            ties = ties[np.argsort(snapshot.product_ids[ties], kind="stable")][:limit - len(above)]
+            candidates = np.concatenate([above, ties])
+        order = candidates[np.lexsort((snapshot.product_ids[candidates], -snapshot.regular_kop[candidates]))]
+
+        details = Product.objects.in_bulk(snapshot.product_ids[order].tolist())
+        result = []
+        for position in order:
+            product = details.get(int(snapshot.product_ids[position]))
+            regular_kop = int(snapshot.regular_kop[position])
+            promo_kop = int(snapshot.promo_kop[position])
+            store_code = snapshot.store_codes[position]
+            result.append({
+                "product_id": int(snapshot.product_ids[position]),
+                "product_name": product.name if product else None,
+                "sku": product.sku if product else None,
+                "regular_price": from_kopecks(regular_kop),
+                "promo_price": from_kopecks(promo_kop) if promo_kop != NO_PROMO else None,
+                "discount": from_kopecks(regular_kop - promo_kop) if promo_kop != NO_PROMO else from_kopecks(0),
+                "store_name": snapshot.store_names[store_code],
+                "city": snapshot.city_names[snapshot.store_city_codes[store_code]],
+                "product_type_name": snapshot.type_names[snapshot.type_codes[position]],
+            })
+        return result
+
+    def get_products_by_price_ranges(
+        self,
+        filters: AnalyticsFilters = NO_FILTERS,
+        edges: Optional[PriceEdges] = None,
+        bucketing: str = BUCKETING_FIXED,
+        bucket_count: int = DEFAULT_BUCKET_COUNT,
+    ) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        mask = _product_mask(snapshot, filters)
+        if not mask.any():
+            return []
+
+        return build_price_histogram(
+            snapshot.type_names,
+            snapshot.type_codes[mask],
+            snapshot.regular_kop[mask],
+            edges=edges,
+            bucketing=bucketing,
+            bucket_count=bucket_count,
+            total=len(snapshot),
+        )
+
+    def get_promo_analysis_by_store(
+        self, filters: AnalyticsFilters = NO_FILTERS, min_promo_products: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        store_count = len(snapshot.store_ids)
+
+        mask = (snapshot.promo_kop != NO_PROMO) & snapshot.store_active[snapshot.store_codes]
+        mask &= _product_mask(snapshot, filters)
+        store_codes = snapshot.store_codes[mask]
+        discounts = (snapshot.regular_kop[mask] - snapshot.promo_kop[mask]).astype(np.float64)
+        discount_percents = discounts * 100.0 / snapshot.regular_kop[mask]
+
+        promo_counts = np.bincount(store_codes, minlength=store_count)
+        discount_sums = np.bincount(store_codes, weights=discounts, minlength=store_count)
+        percent_sums = np.bincount(store_codes, weights=discount_percents, minlength=store_count)
+
+        codes = np.flatnonzero(promo_counts)
+        if min_promo_products:
+            codes = codes[promo_counts[codes] >= min_promo_products]
+        codes = codes[np.argsort(-promo_counts[codes], kind="stable")]
+
+        return [
+            {
+                "id": snapshot.store_ids[code],
+                "store_name": snapshot.store_names[code],
+                "city": snapshot.city_names[snapshot.store_city_codes[code]],
+                "promo_products": int(promo_counts[code]),
+                "avg_discount_percent": float(percent_sums[code] / promo_counts[code]),
+                "total_savings": float(discount_sums[code] / 100.0),
+            }
+            for code in codes
+        ]
+
+    def get_product_creation_dynamics(self, filters: AnalyticsFilters = NO_FILTERS) -> List[Dict[str, Any]]:
+        snapshot = self.snapshot
+        now = timezone.now()
+
+        mask = _product_mask(snapshot, filters)
+        if filters.date_from is None and filters.date_to is None:
+            mask &= snapshot.created_at >= int((now - timedelta(days=365)).timestamp())
+
+        created_at = snapshot.created_at[mask]
+        if not len(created_at):
+            return []
+
+        # Межі місяців у поточному часовому поясі Django: кожен рядок отримує зсув свого моменту (DST)
+        months = _month_starts(int(created_at.min()), int(created_at.max()))
+        bounds = np.array([int(month.timestamp()) for month in months], dtype=np.int64)
+        month_codes = np.searchsorted(bounds, created_at, side="right") - 1
+
+        type_count = len(snapshot.type_ids)
+        keys, counts = np.unique(month_codes * type_count + snapshot.type_codes[mask], return_counts=True)
+
+        result = []
+        for key, count in zip(keys, counts):
+            month_code, type_code = divmod(int(key), type_count)
+            result.append({
+                "month": months[month_code],
+                "product_type_name": snapshot.type_names[type_code],
+                "products_added": int(count),
+            })
+        result.sort(key=lambda item: (item["month"], item["product_type_name"]))
+        return result
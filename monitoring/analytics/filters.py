@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from monitoring.models import ProductType
+
+
+# Параметр запиту -> аргумент AnalyticsFilters.coerce
+QUERY_PARAMS = {
+    "city": "city",
+    "store": "store_ids",
+    "product_type": "product_type",
+    "min_price": "min_price",
+    "max_price": "max_price",
+    "date_from": "date_from",
+    "date_to": "date_to",
+}
+
+
+def _parse_ids(value, name: str) -> Tuple[int, ...]:
+    if isinstance(value, int):
+        return (value,)
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(",") if part.strip()]
+    try:
+        return tuple(sorted({int(item) for item in value}))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a comma-separated list of ids")
+
+
+def _parse_price(value, name: str) -> Decimal:
+    try:
+        price = value if isinstance(value, Decimal) else Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{name} must be a number")
+    if not price.is_finite() or price < 0:
+        raise ValueError(f"{name} must be a non-negative number")
+    return price
+
+
+def _parse_day(value, name: str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    return day
+
+
+def resolve_product_types(value) -> Tuple[int, ...]:
+    """Числа — id типів, решта — частини назв, які зводимо до id одним запитом до довідника."""
+    if isinstance(value, int):
+        return (value,)
+    tokens = [token.strip() for token in str(value).split(",") if token.strip()]
+    ids = {int(token) for token in tokens if token.isdigit()}
+    names = [token for token in tokens if not token.isdigit()]
+    if names:
+        name_filter = Q()
+        for name in names:
+            name_filter |= Q(name__icontains=name)
+        ids.update(ProductType.objects.filter(name_filter).values_list("id", flat=True))
+    return tuple(sorted(ids))
+
+
+def day_bounds(date_from: Optional[date], date_to: Optional[date]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    # Напіввідкритий інтервал [початок date_from, початок дня після date_to) у поточному поясі
+    start = end = None
+    if date_from is not None:
+        start = timezone.make_aware(datetime.combine(date_from, time.min))
+    if date_to is not None:
+        end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+def as_of_moment(value, name: str = "at") -> datetime:
+    # Дата — кінець цього дня у поточному поясі; час без поясу — у поточному поясі
+    try:
+        day = parse_date(value)
+        moment = None if day else parse_datetime(value)
+    except ValueError:
+        day = moment = None
+    if day is not None:
+        return day_bounds(None, day)[1] - timedelta(microseconds=1)
+    if moment is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD) or an ISO 8601 datetime")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+@dataclass(frozen=True)
+class AnalyticsFilters:
+    """Типізовані фільтри звітів; застосовуються до базових колонок до групування.
+
+    None означає «без фільтра», порожній кортеж id — «нічого не підходить».
+    """
+
+    city: Optional[str] = None
+    store_ids: Optional[Tuple[int, ...]] = None
+    product_type_ids: Optional[Tuple[int, ...]] = None
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    @classmethod
+    def coerce(
+        cls,
+        filters: Optional["AnalyticsFilters"] = None,
+        *,
+        city: Optional[str] = None,
+        store_ids=None,
+        store_id=None,
+        product_type=None,
+        product_type_ids: Optional[Iterable[int]] = None,
+        min_price=None,
+        max_price=None,
+        date_from=None,
+        date_to=None,
+    ) -> "AnalyticsFilters":
+        changes = {}
+        if city:
+            changes["city"] = city
+        if store_id not in (None, ""):
+            store_ids = store_id
+        if store_ids not in (None, ""):
+            changes["store_ids"] = _parse_ids(store_ids, "store")
+        if product_type not in (None, ""):
+            changes["product_type_ids"] = resolve_product_types(product_type)
+        if product_type_ids is not None:
+            changes["product_type_ids"] = _parse_ids(product_type_ids, "product_type")
+        if min_price not in (None, ""):
+            changes["min_price"] = _parse_price(min_price, "min_price")
+        if max_price not in (None, ""):
+            changes["max_price"] = _parse_price(max_price, "max_price")
+        if date_from not in (None, ""):
+            changes["date_from"] = _parse_day(date_from, "date_from")
+        if date_to not in (None, ""):
+            changes["date_to"] = _parse_day(date_to, "date_to")
+
+        filters = replace(filters or NO_FILTERS, **changes)
+        if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+            raise ValueError("min_price must not exceed max_price")
+        return filters
+
+    @classmethod
+    def from_query_params(cls, params) -> "AnalyticsFilters":
+        return cls.coerce(**{argument: params.get(param) for param, argument in QUERY_PARAMS.items()})
+
+    @property
+    def is_empty(self) -> bool:
+        return self == NO_FILTERS
+
+    @property
+    def has_store_filters(self) -> bool:
+        return self.city is not None or self.store_ids is not None
+
+    @property
+    def has_product_filters(self) -> bool:
+        return any(
+            value is not None
+            for value in (self.product_type_ids, self.min_price, self.max_price, self.date_from, self.date_to)
+        )
+
+    def unsupported(self, *supported: str) -> Tuple[str, ...]:
+        return tuple(
+            name for name in self.__dataclass_fields__
+            if name not in supported and getattr(self, name) is not None
+        )
+
+    def matches_city(self, city: str) -> bool:
+        # Те саме часткове збігання без урахування регістру, що й city__icontains
+        return self.city is None or self.city.casefold() in city.casefold()
+
+    def store_q(self, prefix: str = "") -> Q:
+        condition = Q()
+        if self.city is not None:
+            condition &= Q(**{f"{prefix}city__icontains": self.city})
+        if self.store_ids is not None:
+            condition &= Q(**{f"{prefix}id__in": self.store_ids})
+        return condition
+
+    def product_q(self, prefix: str = "", with_store: bool = True) -> Q:
+        condition = Q()
+        if with_store:
+            if self.city is not None:
+                condition &= Q(**{f"{prefix}store__city__icontains": self.city})
+            if self.store_ids is not None:
+                condition &= Q(**{f"{prefix}store_id__in": self.store_ids})
+        if self.product_type_ids is not None:
+            condition &= Q(**{f"{prefix}product_type_id__in": self.product_type_ids})
+        if self.min_price is not None:
+            condition &= Q(**{f"{prefix}regular_price__gte": self.min_price})
+        if self.max_price is not None:
+            condition &= Q(**{f"{prefix}regular_price__lte": self.max_price})
+
+        # Діапазоном по самій колонці, щоб працював індекс (а не created_at__date)
+        start, end = day_bounds(self.date_from, self.date_to)
+        if start is not None:
+            condition &= Q(**{f"{prefix}created_at__gte": start})
+        if end is not None:
+            condition &= Q(**{f"{prefix}created_at__lt": end})
+        return condition
+
+
+NO_FILTERS = AnalyticsFilters()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import bisect
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from monitoring.prices import from_kopecks, to_kopecks
+
+
+BUCKETING_FIXED = "fixed"
+BUCKETING_EQUAL_WIDTH = "equal_width"
+BUCKETING_QUANTILE = "quantile"
+BUCKETINGS = (BUCKETING_FIXED, BUCKETING_EQUAL_WIDTH, BUCKETING_QUANTILE)
+
+# 0-30, 30-60, 60-100, 100+ грн
+DEFAULT_PRICE_EDGES = (Decimal(30), Decimal(60), Decimal(100))
+DEFAULT_BUCKET_COUNT = 4
+MAX_BUCKET_COUNT = 50
+
+# Межі для всіх типів або окремо для кожного типу (назва -> межі)
+PriceEdges = Union[Sequence[Any], Mapping[str, Sequence[Any]]]
+
+
+def normalize_edges(edges: Iterable[Any]) -> Tuple[Decimal, ...]:
+    try:
+        result = sorted({Decimal(str(edge)) for edge in edges})
+    except InvalidOperation:
+        raise ValueError(f"Invalid price edges: {edges}")
+    if not result:
+        raise ValueError("At least one price edge is required")
+    if result[0] <= 0:
+        raise ValueError("Price edges must be positive")
+    return tuple(result)
+
+
+def parse_edges(value: str) -> Tuple[Decimal, ...]:
+    return normalize_edges(part.strip() for part in value.split(",") if part.strip())
+
+
+def validate_bucketing(bucketing: str, bucket_count: int) -> None:
+    if bucketing not in BUCKETINGS:
+        raise ValueError(f"Unknown bucketing: {bucketing}")
+    if not 1 <= bucket_count <= MAX_BUCKET_COUNT:
+        raise ValueError(f"bucket_count must be between 1 and {MAX_BUCKET_COUNT}")
+
+
+def edges_for_type(edges: Optional[PriceEdges], product_type_name: str) -> Tuple[Decimal, ...]:
+    if edges is None:
+        return DEFAULT_PRICE_EDGES
+    if isinstance(edges, Mapping):
+        type_edges = edges.get(product_type_name)
+        return normalize_edges(type_edges) if type_edges else DEFAULT_PRICE_EDGES
+    return normalize_edges(edges)
+
+
+def _format_price(value: Decimal) -> str:
+    text = format(value.quantize(Decimal("0.01")), "f")
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def bucket_labels(edges: Sequence[Decimal]) -> List[str]:
+    bounds = [Decimal(0), *edges]
+    labels = [f"{_format_price(low)}-{_format_price(high)} грн" for low, high in zip(bounds, bounds[1:])]
+    labels.append(f"{_format_price(bounds[-1])}+ грн")
+    return labels
+
+
+def bucket_index(price: Decimal, edges: Sequence[Decimal]) -> int:
+    return bisect.bisect_right(edges, price)
+
+
+def data_driven_edges(prices_kop: np.ndarray, bucketing: str, bucket_count: int) -> Tuple[Decimal, ...]:
+    """Межі (в гривнях) за розподілом цін одного типу: рівна ширина або квантилі."""
+    if bucket_count < 2 or not len(prices_kop):
+        return ()
+
+    if bucketing == BUCKETING_EQUAL_WIDTH:
+        low, high = int(prices_kop.min()), int(prices_kop.max())
+        if low == high:
+            return ()
+        kopecks = np.linspace(low, high, bucket_count + 1)[1:-1]
+    else:
+        kopecks = np.quantile(prices_kop, quantile_fractions(bucket_count))
+
+    return kopecks_to_edges(kopecks)
+
+
+def quantile_fractions(bucket_count: int) -> np.ndarray:
+    return np.linspace(0, 1, bucket_count + 1)[1:-1]
+
+
+def kopecks_to_edges(kopecks: Iterable[float]) -> Tuple[Decimal, ...]:
+    kopecks = np.unique(np.rint(np.asarray(list(kopecks), dtype=np.float64)).astype(np.int64))
+    return tuple(from_kopecks(value) for value in kopecks if value > 0)
+
+
+def histogram_rows(
+    counts: Mapping[Tuple[str, int], int],
+    labels: Mapping[str, Sequence[str]],
+    total: int,
+) -> List[Dict[str, Any]]:
+    """counts: (тип, номер діапазону) -> кількість; percentage — від усіх врахованих продуктів."""
+    # Сортуємо за номером діапазону, а не за підписом: "100+ грн" має йти після "60-100 грн"
+    keys = sorted((key for key, count in counts.items() if count), key=lambda key: (key[1], key[0]))
+    return [
+        {
+            "bucket": bucket,
+            "price_range": labels[product_type_name][bucket],
+            "product_type_name": product_type_name,
+            "count": counts[(product_type_name, bucket)],
+            "percentage": counts[(product_type_name, bucket)] * 100.0 / total,
+        }
+        for product_type_name, bucket in keys
+    ]
+
+
+def build_price_histogram(
+    type_names: Sequence[str],
+    type_codes: np.ndarray,
+    prices_kop: np.ndarray,
+    edges: Optional[PriceEdges] = None,
+    bucketing: str = BUCKETING_FIXED,
+    bucket_count: int = DEFAULT_BUCKET_COUNT,
+    total: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Гістограма цін за один векторизований прохід по колонках.
+
+    type_codes індексують type_names, prices_kop — регулярні ціни в копійках;
+    total — база для percentage, якщо ціни вже відфільтровані.
+    """
+    validate_bucketing(bucketing, bucket_count)
+
+    counts: Dict[Tuple[str, int], int] = {}
+    labels: Dict[str, List[str]] = {}
+    order = np.argsort(type_codes, kind="stable")
+    sorted_codes = type_codes[order]
+    present_codes, starts = np.unique(sorted_codes, return_index=True)
+    ends = np.append(starts[1:], len(sorted_codes))
+
+    for type_code, start, end in zip(present_codes, starts, ends):
+        product_type_name = type_names[int(type_code)]
+        prices = prices_kop[order[start:end]]
+
+        if bucketing == BUCKETING_FIXED:
+            type_edges = edges_for_type(edges, product_type_name)
+        else:
+            type_edges = data_driven_edges(prices, bucketing, bucket_count)
+
+        edges_kop = np.array([to_kopecks(edge) for edge in type_edges], dtype=np.int64)
+        buckets = np.bincount(np.searchsorted(edges_kop, prices, side="right"), minlength=len(type_edges) + 1)
+
+        labels[product_type_name] = bucket_labels(type_edges)
+        for bucket in np.flatnonzero(buckets):
+            counts[(product_type_name, int(bucket))] = int(buckets[bucket])
+
+    return histogram_rows(counts, labels, total if total is not None else len(prices_kop))
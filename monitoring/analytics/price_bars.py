@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from monitoring.changes import bump_data_version
+from monitoring.models import PriceBar, PriceObservation
+
+from .price_history import PricePoint, latest_price_points
+
+
+logger = logging.getLogger(__name__)
+
+RESOLUTION_RAW = "raw"
+RESOLUTION_HOUR = PriceBar.RESOLUTION_HOUR
+RESOLUTION_DAY = PriceBar.RESOLUTION_DAY
+RESOLUTIONS = (RESOLUTION_RAW, RESOLUTION_HOUR, RESOLUTION_DAY)
+
+# Найдовші діапазони, для яких ще віддаємо дрібнішу роздільність
+RAW_MAX_SPAN = timedelta(days=2)
+HOURLY_MAX_SPAN = timedelta(days=62)
+
+BAR_FIELDS = (
+    "product_id", "resolution", "bucket_start",
+    "open_kop", "high_kop", "low_kop", "close_kop", "had_promo", "observation_count",
+    "close_regular_kop", "close_promo_kop",
+)
+PRODUCT_BATCH_SIZE = 500
+DELETE_BATCH_SIZE = 5000
+
+# (product_id, observed_at, регулярна, промо)
+ObservationRow = Tuple[int, datetime, int, Optional[int]]
+
+
+def effective_price(point: PricePoint) -> int:
+    # Ціна на полиці: промо, якщо діє, інакше регулярна
+    regular, promo = point
+    return regular if promo is None else promo
+
+
+def bucket_floor(moment: datetime, resolution: str) -> datetime:
+    # Межі годин і днів у поточному поясі, як і day_bounds у фільтрах
+    local = timezone.localtime(moment)
+    if resolution == RESOLUTION_HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return timezone.make_aware(datetime.combine(local.date(), time.min))
+
+
+def next_bucket(bucket_start: datetime, resolution: str) -> datetime:
+    if resolution == RESOLUTION_HOUR:
+        return bucket_start + timedelta(hours=1)
+    return timezone.make_aware(datetime.combine(timezone.localtime(bucket_start).date() + timedelta(days=1), time.min))
+
+
+@dataclass
+class Bar:
+    product_id: int
+    resolution: str
+    bucket_start: datetime
+    open_kop: int
+    high_kop: int
+    low_kop: int
+    close_kop: int
+    had_promo: bool = False
+    observation_count: int = 0
+    close_regular_kop: Optional[int] = None
+    close_promo_kop: Optional[int] = None
+
+    @classmethod
+    def opening(cls, product_id: int, resolution: str, bucket_start: datetime, point: PricePoint) -> "Bar":
+        price = effective_price(point)
+        return cls(
+            product_id, resolution, bucket_start, price, price, price, price, point[1] is not None,
+            close_regular_kop=point[0], close_promo_kop=point[1],
+        )
+
+    def add(self, point: PricePoint) -> None:
+        price = effective_price(point)
+        self.high_kop = max(self.high_kop, price)
+        self.low_kop = min(self.low_kop, price)
+        self.close_kop = price
+        self.close_regular_kop, self.close_promo_kop = point
+        self.had_promo = self.had_promo or point[1] is not None
+        self.observation_count += 1
+
+    def merge(self, other: "Bar") -> None:
+        self.high_kop = max(self.high_kop, other.high_kop)
+        self.low_kop = min(self.low_kop, other.low_kop)
+        self.close_kop = other.close_kop
+        self.close_regular_kop, self.close_promo_kop = other.close_regular_kop, other.close_promo_kop
+        self.had_promo = self.had_promo or other.had_promo
+        self.observation_count += other.observation_count
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in BAR_FIELDS}
+
+    def as_model(self) -> PriceBar:
+        return PriceBar(**{name: getattr(self, name) for name in BAR_FIELDS})
+
+
+def build_bars(
+    rows: Iterable[ObservationRow],
+    resolution: str,
+    carry: Optional[Dict[int, PricePoint]] = None,
+) -> Iterator[Bar]:
+    """Бари з сирих спостережень, відсортованих за (product_id, observed_at, id).
+
+    Бар є лише там, де були спостереження; ціна, що діяла на початок періоду
+    (з carry або попереднього бару), входить в open/high/low.
+    """
+    last = dict(carry or {})
+    bar: Optional[Bar] = None
+    for product_id, observed_at, regular, promo in rows:
+        bucket_start = bucket_floor(observed_at, resolution)
+        if bar is None or (bar.product_id, bar.bucket_start) != (product_id, bucket_start):
+            if bar is not None:
+                yield bar
+            bar = Bar.opening(product_id, resolution, bucket_start, last.get(product_id, (regular, promo)))
+        bar.add((regular, promo))
+        last[product_id] = (regular, promo)
+    if bar is not None:
+        yield bar
+
+
+def observation_bars(rows: Iterable[ObservationRow]) -> Iterator[Bar]:
+    # Сира роздільність: кожне спостереження — бар з open = high = low = close
+    for product_id, observed_at, regular, promo in rows:
+        bar = Bar.opening(product_id, RESOLUTION_RAW, observed_at, (regular, promo))
+        bar.add((regular, promo))
+        yield bar
+
+
+def rollup_bars(bars: Iterable[Bar], resolution: str = RESOLUTION_DAY) -> Iterator[Bar]:
+    # Годинні бари, відсортовані за (product_id, bucket_start), у денні
+    rollup: Optional[Bar] = None
+    for bar in bars:
+        bucket_start = bucket_floor(bar.bucket_start, resolution)
+        if rollup is None or (rollup.product_id, rollup.bucket_start) != (bar.product_id, bucket_start):
+            if rollup is not None:
+                yield rollup
+            rollup = Bar(
+                bar.product_id, resolution, bucket_start,
+                bar.open_kop, bar.high_kop, bar.low_kop, bar.close_kop, bar.had_promo, bar.observation_count,
+                bar.close_regular_kop, bar.close_promo_kop,
+            )
+        else:
+            rollup.merge(bar)
+    if rollup is not None:
+        yield rollup
+
+
+def compaction_watermark(resolution: str) -> Optional[datetime]:
+    # Усе раніше за цю межу вже згорнуто в бари цієї роздільності (price_bar_time_idx)
+    latest = PriceBar.objects.filter(resolution=resolution).aggregate(latest=Max("bucket_start"))["latest"]
+    return None if latest is None else next_bucket(latest, resolution)
+
+
+def raw_rows(product_ids: Iterable[int], start: Optional[datetime], end: datetime) -> Iterator[ObservationRow]:
+    observations = PriceObservation.objects.filter(product_id__in=list(product_ids), observed_at__lt=end)
+    if start is not None:
+        observations = observations.filter(observed_at__gte=start)
+    return observations.order_by("product_id", "observed_at", "id").values_list(
+        "product_id", "observed_at", "regular_price_kop", "promo_price_kop"
+    ).iterator(chunk_size=2000)
+
+
+def stored_bars(product_ids: Iterable[int], resolution: str, start: Optional[datetime], end: datetime) -> Iterator[Bar]:
+    bars = PriceBar.objects.filter(product_id__in=list(product_ids), resolution=resolution, bucket_start__lt=end)
+    if start is not None:
+        bars = bars.filter(bucket_start__gte=start)
+    for row in bars.order_by("product_id", "bucket_start").values(*BAR_FIELDS).iterator(chunk_size=2000):
+        yield Bar(**row)
+
+
+def _product_batches(queryset, field: str) -> Iterator[List[int]]:
+    product_ids = list(queryset.values_list(field, flat=True).order_by(field).distinct())
+    for offset in range(0, len(product_ids), PRODUCT_BATCH_SIZE):
+        yield product_ids[offset:offset + PRODUCT_BATCH_SIZE]
+
+
+def _save_bars(bars: Iterable[Bar]) -> int:
+    saved = 0
+    batch: List[PriceBar] = []
+    for bar in bars:
+        batch.append(bar.as_model())
+        if len(batch) >= 1000:
+            PriceBar.objects.bulk_create(batch)
+            saved += len(batch)
+            batch = []
+    PriceBar.objects.bulk_create(batch)
+    return saved + len(batch)
+
+
+def compact_hourly(now: datetime) -> int:
+    start = compaction_watermark(RESOLUTION_HOUR)
+    end = bucket_floor(now, RESOLUTION_HOUR)
+    window = PriceObservation.objects.filter(observed_at__lt=end)
+    if start is not None:
+        window = window.filter(observed_at__gte=start)
+
+    saved = 0
+    for product_ids in _product_batches(window, "product_id"):
+        carry = latest_price_points(product_ids, before=start) if start is not None else {}
+        saved += _save_bars(build_bars(raw_rows(product_ids, start, end), RESOLUTION_HOUR, carry))
+    return saved
+
+
+def compact_daily(now: datetime) -> int:
+    start = compaction_watermark(RESOLUTION_DAY)
+    end = bucket_floor(now, RESOLUTION_DAY)
+    window = PriceBar.objects.filter(resolution=RESOLUTION_HOUR, bucket_start__lt=end)
+    if start is not None:
+        window = window.filter(bucket_start__gte=start)
+
+    saved = 0
+    for product_ids in _product_batches(window, "product_id"):
+        saved += _save_bars(rollup_bars(stored_bars(product_ids, RESOLUTION_HOUR, start, end)))
+    return saved
+
+
+def _delete_in_batches(queryset) -> int:
+    # Пакетами за id, щоб не тримати довгих блокувань на великих таблицях
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("id", flat=True)[:DELETE_BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+
+
+def apply_retention(now: datetime) -> Dict[str, int]:
+    """Видаляє сирі спостереження і годинні бари, що вже згорнуті та старші за термін зберігання."""
+    result = {"raw_deleted": 0, "hourly_deleted": 0}
+
+    hour_watermark = compaction_watermark(RESOLUTION_HOUR)
+    if hour_watermark is not None:
+        cutoff = min(now - timedelta(days=settings.PRICE_HISTORY_RAW_RETENTION_DAYS), hour_watermark)
+        # Останнє спостереження продукту до межі лишаємо: від нього рахуються open наступних барів
+        # і дедуплікація нових точок історії
+        latest_before_cutoff = PriceObservation.objects.filter(
+            product_id=OuterRef("product_id"), observed_at__lt=cutoff
+        ).order_by("-observed_at", "-id").values("id")[:1]
+        result["raw_deleted"] = _delete_in_batches(
+            PriceObservation.objects.filter(observed_at__lt=cutoff).exclude(id=Subquery(latest_before_cutoff))
+        )
+
+    day_watermark = compaction_watermark(RESOLUTION_DAY)
+    if day_watermark is not None:
+        cutoff = min(now - timedelta(days=settings.PRICE_BARS_HOURLY_RETENTION_DAYS), day_watermark)
+        result["hourly_deleted"] = _delete_in_batches(
+            PriceBar.objects.filter(resolution=RESOLUTION_HOUR, bucket_start__lt=cutoff)
+        )
+    return result
+
+
+def compact_price_history(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Згортає завершені години й дні в бари, потім застосовує терміни зберігання."""
+    now = now or timezone.now()
+    logger.info(f"Compacting price history up to {now}")
+
+    result = {"hourly_bars": compact_hourly(now), "daily_bars": compact_daily(now)}
+    result.update(apply_retention(now))
+    if any(result.values()):
+        # Снапшоти й графіки цін тепер читають бари замість сирих спостережень
+        bump_data_version()
+
+    logger.info(f"Price history compacted: {result}")
+    return result
+
+
+def choose_resolution(start: Optional[datetime], end: Optional[datetime], now: Optional[datetime] = None) -> str:
+    # Найгрубша роздільність, якої досить для діапазону: довгі графіки не сканують сирі дані
+    now = now or timezone.now()
+    if start is None:
+        return RESOLUTION_DAY
+    span = (end or now) - start
+    if span <= RAW_MAX_SPAN and start >= now - timedelta(days=settings.PRICE_HISTORY_RAW_RETENTION_DAYS):
+        return RESOLUTION_RAW
+    if span <= HOURLY_MAX_SPAN and start >= now - timedelta(days=settings.PRICE_BARS_HOURLY_RETENTION_DAYS):
+        return RESOLUTION_HOUR
+    return RESOLUTION_DAY
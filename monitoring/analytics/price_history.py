@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from monitoring.changes import ProductState
+from monitoring.models import PriceObservation, Product
+from monitoring.prices import to_kopecks
+
+
+logger = logging.getLogger(__name__)
+
+# (регулярна, промо) ціна в копійках
+PricePoint = Tuple[int, Optional[int]]
+
+
+def price_point(state: ProductState) -> PricePoint:
+    return to_kopecks(state.regular_price), to_kopecks(state.promo_price)
+
+
+def latest_price_points(product_ids: Iterable[int], before: Optional[datetime] = None) -> Dict[int, PricePoint]:
+    # Останнє спостереження кожного продукту (до before) — один пошук по (product, observed_at) на продукт
+    latest = PriceObservation.objects.filter(product_id=OuterRef("product_id"))
+    if before is not None:
+        latest = latest.filter(observed_at__lt=before)
+    latest = latest.order_by("-observed_at", "-id").values("id")[:1]
+    rows = PriceObservation.objects.filter(
+        product_id__in=list(product_ids),
+        id=Subquery(latest),
+    ).values_list("product_id", "regular_price_kop", "promo_price_kop")
+    return {product_id: (regular, promo) for product_id, regular, promo in rows}
+
+
+def record_price_points(points: Dict[int, PricePoint], observed_at: Optional[datetime] = None) -> int:
+    """Дописує спостереження для продуктів, чия ціна відрізняється від останньої записаної."""
+    if not points:
+        return 0
+    observed_at = observed_at or timezone.now()
+    latest = latest_price_points(points)
+    observations = [
+        PriceObservation(
+            product_id=product_id,
+            observed_at=observed_at,
+            regular_price_kop=regular,
+            promo_price_kop=promo,
+        )
+        for product_id, (regular, promo) in points.items()
+        if latest.get(product_id) != (regular, promo)
+    ]
+    PriceObservation.objects.bulk_create(observations, batch_size=1000)
+    return len(observations)
+
+
+class PriceHistoryDelta:
+    """Дописує ціну продукту в історію, коли вона змінилась відносно попереднього стану."""
+
+    def __init__(self, observed_at: Optional[datetime] = None) -> None:
+        self.observed_at = observed_at
+        self.points: Dict[int, PricePoint] = {}
+
+    def add_change(self, old_state: Optional[ProductState], new_state: Optional[ProductState]) -> None:
+        # Видалення не пишемо: історія лише доповнюється
+        if new_state is None:
+            return
+        point = price_point(new_state)
+        if old_state is None or price_point(old_state) != point:
+            self.points[new_state.id] = point
+
+    def flush(self) -> None:
+        points = self.points
+        self.points = {}
+        if not points:
+            return
+        observed_at = self.observed_at or timezone.now()
+        PriceObservation.objects.bulk_create([
+            PriceObservation(
+                product_id=product_id,
+                observed_at=observed_at,
+                regular_price_kop=regular,
+                promo_price_kop=promo,
+            )
+            for product_id, (regular, promo) in points.items()
+        ], batch_size=1000)
+
+
+def backfill_price_history() -> int:
+    # Початкова точка для продуктів без історії — поточна ціна на момент останнього оновлення
+    logger.info("Backfilling price history")
+
+    missing = Product.objects.filter(price_observations__isnull=True).values_list(
+        "id", "regular_price", "promo_price", "updated_at"
+    ).order_by("id")
+    observations: List[PriceObservation] = [
+        PriceObservation(
+            product_id=product_id,
+            observed_at=updated_at,
+            regular_price_kop=to_kopecks(regular_price),
+            promo_price_kop=to_kopecks(promo_price),
+        )
+        for product_id, regular_price, promo_price, updated_at in missing.iterator(chunk_size=2000)
+    ]
+    PriceObservation.objects.bulk_create(observations, batch_size=1000)
+
+    logger.info(f"Price history backfilled: {len(observations)} observations")
+    return len(observations)
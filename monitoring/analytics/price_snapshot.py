@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from django.db.models import OuterRef, Subquery
+
+from monitoring.models import PriceBar, PriceObservation
+
+from .price_bars import RESOLUTION_DAY, RESOLUTION_HOUR, RESOLUTION_RAW, bucket_floor
+
+
+SNAPSHOT_FIELDS = ("product_id", "observed_at", "regular_price_kop", "promo_price_kop", "source")
+
+
+def observed_prices_as_of(product_ids: Iterable[int], at: datetime) -> Dict[int, Dict]:
+    # Останнє спостереження не пізніше at — один пошук по (product, observed_at) на продукт
+    latest = PriceObservation.objects.filter(
+        product_id=OuterRef("product_id"), observed_at__lte=at
+    ).order_by("-observed_at", "-id").values("id")[:1]
+    rows = PriceObservation.objects.filter(product_id__in=list(product_ids), id=Subquery(latest)).values(
+        "product_id", "observed_at", "regular_price_kop", "promo_price_kop"
+    )
+    return {row["product_id"]: {**row, "source": RESOLUTION_RAW} for row in rows}
+
+
+def checkpoint_prices_as_of(product_ids: Iterable[int], at: datetime) -> Dict[int, Dict]:
+    """Ціни з останнього завершеного до at бару — для періодів, де сирі дані вже видалено.
+
+    Точність — до години (або дня, якщо годинні бари теж видалено).
+    """
+    prices: Dict[int, Dict] = {}
+    missing: List[int] = list(product_ids)
+    for resolution in (RESOLUTION_HOUR, RESOLUTION_DAY):
+        if not missing:
+            break
+        # Бари, що закінчились не пізніше at: пошук по унікальному індексу (product, resolution, bucket_start)
+        latest = PriceBar.objects.filter(
+            product_id=OuterRef("product_id"), resolution=resolution, bucket_start__lt=bucket_floor(at, resolution)
+        ).order_by("-bucket_start").values("id")[:1]
+        rows = PriceBar.objects.filter(product_id__in=missing, id=Subquery(latest)).values_list(
+            "product_id", "bucket_start", "close_kop", "close_regular_kop", "close_promo_kop"
+        )
+        for product_id, bucket_start, close, regular, promo in rows:
+            # Бари без контрольної пари (до її появи) знають лише ціну на полиці
+            prices[product_id] = {
+                "product_id": product_id,
+                "observed_at": bucket_start,
+                "regular_price_kop": close if regular is None else regular,
+                "promo_price_kop": promo,
+                "source": resolution,
+            }
+        missing = [product_id for product_id in missing if product_id not in prices]
+    return prices
+
+
+def prices_as_of(product_ids: Iterable[int], at: datetime) -> Dict[int, Dict]:
+    """Регулярна і промо ціна кожного продукту на момент at.
+
+    Сире спостереження точне завжди, коли воно є: очищення лишає останнє до межі.
+    Для решти продуктів — контрольні точки з барів.
+    """
+    product_ids = list(product_ids)
+    prices = observed_prices_as_of(product_ids, at)
+    missing = [product_id for product_id in product_ids if product_id not in prices]
+    if missing:
+        prices.update(checkpoint_prices_as_of(missing, at))
+    return prices
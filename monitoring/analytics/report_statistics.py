@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List
+
+
+# Підсумки звітів по вже згрупованих рядках — для рушіїв, що рахують звіти в пам'яті.
+# ORM-репозиторій рахує ті самі ключі агрегатним запитом (get_*_statistics).
+
+
+def _float(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def summarize_avg_prices(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    regular = [_float(row["avg_regular_price"]) for row in rows]
+    return {
+        "total_product_types": len(rows),
+        "avg_regular_price_overall": sum(regular) / len(rows),
+        "avg_promo_price_overall": sum(_float(row.get("avg_promo_price")) for row in rows) / len(rows),
+        "total_products": sum(row["product_count"] for row in rows),
+        "max_avg_regular_price": max(regular),
+        "min_avg_regular_price": min(regular),
+    }
+
+
+def summarize_store_statistics(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    total_stores = sum(row["store_count"] for row in rows)
+    total_products = sum(row["total_products"] for row in rows)
+    return {
+        "total_cities": len(rows),
+        "total_stores": total_stores,
+        "total_products": total_products,
+        "avg_products_per_store": total_products / total_stores if total_stores > 0 else 0,
+        "avg_price_overall": sum(_float(row.get("avg_price")) for row in rows) / len(rows),
+        "total_promo_products": sum(row["promo_products_count"] for row in rows),
+    }
+
+
+def summarize_top_products(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    discounts = [_float(row["discount"]) for row in rows]
+    return {
+        "avg_regular_price": sum(_float(row["regular_price"]) for row in rows) / len(rows),
+        "avg_discount": sum(discounts) / len(rows),
+        "products_with_promo": sum(1 for row in rows if row.get("promo_price") is not None),
+        "max_discount": max(discounts),
+        "total_potential_savings": sum(discounts),
+    }
+
+
+def summarize_price_ranges(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    # Рядки впорядковані за номером діапазону, тож при рівності виграє дешевший діапазон
+    range_totals: Dict[str, int] = {}
+    for row in rows:
+        range_totals[row["price_range"]] = range_totals.get(row["price_range"], 0) + row["count"]
+    most_popular_range = max(range_totals, key=range_totals.get)
+    return {
+        "total_products": sum(range_totals.values()),
+        "price_ranges_count": len(range_totals),
+        "most_popular_range": most_popular_range,
+        "most_popular_range_count": range_totals[most_popular_range],
+        "product_types_count": len({row["product_type_name"] for row in rows}),
+    }
+
+
+def summarize_promo_analysis(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    percents = [_float(row["avg_discount_percent"]) for row in rows]
+    top_store = min(rows, key=lambda row: (-row["promo_products"], row["id"]))
+    return {
+        "total_stores": len(rows),
+        "total_promo_products": sum(row["promo_products"] for row in rows),
+        "avg_discount_percent": sum(percents) / len(rows),
+        "total_savings": sum(_float(row["total_savings"]) for row in rows),
+        "max_discount_percent": max(percents),
+        "store_with_most_promos": top_store["store_name"],
+    }
+
+
+class ReportStatisticsMixin:
+    """get_*_statistics через власні get_* звіти рушія."""
+
+    def get_avg_prices_by_product_type_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_avg_prices(self.get_avg_prices_by_product_type(**kwargs))
+
+    def get_store_statistics_by_city_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_store_statistics(self.get_store_statistics_by_city(**kwargs))
+
+    def get_top_expensive_products_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_top_products(self.get_top_expensive_products(**kwargs))
+
+    def get_products_by_price_ranges_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_price_ranges(self.get_products_by_price_ranges(**kwargs))
+
+    def get_promo_analysis_by_store_statistics(self, **kwargs) -> Dict[str, Any]:
+        return summarize_promo_analysis(self.get_promo_analysis_by_store(**kwargs))
+
+
+__all__: List[str] = [
+    "ReportStatisticsMixin",
+    "summarize_avg_prices",
+    "summarize_price_ranges",
+    "summarize_promo_analysis",
+    "summarize_store_statistics",
+    "summarize_top_products",
+]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate, TruncMonth, TruncQuarter, TruncWeek
+from django.utils import timezone
+
+from monitoring.changes import ProductState, bump_data_version
+from monitoring.models import Product, ProductCreationRollup
+
+
+logger = logging.getLogger(__name__)
+
+GRANULARITY_DAY = "day"
+GRANULARITY_WEEK = "week"
+GRANULARITY_MONTH = "month"
+GRANULARITY_QUARTER = "quarter"
+
+# Функції групування денних рядків у довші періоди; день береться як є
+PERIOD_FUNCTIONS = {
+    GRANULARITY_DAY: None,
+    GRANULARITY_WEEK: TruncWeek,
+    GRANULARITY_MONTH: TruncMonth,
+    GRANULARITY_QUARTER: TruncQuarter,
+}
+GRANULARITIES = tuple(PERIOD_FUNCTIONS)
+
+# (день, тип продукту, магазин)
+RollupKey = Tuple[date, int, int]
+
+
+def creation_day(created_at) -> date:
+    # Як і TruncDate, день рахуємо в поточному часовому поясі
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date()
+
+
+def month_start(period: date) -> datetime:
+    # Початок місяця в поточному поясі — те саме значення, що давав TruncMonth по created_at
+    return timezone.make_aware(datetime.combine(period, time.min))
+
+
+def period_expression(granularity: str):
+    if granularity not in PERIOD_FUNCTIONS:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    function = PERIOD_FUNCTIONS[granularity]
+    return F("day") if function is None else function("day")
+
+
+class CreationRollupDelta:
+
+    def __init__(self) -> None:
+        self.counts: Dict[RollupKey, int] = defaultdict(int)
+
+    def add_change(self, old_state: Optional[ProductState], new_state: Optional[ProductState]) -> None:
+        if old_state is not None and old_state.is_active and old_state.created_at is not None:
+            self.counts[self._key(old_state)] -= 1
+        if new_state is not None and new_state.is_active and new_state.created_at is not None:
+            self.counts[self._key(new_state)] += 1
+
+    def flush(self) -> None:
+        with transaction.atomic():
+            for (day, product_type_id, store_id), delta in self.counts.items():
+                if not delta:
+                    continue
+                lookup = {"day": day, "product_type_id": product_type_id, "store_id": store_id}
+                updated = ProductCreationRollup.objects.filter(**lookup).update(
+                    products_added=F("products_added") + delta
+                )
+                if not updated and delta > 0:
+                    ProductCreationRollup.objects.create(products_added=delta, **lookup)
+        self.counts.clear()
+
+    @staticmethod
+    def _key(state: ProductState) -> RollupKey:
+        return creation_day(state.created_at), state.product_type_id, state.store_id
+
+
+def rebuild_creation_rollups() -> int:
+    logger.info("Rebuilding product creation rollups")
+
+    rows = Product.objects.filter(is_active=True).annotate(
+        day=TruncDate("created_at")
+    ).values("day", "product_type_id", "store_id").annotate(products_added=Count("id")).order_by()
+
+    with transaction.atomic():
+        ProductCreationRollup.objects.all().delete()
+        rollups = ProductCreationRollup.objects.bulk_create([
+            ProductCreationRollup(
+                day=row["day"],
+                product_type_id=row["product_type_id"],
+                store_id=row["store_id"],
+                products_added=row["products_added"],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+    bump_data_version()
+    logger.info(f"Creation rollups rebuilt: {len(rollups)} rows")
+    return len(rollups)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+DEFAULT_KLL_K = 200
+DEFAULT_HLL_PRECISION = 12
+DEFAULT_RESERVOIR_SIZE = 1024
+
+_MIN_COMPACTOR_CAPACITY = 8
+_UINT64 = np.uint64
+
+
+def kll_rank_error(k: int) -> float:
+    # Емпірична оцінка нормованої похибки рангу KLL (≈99% довіри), як в Apache DataSketches
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """Квантильний скетч KLL: ієрархія компакторів, рівень i має вагу 2**i.
+
+    Пам'ять O(k log(n/k)), похибка рангу ≈ kll_rank_error(k); поки не було
+    жодного стискання, відповіді точні. Скетчі з однаковим k можна об'єднувати.
+    """
+
+    def __init__(self, k: int = DEFAULT_KLL_K, seed: Optional[int] = None) -> None:
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self.count = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self) -> float:
+        return 0.0 if self.is_exact else kll_rank_error(self.k)
+
+    @property
+    def retained(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def update(self, values: Iterable[float]) -> "KLLSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return self
+
+        self.count += values.size
+        self._update_bounds(float(values.min()), float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches with different k")
+        if not other.count:
+            return self
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.count += other.count
+        self._update_bounds(other.min_value, other.max_value)
+        self._compress()
+        return self
+
+    def weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Збережені значення (відсортовані) та їхні ваги; сума ваг дорівнює count."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(items), 1 << level, dtype=np.int64) for level, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Optional[float]]:
+        fractions = list(fractions)
+        if not self.count:
+            return [None] * len(fractions)
+
+        values, weights = self.weighted_items()
+        cumulative = np.cumsum(weights)
+        result = []
+        for fraction in fractions:
+            if fraction <= 0:
+                result.append(self.min_value)
+            elif fraction >= 1:
+                result.append(self.max_value)
+            else:
+                position = int(np.searchsorted(cumulative, fraction * self.count, side="left"))
+                result.append(float(values[min(position, len(values) - 1)]))
+        return result
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        return self.quantiles([fraction])[0]
+
+    def rank(self, value: float) -> float:
+        """Частка значень < value."""
+        if not self.count:
+            return 0.0
+        values, weights = self.weighted_items()
+        position = int(np.searchsorted(values, value, side="left"))
+        return float(weights[:position].sum()) / self.count
+
+    def _update_bounds(self, low: float, high: float) -> None:
+        self.min_value = low if self.min_value is None else min(self.min_value, low)
+        self.max_value = high if self.max_value is None else max(self.max_value, high)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(_MIN_COMPACTOR_CAPACITY, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # непарний елемент лишається на своєму рівні, пари стискаються вдвічі
+                keep = items[len(items) - len(items) % 2:]
+                pairs = items[:len(items) - len(keep)]
+                offset = int(self._rng.integers(0, 2))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+                self.levels[level] = keep
+            level += 1
+
+
+def _splitmix64(keys: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        z = keys.astype(_UINT64) + _UINT64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> _UINT64(30))) * _UINT64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> _UINT64(27))) * _UINT64(0x94D049BB133111EB)
+        return z ^ (z >> _UINT64(31))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (_UINT64(1) << _UINT64(shift))
+        length[mask] += shift
+        values[mask] >>= _UINT64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """Оцінка кількості різних цілих ключів; відносна похибка ≈ 1.04 / sqrt(2**precision)."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, keys: Iterable[int]) -> "HyperLogLog":
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        if not keys.size:
+            return self
+
+        hashes = _splitmix64(keys)
+        remaining_bits = 64 - self.precision
+        index = (hashes >> _UINT64(remaining_bits)).astype(np.int64)
+        remainder = hashes & _UINT64((1 << remaining_bits) - 1)
+        rank = (remaining_bits - _bit_length(remainder) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class ReservoirSample:
+    """Рівномірна вибірка фіксованого розміру (алгоритм R) для оцінки середнього та std."""
+
+    def __init__(self, size: int = DEFAULT_RESERVOIR_SIZE, seed: Optional[int] = None) -> None:
+        self.size = size
+        self.count = 0
+        self.items = np.empty(0, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: Iterable[float]) -> "ReservoirSample":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return self
+
+        free = max(self.size - len(self.items), 0)
+        if free:
+            self.items = np.concatenate([self.items, values[:free]])
+        rest = values[free:]
+        if rest.size:
+            positions = self.count + free + np.arange(1, rest.size + 1)
+            slots = (self._rng.random(rest.size) * positions).astype(np.int64)
+            accepted = slots < self.size
+            # при повторних слотах виграє пізніший елемент, як у послідовному алгоритмі R
+            self.items[slots[accepted]] = rest[accepted]
+
+        self.count += values.size
+        return self
+
+    def merge(self, other: "ReservoirSample") -> "ReservoirSample":
+        if not other.count:
+            return self
+        if not self.count:
+            self.items = other.items.copy()
+            self.count = other.count
+            return self
+
+        total = self.count + other.count
+        sample_size = min(self.size, len(self.items) + len(other.items))
+        own = int(self._rng.binomial(sample_size, self.count / total))
+        own = min(max(own, sample_size - len(other.items)), len(self.items))
+        self.items = np.concatenate([
+            self._rng.choice(self.items, own, replace=False),
+            self._rng.choice(other.items, sample_size - own, replace=False),
+        ])
+        self.count = total
+        return self
+
+    def mean(self) -> Optional[float]:
+        return float(self.items.mean()) if len(self.items) else None
+
+    def std(self) -> Optional[float]:
+        return float(self.items.std(ddof=1)) if len(self.items) > 1 else None
+
+    def mean_error(self, z: float = 1.96) -> float:
+        """Півширина довірчого інтервалу середнього (за замовчуванням 95%)."""
+        sample = len(self.items)
+        if sample < 2 or sample >= self.count:
+            return 0.0
+        finite_population = math.sqrt((self.count - sample) / (self.count - 1))
+        return z * self.std() / math.sqrt(sample) * finite_population
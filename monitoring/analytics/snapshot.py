@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from monitoring.analytics.histogram import DEFAULT_PRICE_EDGES, bucket_index, bucket_labels, histogram_rows
+
+
+SNAPSHOT_FIELDS = (
+    "id",
+    "name",
+    "sku",
+    "regular_price",
+    "promo_price",
+    "created_at",
+    "product_type_id",
+    "product_type__name",
+    "store_id",
+    "store__name",
+    "store__city",
+    "store__is_active",
+)
+
+PRICE_RANGE_LABELS = bucket_labels(DEFAULT_PRICE_EDGES)
+
+
+def _average(total: Decimal, count: int) -> Optional[Decimal]:
+    # Точне середнє в Decimal; з ORM-звітом збігається з точністю до float у відповіді API
+    if not count:
+        return None
+    return total / count
+
+
+def _truncate_month(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+class AnalyticsSnapshotBuilder:
+    """Будує всі шість звітів AnalyticsRepository за один прохід по активних продуктах."""
+
+    def __init__(self, top_limit: int = 10, dynamics_since: Optional[datetime] = None) -> None:
+        self.top_limit = top_limit
+        self.dynamics_since = dynamics_since
+
+        self._types: Dict[int, Dict[str, Any]] = {}
+        self._cities: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"total_products": 0, "sum_price": Decimal(0), "promo_products_count": 0}
+        )
+        self._stores: Dict[int, Dict[str, Any]] = {}
+        self._price_ranges: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._dynamics: Dict[Tuple[datetime, str], int] = defaultdict(int)
+        self._top: List[Tuple[Decimal, int, Tuple]] = []
+        self._sequence = itertools.count()
+        self.product_count = 0
+
+    def add_rows(self, rows: Iterable[Tuple]) -> "AnalyticsSnapshotBuilder":
+        for row in rows:
+            self.add_row(row)
+        return self
+
+    def add_row(self, row: Tuple) -> None:
+        (
+            _product_id, name, sku, regular_price, promo_price, created_at,
+            product_type_id, product_type_name, store_id, store_name, city, store_is_active,
+        ) = row
+        has_promo = promo_price is not None
+        self.product_count += 1
+
+        product_type = self._types.get(product_type_id)
+        if product_type is None:
+            product_type = self._types[product_type_id] = {
+                "name": product_type_name,
+                "count": 0,
+                "sum_regular": Decimal(0),
+                "promo_count": 0,
+                "sum_promo": Decimal(0),
+            }
+        product_type["count"] += 1
+        product_type["sum_regular"] += regular_price
+        if has_promo:
+            product_type["promo_count"] += 1
+            product_type["sum_promo"] += promo_price
+
+        if store_is_active:
+            city_stats = self._cities[city]
+            city_stats["total_products"] += 1
+            city_stats["sum_price"] += regular_price
+            if has_promo:
+                city_stats["promo_products_count"] += 1
+
+            if has_promo:
+                store = self._stores.get(store_id)
+                if store is None:
+                    store = self._stores[store_id] = {
+                        "store_name": store_name,
+                        "city": city,
+                        "promo_products": 0,
+                        "sum_discount_percent": Decimal(0),
+                        "sum_discount": Decimal(0),
+                    }
+                discount = regular_price - promo_price
+                store["promo_products"] += 1
+                store["sum_discount"] += discount
+                store["sum_discount_percent"] += discount * 100 / regular_price
+
+        self._price_ranges[(product_type_name, bucket_index(regular_price, DEFAULT_PRICE_EDGES))] += 1
+
+        if self.dynamics_since is None or created_at >= self.dynamics_since:
+            self._dynamics[(_truncate_month(created_at), product_type_name)] += 1
+
+        if self.top_limit > 0:
+            # Менший порядковий номер виграє при однаковій ціні, як у стабільному сортуванні
+            entry = (regular_price, -next(self._sequence), row)
+            if len(self._top) < self.top_limit:
+                heapq.heappush(self._top, entry)
+            elif entry[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, entry)
+
+    def build(self, store_counts: Dict[str, int]) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            "avg_prices_by_product_type": self._build_avg_prices(),
+            "store_statistics_by_city": self._build_store_statistics(store_counts),
+            "top_expensive_products": self._build_top_expensive(),
+            "products_by_price_ranges": self._build_price_ranges(),
+            "promo_analysis_by_store": self._build_promo_analysis(),
+            "product_creation_dynamics": self._build_dynamics(),
+        }
+
+    def _build_avg_prices(self) -> List[Dict[str, Any]]:
+        result = [
+            {
+                "id": product_type_id,
+                "product_type_name": stats["name"],
+                "avg_regular_price": _average(stats["sum_regular"], stats["count"]),
+                "avg_promo_price": _average(stats["sum_promo"], stats["promo_count"]),
+                "product_count": stats["count"],
+            }
+            for product_type_id, stats in self._types.items()
+        ]
+        result.sort(key=lambda item: item["avg_regular_price"], reverse=True)
+        return result
+
+    def _build_store_statistics(self, store_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+        result = []
+        for city, store_count in store_counts.items():
+            stats = self._cities.get(city)
+            total_products = stats["total_products"] if stats else 0
+            result.append({
+                "city": city,
+                "store_count": store_count,
+                "total_products": total_products,
+                "avg_price": _average(stats["sum_price"], total_products) if stats else None,
+                "promo_products_count": stats["promo_products_count"] if stats else 0,
+            })
+        result.sort(key=lambda item: item["store_count"], reverse=True)
+        return result
+
+    def _build_top_expensive(self) -> List[Dict[str, Any]]:
+        result = []
+        for _price, _sequence, row in sorted(self._top, reverse=True):
+            (
+                product_id, name, sku, regular_price, promo_price, _created_at,
+                _product_type_id, product_type_name, _store_id, store_name, city, _store_is_active,
+            ) = row
+            discount = regular_price - promo_price if promo_price is not None else Decimal(0)
+            result.append({
+                "product_id": product_id,
+                "product_name": name,
+                "sku": sku,
+                "regular_price": regular_price,
+                "promo_price": promo_price,
+                "discount": discount,
+                "store_name": store_name,
+                "city": city,
+                "product_type_name": product_type_name,
+            })
+        return result
+
+    def _build_price_ranges(self) -> List[Dict[str, Any]]:
+        labels = {product_type_name: PRICE_RANGE_LABELS for product_type_name, _ in self._price_ranges}
+        return histogram_rows(self._price_ranges, labels, self.product_count)
+
+    def _build_promo_analysis(self) -> List[Dict[str, Any]]:
+        result = [
+            {
+                "id": store_id,
+                "store_name": stats["store_name"],
+                "city": stats["city"],
+                "promo_products": stats["promo_products"],
+                "avg_discount_percent": float(stats["sum_discount_percent"] / stats["promo_products"]),
+                "total_savings": float(stats["sum_discount"]),
+            }
+            for store_id, stats in self._stores.items()
+        ]
+        result.sort(key=lambda item: item["promo_products"], reverse=True)
+        return result
+
+    def _build_dynamics(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "month": month,
+                "product_type_name": product_type_name,
+                "products_added": count,
+            }
+            for (month, product_type_name), count in sorted(self._dynamics.items())
+        ]
@@ -2,10 +2,17 @@
 import pandas as pd
 from typing import Dict, List, Any, Optional
 
+from .sketches import KLLSketch, ReservoirSample
+
 
 class StatisticalAnalyzer:
     
-    def calculate_basic_statistics(self, df: pd.DataFrame, numeric_columns: List[str]) -> Dict[str, Any]:
+    def calculate_basic_statistics(
+        self,
+        df: pd.DataFrame,
+        numeric_columns: List[str],
+        approximate: bool = False
+    ) -> Dict[str, Any]:
         if df.empty:
             return {}
         
@@ -17,6 +24,10 @@ class StatisticalAnalyzer:
             
             df[column] = pd.to_numeric(df[column], errors='coerce')
             
+            if approximate:
+                statistics[column] = self._approximate_statistics(df[column].dropna().to_numpy(dtype=float))
+                continue
+            
             statistics[column] = {
                 'mean': float(df[column].mean()),
                 'median': float(df[column].median()),
@@ -30,6 +41,30 @@ class StatisticalAnalyzer:
         
         return statistics
     
+    def _approximate_statistics(self, values) -> Dict[str, Any]:
+        # Квантилі з KLL-скетча, середнє та std з резервуарної вибірки
+        if not len(values):
+            return {}
+        
+        quantiles = KLLSketch().update(values)
+        sample = ReservoirSample().update(values)
+        q25, q50, q75 = quantiles.quantiles([0.25, 0.5, 0.75])
+        
+        return {
+            'mean': sample.mean(),
+            'median': q50,
+            'min': quantiles.min_value,
+            'max': quantiles.max_value,
+            'std': sample.std(),
+            'quantile_25': q25,
+            'quantile_50': q50,
+            'quantile_75': q75,
+            'error_bounds': {
+                'quantile_rank': quantiles.rank_error,
+                'mean_95': sample.mean_error()
+            }
+        }
+    
     def perform_grouping_analysis(
         self, 
         df: pd.DataFrame, 
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.utils import timezone
+
+from monitoring.changes import ProductState, bump_data_version
+from monitoring.models import (
+    CitySummary,
+    Product,
+    ProductTypeSummary,
+    Store,
+    StoreSummary,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CITY_PRODUCT_FIELDS = ("product_count", "sum_regular_price", "promo_count")
+
+# (місто, is_active) магазину до/після зміни
+StoreLocation = Tuple[str, bool]
+
+
+def _bump(bucket: Dict[str, Any], **deltas: Any) -> None:
+    for field_name, value in deltas.items():
+        bucket[field_name] = bucket.get(field_name, 0) + value
+
+
+def _increment(model, lookup: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+    deltas = {field_name: value for field_name, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    updated = model.objects.filter(**lookup).update(
+        updated_at=timezone.now(),
+        **{field_name: F(field_name) + value for field_name, value in deltas.items()}
+    )
+    # Рядок створюємо лише коли щось додається: від'ємна дельта для відсутнього
+    # рядка означає, що об'єкт видаляється (або таблиці ще не перебудовані).
+    if not updated and (deltas.get("product_count", 0) > 0 or deltas.get("store_count", 0) > 0):
+        model.objects.create(**lookup, **deltas)
+
+
+class SummaryDelta:
+
+    def __init__(self) -> None:
+        self.product_types: Dict[int, Dict[str, Any]] = defaultdict(dict)
+        self.stores: Dict[int, Dict[str, Any]] = defaultdict(dict)
+        self.cities: Dict[str, Dict[str, Any]] = defaultdict(dict)
+
+    def add_change(self, old_state: Optional[ProductState], new_state: Optional[ProductState]) -> None:
+        if old_state is not None and old_state.is_active:
+            self._add_product(old_state, -1)
+        if new_state is not None and new_state.is_active:
+            self._add_product(new_state, 1)
+
+    def add_store_change(
+        self,
+        store_id: int,
+        old_location: Optional[StoreLocation],
+        new_location: Optional[StoreLocation],
+    ) -> None:
+        if old_location == new_location:
+            return
+
+        totals = StoreSummary.objects.filter(store_id=store_id).values(*CITY_PRODUCT_FIELDS).first() or {}
+
+        if old_location is not None and old_location[1]:
+            _bump(
+                self.cities[old_location[0]],
+                store_count=-1,
+                **{field_name: -value for field_name, value in totals.items()}
+            )
+        if new_location is not None and new_location[1]:
+            _bump(self.cities[new_location[0]], store_count=1, **totals)
+
+    def flush(self) -> None:
+        if self.stores:
+            stores = Store.objects.filter(pk__in=list(self.stores)).values_list("id", "city", "is_active")
+            for store_id, city, is_active in stores:
+                if not is_active:
+                    continue
+                store_delta = self.stores[store_id]
+                _bump(
+                    self.cities[city],
+                    **{field_name: store_delta.get(field_name, 0) for field_name in CITY_PRODUCT_FIELDS}
+                )
+
+        with transaction.atomic():
+            for product_type_id, deltas in self.product_types.items():
+                _increment(ProductTypeSummary, {"product_type_id": product_type_id}, deltas)
+            for store_id, deltas in self.stores.items():
+                _increment(StoreSummary, {"store_id": store_id}, deltas)
+            for city, deltas in self.cities.items():
+                _increment(CitySummary, {"city": city}, deltas)
+
+        self.product_types.clear()
+        self.stores.clear()
+        self.cities.clear()
+
+    def _add_product(self, state: ProductState, sign: int) -> None:
+        regular_price = state.regular_price
+        has_promo = state.promo_price is not None
+
+        _bump(
+            self.product_types[state.product_type_id],
+            product_count=sign,
+            sum_regular_price=sign * regular_price,
+            promo_count=sign * int(has_promo),
+            sum_promo_price=sign * (state.promo_price if has_promo else Decimal(0)),
+        )
+
+        store_deltas = {
+            "product_count": sign,
+            "sum_regular_price": sign * regular_price,
+        }
+        if has_promo:
+            discount = regular_price - state.promo_price
+            store_deltas.update(
+                promo_count=sign,
+                sum_discount=sign * discount,
+                sum_discount_percent=sign * (float(discount) * 100.0 / float(regular_price) if regular_price else 0.0),
+            )
+        _bump(self.stores[state.store_id], **store_deltas)
+
+
+def rebuild_summaries() -> Dict[str, int]:
+    logger.info("Rebuilding analytics summary tables")
+
+    active_products = Product.objects.filter(is_active=True)
+    promo_filter = Q(promo_price__isnull=False)
+
+    type_rows = active_products.values("product_type_id").annotate(
+        product_count=Count("id"),
+        sum_regular_price=Sum("regular_price"),
+        promo_count=Count("id", filter=promo_filter),
+        sum_promo_price=Sum("promo_price", filter=promo_filter),
+    )
+
+    store_rows = active_products.values("store_id").annotate(
+        product_count=Count("id"),
+        sum_regular_price=Sum("regular_price"),
+        promo_count=Count("id", filter=promo_filter),
+        sum_discount=Sum(F("regular_price") - F("promo_price"), filter=promo_filter),
+        sum_discount_percent=Sum(
+            ExpressionWrapper(
+                (F("regular_price") - F("promo_price")) * 100.0 / F("regular_price"),
+                output_field=FloatField()
+            ),
+            filter=promo_filter
+        ),
+    )
+
+    active_product_filter = Q(products__is_active=True)
+    city_rows = Store.objects.filter(is_active=True).values("city").annotate(
+        store_count=Count("id", distinct=True),
+        product_count=Count("products", filter=active_product_filter),
+        sum_regular_price=Sum("products__regular_price", filter=active_product_filter),
+        promo_count=Count("products", filter=active_product_filter & Q(products__promo_price__isnull=False)),
+    )
+
+    with transaction.atomic():
+        ProductTypeSummary.objects.all().delete()
+        StoreSummary.objects.all().delete()
+        CitySummary.objects.all().delete()
+
+        type_summaries = ProductTypeSummary.objects.bulk_create([
+            ProductTypeSummary(
+                product_type_id=row["product_type_id"],
+                product_count=row["product_count"],
+                sum_regular_price=row["sum_regular_price"] or 0,
+                promo_count=row["promo_count"],
+                sum_promo_price=row["sum_promo_price"] or 0,
+            )
+            for row in type_rows
+        ])
+        store_summaries = StoreSummary.objects.bulk_create([
+            StoreSummary(
+                store_id=row["store_id"],
+                product_count=row["product_count"],
+                sum_regular_price=row["sum_regular_price"] or 0,
+                promo_count=row["promo_count"],
+                sum_discount=row["sum_discount"] or 0,
+                sum_discount_percent=row["sum_discount_percent"] or 0.0,
+            )
+            for row in store_rows
+        ])
+        city_summaries = CitySummary.objects.bulk_create([
+            CitySummary(
+                city=row["city"],
+                store_count=row["store_count"],
+                product_count=row["product_count"],
+                sum_regular_price=row["sum_regular_price"] or 0,
+                promo_count=row["promo_count"],
+            )
+            for row in city_rows
+        ])
+
+    bump_data_version()
+
+    result = {
+        "product_types": len(type_summaries),
+        "stores": len(store_summaries),
+        "cities": len(city_summaries),
+    }
+    logger.info(f"Summary tables rebuilt: {result}")
+    return result
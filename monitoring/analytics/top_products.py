@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import functools
+import logging
+import operator
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from monitoring.changes import ProductState, bump_data_version
+from monitoring.models import Product, Store, TopProductEntry
+
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+# Розрізи індексу як поля розбиття: глобальний, тип, місто, тип × місто
+SCOPE_PARTITIONS = (
+    (),
+    ("product_type_id",),
+    ("store__city",),
+    ("product_type_id", "store__city"),
+)
+
+
+def top_products_k() -> int:
+    return settings.TOP_PRODUCTS_K
+
+
+def scope_key(product_type_id: Optional[int] = None, city: Optional[str] = None) -> str:
+    parts = []
+    if product_type_id is not None:
+        parts.append(f"type:{product_type_id}")
+    if city is not None:
+        parts.append(f"city:{city}")
+    return "|".join(parts) or GLOBAL_SCOPE
+
+
+def product_scopes(product_type_id: int, city: str) -> Tuple[str, ...]:
+    return (
+        scope_key(),
+        scope_key(product_type_id=product_type_id),
+        scope_key(city=city),
+        scope_key(product_type_id=product_type_id, city=city),
+    )
+
+
+def _scope_products(scope: str):
+    products = Product.objects.filter(is_active=True)
+    if scope == GLOBAL_SCOPE:
+        return products
+    for part in scope.split("|"):
+        name, value = part.split(":", 1)
+        if name == "type":
+            products = products.filter(product_type_id=int(value))
+        else:
+            products = products.filter(store__city=value)
+    return products
+
+
+def _ordered(entries: Dict[int, Decimal]) -> List[Tuple[int, Decimal]]:
+    # Однакові ціни впорядковуємо за id продукту
+    return sorted(entries.items(), key=lambda item: (-item[1], item[0]))
+
+
+class TopProductsDelta:
+    """Оновлює top-K записи лише тих розрізів, яких торкнулися зміни."""
+
+    def __init__(self) -> None:
+        self.removed: Dict[str, Set[int]] = defaultdict(set)
+        self.added: Dict[str, Dict[int, Decimal]] = defaultdict(dict)
+        self._states: List[Tuple[Optional[ProductState], Optional[ProductState]]] = []
+
+    def add_change(self, old_state: Optional[ProductState], new_state: Optional[ProductState]) -> None:
+        self._states.append((old_state, new_state))
+
+    def flush(self) -> None:
+        states = self._states
+        self._states = []
+        if not states:
+            return
+
+        store_ids = {state.store_id for change in states for state in change if state is not None}
+        cities = dict(Store.objects.filter(pk__in=store_ids).values_list("id", "city"))
+
+        for old_state, new_state in states:
+            if old_state is not None and old_state.is_active:
+                for scope in product_scopes(old_state.product_type_id, cities.get(old_state.store_id)):
+                    self.removed[scope].add(old_state.id)
+            if new_state is not None and new_state.is_active:
+                for scope in product_scopes(new_state.product_type_id, cities.get(new_state.store_id)):
+                    self.removed[scope].discard(new_state.id)
+                    self.added[scope][new_state.id] = new_state.regular_price
+
+        with transaction.atomic():
+            for scope in set(self.removed) | set(self.added):
+                self._apply(scope, self.removed.get(scope, set()), self.added.get(scope, {}))
+
+        self.removed.clear()
+        self.added.clear()
+
+    def _apply(self, scope: str, removed: Set[int], added: Dict[int, Decimal]) -> None:
+        k = top_products_k()
+        current = dict(TopProductEntry.objects.filter(scope=scope).values_list("product_id", "regular_price"))
+
+        entries = {product_id: price for product_id, price in current.items() if product_id not in added}
+        dropped = bool(removed & set(current)) or any(
+            product_id in current and price < current[product_id] for product_id, price in added.items()
+        )
+        # Видалений продукт міг уже зникнути з таблиці каскадом, тому неповний
+        # розріз теж перевіряємо з бази
+        if dropped or (removed and len(current) < k):
+            refresh_scope(scope)
+            return
+
+        for product_id in removed:
+            entries.pop(product_id, None)
+        entries.update(added)
+        _write_scope(scope, current, dict(_ordered(entries)[:k]))
+
+
+def _write_scope(scope: str, current: Dict[int, Decimal], target: Dict[int, Decimal]) -> None:
+    stale = [product_id for product_id in current if product_id not in target]
+    if stale:
+        TopProductEntry.objects.filter(scope=scope, product_id__in=stale).delete()
+
+    changed = [product_id for product_id, price in target.items() if product_id in current and current[product_id] != price]
+    for product_id in changed:
+        TopProductEntry.objects.filter(scope=scope, product_id=product_id).update(regular_price=target[product_id])
+
+    TopProductEntry.objects.bulk_create([
+        TopProductEntry(scope=scope, product_id=product_id, regular_price=price)
+        for product_id, price in target.items()
+        if product_id not in current
+    ])
+
+
+def refresh_scope(scope: str) -> None:
+    current = dict(TopProductEntry.objects.filter(scope=scope).values_list("product_id", "regular_price"))
+    target = dict(
+        _scope_products(scope).order_by("-regular_price", "id").values_list("id", "regular_price")[:top_products_k()]
+    )
+    _write_scope(scope, current, target)
+
+
+def refresh_city_scopes(cities: Iterable[str]) -> None:
+    # Переїзд магазину змінює місто всіх його продуктів — перераховуємо розрізи цих міст
+    cities = {city for city in cities if city is not None}
+    if not cities:
+        return
+
+    scopes = {scope_key(city=city) for city in cities}
+    scopes.update(
+        scope_key(product_type_id, city)
+        for product_type_id, city in Product.objects.filter(
+            is_active=True, store__city__in=cities
+        ).values_list("product_type_id", "store__city").distinct()
+    )
+    # Розрізи тип × місто, з яких продукти могли піти повністю
+    scopes.update(
+        TopProductEntry.objects.filter(
+            functools.reduce(operator.or_, (Q(scope__endswith=f"|city:{city}") for city in cities))
+        ).values_list("scope", flat=True).distinct()
+    )
+
+    with transaction.atomic():
+        for scope in scopes:
+            refresh_scope(scope)
+
+
+def rebuild_top_products() -> int:
+    logger.info("Rebuilding top products index")
+    k = top_products_k()
+
+    entries = []
+    for partition in SCOPE_PARTITIONS:
+        rows = Product.objects.filter(is_active=True).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F(field_name) for field_name in partition] or None,
+                order_by=[F("regular_price").desc(), F("id").asc()],
+            )
+        ).filter(position__lte=k).values_list("id", "regular_price", *partition)
+
+        for product_id, regular_price, *keys in rows:
+            values = dict(zip(partition, keys))
+            scope = scope_key(values.get("product_type_id"), values.get("store__city"))
+            entries.append(TopProductEntry(scope=scope, product_id=product_id, regular_price=regular_price))
+
+    with transaction.atomic():
+        TopProductEntry.objects.all().delete()
+        TopProductEntry.objects.bulk_create(entries, batch_size=1000)
+
+    bump_data_version()
+    logger.info(f"Top products index rebuilt: {len(entries)} entries")
+    return len(entries)
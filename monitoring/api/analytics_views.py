@@ -3,25 +3,125 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from datetime import date
 from decimal import Decimal
 
-from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories import repository_registry
+from monitoring.analytics.approximate import ApproximateAnalyticsEngine, require_supported_filters
+from monitoring.analytics.filters import AnalyticsFilters, as_of_moment, day_bounds
+from monitoring.analytics.report_statistics import summarize_top_products
+from monitoring.analytics.histogram import BUCKETING_FIXED, DEFAULT_BUCKET_COUNT, parse_edges, validate_bucketing
+from monitoring.analytics.rollups import GRANULARITIES, GRANULARITY_MONTH, month_start
+from monitoring.repositories.analytics import ENGINE_NUMPY, ENGINE_ORM, ENGINE_SKETCH, ENGINES
+from monitoring.api.conditional import conditional_get
+from monitoring.api.pagination import KeysetPaginator, parse_page_size
+from monitoring.api.serializers import PriceObservationSerializer, PriceSnapshotSerializer
 
 
-analytics_repo = AnalyticsRepository()
+analytics_repo = repository_registry.analytics
+
+
+def _is_approximate(request):
+    return request.GET.get('approximate', '').lower() in ('1', 'true', 'yes')
+
+
+# Звіти без наближеного режиму: engine=sketch для них — помилка запиту
+EXACT_ENGINES = (ENGINE_ORM, ENGINE_NUMPY)
+
+
+def _analytics_engine(request, engines=ENGINES):
+    # approximate=true перемикає звіт на скетчі, якщо вони для нього є; інакше — явний engine або ORM
+    if ENGINE_SKETCH in engines and _is_approximate(request):
+        return ENGINE_SKETCH
+    engine = request.GET.get('engine', ENGINE_ORM)
+    if engine not in engines:
+        raise ValueError(f"engine must be one of: {', '.join(engines)}")
+    return engine
+
+
+def _is_in_memory(request, engines=ENGINES):
+    # Скетчі та колонковий знімок перебудовуються із запізненням, тож їхня відповідь
+    # не визначається версією даних — без ETag і кешу. Рушій визначається так само, як у view.
+    try:
+        return _analytics_engine(request, engines) != ENGINE_ORM
+    except ValueError:
+        # Невідомий engine: view однаково відповість 400
+        return True
+
+
+def _is_in_memory_exact(request):
+    return _is_in_memory(request, EXACT_ENGINES)
+
+
+def _analytics_filters(request, engine=ENGINE_ORM, report=None):
+    # city, store, product_type, min_price, max_price, date_from, date_to;
+    # для скетчів — лише розрізи, за якими вони зібрані (інакше 400 ще до звіту)
+    filters = AnalyticsFilters.from_query_params(request.GET)
+    if engine == ENGINE_SKETCH:
+        require_supported_filters(report, filters)
+    return filters
+
+
+def _serialize_value(value):
+    # Decimal -> float, дати -> str; підсумки й рядки вже пораховані в репозиторії
+    if isinstance(value, dict):
+        return {key: _serialize_value(item) for key, item in value.items()}
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return str(value)
+    return value
+
+
+def _serialize_rows(rows):
+    return [_serialize_value(row) for row in rows]
+
+
+def _price_edges(request):
+    # ?edges=50,100 — спільні межі; ?edges[beer]=20,40 — межі окремого типу (за slug),
+    # решта типів отримує межі за замовчуванням
+    per_type = {
+        key[len('edges['):-1]: parse_edges(value)
+        for key, value in request.GET.items() if key.startswith('edges[') and key.endswith(']')
+    }
+    if not per_type:
+        return parse_edges(request.GET['edges']) if request.GET.get('edges') else None
+    if request.GET.get('edges'):
+        raise ValueError("Use either edges or edges[<product_type>], not both")
+
+    names = dict(repository_registry.product_types.get_queryset().filter(
+        slug__in=per_type
+    ).values_list('slug', 'name'))
+    unknown = sorted(set(per_type) - set(names))
+    if unknown:
+        raise ValueError(f"Unknown product types in edges: {', '.join(unknown)}")
+    return {names[slug]: edges for slug, edges in per_type.items()}
+
+
+def _bad_request(error):
+    return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _with_approximation(request, response_data):
+    if _is_approximate(request):
+        response_data['approximation'] = ApproximateAnalyticsEngine.current().describe()
+    return response_data
 
 
 @api_view(['GET'])
-@permission_classes([AllowAny])  
+@permission_classes([AllowAny])
+@conditional_get(exempt=_is_in_memory)
 def avg_prices_by_product_type_view(request):
     try:
-        data = list(analytics_repo.get_avg_prices_by_product_type())
+        try:
+            engine = _analytics_engine(request)
+            filters = _analytics_filters(request, engine, 'get_avg_prices_by_product_type')
+            paginator = KeysetPaginator.from_request(request, ('-avg_regular_price', 'id'))
+        except ValueError as e:
+            return _bad_request(e)
+        data = paginator.paginate(analytics_repo.get_avg_prices_by_product_type(filters=filters, engine=engine))
         
-        # Конвертуємо Decimal в float
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
+        data = _serialize_rows(data)
         
         if not data:
             return Response({
@@ -29,21 +129,17 @@ def avg_prices_by_product_type_view(request):
                 'statistics': {}
             })
         
-        statistics = {
-            'total_product_types': len(data),
-            'avg_regular_price_overall': sum(item['avg_regular_price'] for item in data) / len(data),
-            'avg_promo_price_overall': sum(item.get('avg_promo_price', 0) or 0 for item in data) / len(data),
-            'total_products': sum(item['product_count'] for item in data),
-            'max_avg_regular_price': max(item['avg_regular_price'] for item in data),
-            'min_avg_regular_price': min(item['avg_regular_price'] for item in data)
-        }
+        statistics = _serialize_value(analytics_repo.get_avg_prices_by_product_type_statistics(
+            filters=filters, engine=engine
+        ))
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
         }
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(_with_approximation(request, response_data), status=status.HTTP_200_OK)
     
     except Exception as e:
         return Response(
@@ -54,21 +150,18 @@ def avg_prices_by_product_type_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(exempt=_is_in_memory)
 def store_statistics_by_city_view(request):
     try:
-        queryset = analytics_repo.get_store_statistics_by_city()
-        
-        city_filter = request.GET.get('city', None)
-        if city_filter:
-            queryset = queryset.filter(city__icontains=city_filter)
+        try:
+            engine = _analytics_engine(request)
+            filters = _analytics_filters(request, engine, 'get_store_statistics_by_city')
+            paginator = KeysetPaginator.from_request(request, ('-store_count', 'city'))
+        except ValueError as e:
+            return _bad_request(e)
+        data = paginator.paginate(analytics_repo.get_store_statistics_by_city(filters=filters, engine=engine))
         
-        data = list(queryset)
-        
-        # Конвертуємо Decimal в float
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
+        data = _serialize_rows(data)
         
         if not data:
             return Response({
@@ -76,24 +169,17 @@ def store_statistics_by_city_view(request):
                 'statistics': {}
             })
         
-        total_stores = sum(item['store_count'] for item in data)
-        total_products = sum(item['total_products'] for item in data)
-        
-        statistics = {
-            'total_cities': len(data),
-            'total_stores': total_stores,
-            'total_products': total_products,
-            'avg_products_per_store': total_products / total_stores if total_stores > 0 else 0,
-            'avg_price_overall': sum(item.get('avg_price', 0) or 0 for item in data) / len(data),
-            'total_promo_products': sum(item['promo_products_count'] for item in data)
-        }
+        statistics = _serialize_value(analytics_repo.get_store_statistics_by_city_statistics(
+            filters=filters, engine=engine
+        ))
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
         }
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(_with_approximation(request, response_data), status=status.HTTP_200_OK)
     
     except Exception as e:
         return Response(
@@ -104,17 +190,28 @@ def store_statistics_by_city_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(exempt=_is_in_memory_exact)
 def top_expensive_products_view(request):
     try:
         limit = int(request.GET.get('limit', 10))
-        
-        data = list(analytics_repo.get_top_expensive_products(limit=limit))
-        
-        # Конвертуємо Decimal в float
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
+        try:
+            engine = _analytics_engine(request, EXACT_ENGINES)
+            filters = _analytics_filters(request)
+            # limit — розмір сторінки рейтингу, обмежений як і page_size
+            paginator = KeysetPaginator.from_request(
+                request, ('-regular_price', 'product_id'), page_size=parse_page_size(limit)
+            )
+        except ValueError as e:
+            return _bad_request(e)
+        
+        data = paginator.paginate(analytics_repo.get_top_expensive_products(
+            limit=paginator.page_size + 1,
+            filters=filters,
+            after=paginator.after,
+            engine=engine
+        ))
+        
+        data = _serialize_rows(data)
         
         if not data:
             return Response({
@@ -122,19 +219,13 @@ def top_expensive_products_view(request):
                 'statistics': {}
             })
         
-        products_with_promo = sum(1 for item in data if item.get('promo_price') is not None)
-        
-        statistics = {
-            'avg_regular_price': sum(item['regular_price'] for item in data) / len(data),
-            'avg_discount': sum(item['discount'] for item in data) / len(data),
-            'products_with_promo': products_with_promo,
-            'max_discount': max(item['discount'] for item in data),
-            'total_potential_savings': sum(item['discount'] for item in data)
-        }
+        # Підсумок по поточній сторінці рейтингу — з уже отриманих рядків, без другого запиту
+        statistics = summarize_top_products(data)
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
@@ -148,21 +239,29 @@ def top_expensive_products_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(exempt=_is_in_memory)
 def products_by_price_ranges_view(request):
     try:
-        queryset = analytics_repo.get_products_by_price_ranges()
-        
-        product_type_filter = request.GET.get('product_type', None)
-        if product_type_filter:
-            queryset = queryset.filter(product_type_name__icontains=product_type_filter)
-        
-        data = list(queryset)
+        try:
+            engine = _analytics_engine(request)
+            filters = _analytics_filters(request, engine, 'get_products_by_price_ranges')
+            edges = _price_edges(request)
+            bucketing = request.GET.get('bucketing', BUCKETING_FIXED)
+            bucket_count = int(request.GET.get('buckets', DEFAULT_BUCKET_COUNT))
+            validate_bucketing(bucketing, bucket_count)
+            paginator = KeysetPaginator.from_request(request, ('bucket', 'product_type_name'))
+        except ValueError as e:
+            return _bad_request(e)
+
+        data = paginator.paginate(analytics_repo.get_products_by_price_ranges(
+            filters=filters,
+            edges=edges,
+            bucketing=bucketing,
+            bucket_count=bucket_count,
+            engine=engine
+        ))
         
-        # Конвертуємо Decimal в float
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
+        data = _serialize_rows(data)
         
         if not data:
             return Response({
@@ -170,33 +269,21 @@ def products_by_price_ranges_view(request):
                 'statistics': {}
             })
         
-        # Підрахунки без pandas
-        range_totals = {}
-        unique_ranges = set()
-        unique_types = set()
-        
-        for item in data:
-            range_name = item['price_range']
-            unique_ranges.add(range_name)
-            unique_types.add(item['product_type_name'])
-            range_totals[range_name] = range_totals.get(range_name, 0) + item['count']
-        
-        most_popular_range = max(range_totals, key=range_totals.get) if range_totals else None
-        
-        statistics = {
-            'total_products': sum(item['count'] for item in data),
-            'price_ranges_count': len(unique_ranges),
-            'most_popular_range': most_popular_range,
-            'most_popular_range_count': range_totals.get(most_popular_range, 0) if most_popular_range else 0,
-            'product_types_count': len(unique_types)
-        }
+        statistics = _serialize_value(analytics_repo.get_products_by_price_ranges_statistics(
+            filters=filters,
+            edges=edges,
+            bucketing=bucketing,
+            bucket_count=bucket_count,
+            engine=engine
+        ))
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
         }
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(_with_approximation(request, response_data), status=status.HTTP_200_OK)
     
     except Exception as e:
         return Response(
@@ -207,25 +294,25 @@ def products_by_price_ranges_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(exempt=_is_in_memory_exact)
 def promo_analysis_by_store_view(request):
     try:
-        queryset = analytics_repo.get_promo_analysis_by_store()
-        
-        city_filter = request.GET.get('city', None)
         min_promo = request.GET.get('min_promo_products', None)
-        
-        if city_filter:
-            queryset = queryset.filter(city__icontains=city_filter)
-        if min_promo:
-            queryset = queryset.filter(promo_products__gte=int(min_promo))
-        
-        data = list(queryset)
-        
-        # Конвертуємо Decimal в float
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
+        try:
+            engine = _analytics_engine(request, EXACT_ENGINES)
+            filters = _analytics_filters(request)
+            paginator = KeysetPaginator.from_request(request, ('-promo_products', 'id'))
+        except ValueError as e:
+            return _bad_request(e)
+        
+        min_promo_products = int(min_promo) if min_promo else None
+        data = paginator.paginate(analytics_repo.get_promo_analysis_by_store(
+            filters=filters,
+            min_promo_products=min_promo_products,
+            engine=engine
+        ))
+        
+        data = _serialize_rows(data)
         
         if not data:
             return Response({
@@ -233,20 +320,16 @@ def promo_analysis_by_store_view(request):
                 'statistics': {}
             })
         
-        max_promo_store = max(data, key=lambda x: x['promo_products'])
-        
-        statistics = {
-            'total_stores': len(data),
-            'total_promo_products': sum(item['promo_products'] for item in data),
-            'avg_discount_percent': sum(item['avg_discount_percent'] for item in data) / len(data),
-            'total_savings': sum(item['total_savings'] for item in data),
-            'max_discount_percent': max(item['avg_discount_percent'] for item in data),
-            'store_with_most_promos': max_promo_store['store_name']
-        }
+        statistics = _serialize_value(analytics_repo.get_promo_analysis_by_store_statistics(
+            filters=filters,
+            min_promo_products=min_promo_products,
+            engine=engine
+        ))
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
@@ -260,23 +343,29 @@ def promo_analysis_by_store_view(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get
 def product_creation_dynamics_view(request):
     try:
-        queryset = analytics_repo.get_product_creation_dynamics()
-        
-        product_type_filter = request.GET.get('product_type', None)
-        if product_type_filter:
-            queryset = queryset.filter(product_type_name__icontains=product_type_filter)
-        
-        data = list(queryset)
-        
-        # Конвертуємо Decimal в float та дати в str
-        for item in data:
-            for key, value in item.items():
-                if isinstance(value, Decimal):
-                    item[key] = float(value)
-                elif key == 'month':
-                    item[key] = str(value)
+        granularity = request.GET.get('granularity', GRANULARITY_MONTH)
+        if granularity not in GRANULARITIES:
+            return Response(
+                {'error': f"granularity must be one of: {', '.join(GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            filters = _analytics_filters(request)
+            paginator = KeysetPaginator.from_request(request, ('period', 'product_type_name'))
+            rows = analytics_repo.get_creation_dynamics(granularity=granularity, filters=filters)
+        except ValueError as e:
+            return _bad_request(e)
+        
+        rows = paginator.paginate(rows)
+        data = _serialize_rows(rows)
+        if granularity == GRANULARITY_MONTH:
+            # month — у форматі, який поле мало до денних зведень: початок місяця з часовим поясом
+            for item, row in zip(data, rows):
+                item['month'] = str(month_start(row['period']))
         
         if not data:
             return Response({
@@ -284,31 +373,89 @@ def product_creation_dynamics_view(request):
                 'statistics': {}
             })
         
-        # Підрахунки без pandas
-        monthly_totals = {}
-        unique_months = set()
-        unique_types = set()
-        
-        for item in data:
-            month = item['month']
-            unique_months.add(month)
-            unique_types.add(item['product_type_name'])
-            monthly_totals[month] = monthly_totals.get(month, 0) + item['products_added']
-        
-        peak_month = max(monthly_totals, key=monthly_totals.get) if monthly_totals else None
-        
-        statistics = {
-            'total_months': len(unique_months),
-            'total_products_added': sum(item['products_added'] for item in data),
-            'avg_products_per_month': sum(monthly_totals.values()) / len(monthly_totals) if monthly_totals else 0,
-            'peak_month': peak_month,
-            'peak_month_count': monthly_totals.get(peak_month, 0) if peak_month else 0,
-            'product_types_tracked': len(unique_types)
-        }
+        statistics = _serialize_value(analytics_repo.get_creation_dynamics_statistics(
+            granularity=granularity, filters=filters
+        ))
         
         response_data = {
             'data': data,
-            'statistics': statistics
+            'statistics': statistics,
+            'pagination': paginator.metadata()
+        }
+        
+        return Response(response_data, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional_get
+def price_changes_view(request):
+    try:
+        try:
+            filters = AnalyticsFilters.coerce(
+                date_from=request.GET.get('date_from'), date_to=request.GET.get('date_to')
+            )
+            if filters.date_from is None:
+                raise ValueError('date_from is required')
+            product = request.GET.get('product')
+            product_ids = [int(part) for part in product.split(',') if part.strip()] if product else None
+            paginator = KeysetPaginator.from_request(request, ('observed_at', 'id'))
+        except ValueError as e:
+            return _bad_request(e)
+        
+        start, end = day_bounds(filters.date_from, filters.date_to)
+        data = paginator.paginate(repository_registry.price_history.get_price_changes(
+            start, end, product_ids=product_ids
+        ))
+        
+        response_data = {
+            'data': PriceObservationSerializer(data, many=True).data,
+            'pagination': paginator.metadata()
+        }
+        
+        return Response(response_data, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional_get
+def prices_as_of_view(request):
+    try:
+        try:
+            if not request.GET.get('at'):
+                raise ValueError('at is required')
+            at = as_of_moment(request.GET['at'])
+            filters = AnalyticsFilters.coerce(store_ids=request.GET.get('store'))
+            product = request.GET.get('product')
+            product_ids = [int(part) for part in product.split(',') if part.strip()] if product else None
+            paginator = KeysetPaginator.from_request(request, ('product_id',))
+        except ValueError as e:
+            return _bad_request(e)
+        
+        data = paginator.paginate(repository_registry.price_history.get_prices_as_of(
+            at,
+            product_ids=product_ids,
+            store_ids=filters.store_ids,
+            after=paginator.after[0] if paginator.after else None,
+            limit=paginator.page_size + 1,
+        ))
+        
+        response_data = {
+            'at': at,
+            'data': PriceSnapshotSerializer(data, many=True).data,
+            'pagination': paginator.metadata()
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
@@ -318,3 +465,12 @@ def product_creation_dynamics_view(request):
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def analytics_cache_stats_view(request):
+    if not hasattr(analytics_repo, 'stats'):
+        return Response({'enabled': False})
+    
+    return Response({'enabled': True, **analytics_repo.stats()})
@@ -0,0 +1,75 @@
+"""Умовні GET для каталогу й аналітики: ETag і Last-Modified з версії даних.
+
+Версія даних (monitoring.changes) змінюється при кожному записі продуктів, магазинів,
+типів та історії цін, тож ETag рахується з неї, URL і формату відповіді без жодного
+запиту до бази. Збіг If-None-Match (або If-Modified-Since) дає 304 ще до виклику view.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from monitoring.changes import get_data_watermark
+
+
+def _etag(request, version):
+    # Відповідь залежить від даних, запиту, формату й «сьогодні» (діапазони дат за замовчуванням)
+    renderer = getattr(request, "accepted_renderer", None)
+    seed = ":".join((
+        str(version),
+        timezone.localdate().isoformat(),
+        request.get_full_path(),
+        getattr(renderer, "format", "") or "",
+    ))
+    return f'"{hashlib.blake2b(seed.encode(), digest_size=16).hexdigest()}"'
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        # If-None-Match має пріоритет над If-Modified-Since (RFC 9110, 13.2.2)
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in parse_etags(if_none_match)]
+        return "*" in tags or etag in tags
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return if_modified_since is not None and int(last_modified) <= if_modified_since
+
+
+def _set_headers(request, response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    visibility = {"private": True} if request.user and request.user.is_authenticated else {"public": True}
+    patch_cache_control(response, max_age=settings.API_CACHE_MAX_AGE, must_revalidate=True, **visibility)
+    patch_vary_headers(response, ("Accept", "Authorization", "Cookie"))
+    return response
+
+
+def conditional_get(view=None, *, exempt=None):
+    """Декоратор DRF-view (функції або методу через method_decorator).
+
+    exempt(request) -> True вимикає умовну обробку для запиту, відповідь якого
+    не визначається версією даних (наприклад, наближені звіти зі скетчів).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or not settings.API_CONDITIONAL_GET \
+                    or (exempt is not None and exempt(request)):
+                return view(request, *args, **kwargs)
+
+            version, last_modified = get_data_watermark()
+            etag = _etag(request, version)
+            if _not_modified(request, etag, last_modified):
+                return _set_headers(request, Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                _set_headers(request, response, etag, last_modified)
+            return response
+        return wrapper
+
+    return decorator if view is None else decorator(view)
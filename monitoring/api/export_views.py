@@ -0,0 +1,32 @@
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+
+from monitoring.export import CONTENT_TYPES, FORMAT_PARQUET, ExportError, get_dataset, stream_export, validate_format
+
+
+def export_response(dataset, export_format):
+    try:
+        export = get_dataset(dataset)
+        chunks = stream_export(export, validate_format(export_format))
+        first = next(chunks)
+    except ExportError as error:
+        raise ValidationError(str(error))
+
+    def content():
+        yield first
+        yield from chunks
+
+    response = StreamingHttpResponse(content(), content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{export.name}.{export_format}"'
+    # Проксі (nginx) не повинен буферизувати потік — клієнт отримує чанки одразу
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_dataset_view(request, dataset):
+    # ?export_format=, бо format зарезервований DRF під вибір рендерера
+    return export_response(dataset, request.GET.get('export_format', FORMAT_PARQUET))
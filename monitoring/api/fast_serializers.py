@@ -0,0 +1,202 @@
+"""Швидкий шлях серіалізації списків лише для читання.
+
+ValuesSerializer компілює декларацію ModelSerializer один раз: для кожного поля —
+lookup для values() і конвертер значення. Рядок списку — це словник з values(),
+тож на сторінку не створюються ні моделі, ні екземпляри полів DRF. Вкладені
+серіалізатори на FK (store_info, product_type_info) будуються один раз на id
+за сторінку. Вихід збігається з ModelSerializer байт у байт.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+Converter = Callable[[Any], Any]
+
+
+def _text(value):
+    return value if type(value) is str else str(value)
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field: serializers.DecimalField) -> Optional[Converter]:
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return None
+    exponent = -field.decimal_places
+    to_representation = field.to_representation
+
+    def convert(value):
+        # DecimalField моделі з тими ж decimal_places уже квантований — лишається форматування
+        if type(value) is Decimal and value.as_tuple().exponent == exponent:
+            return f"{value:f}"
+        return to_representation(value)
+    return convert
+
+
+def _date_converter(field: serializers.DateField) -> Optional[Converter]:
+    if getattr(field, "format", api_settings.DATE_FORMAT) != ISO_8601:
+        return None
+    to_representation = field.to_representation
+
+    def convert(value):
+        return value.isoformat() if type(value) is date else to_representation(value)
+    return convert
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable[[], Converter]:
+    # Часовий пояс поля залежить від активного поясу запиту, тож конвертер прив'язується на кожен виклик
+    to_representation = field.to_representation
+    if getattr(field, "format", api_settings.DATETIME_FORMAT) != ISO_8601:
+        return lambda: to_representation
+
+    def bind():
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if field_timezone is None:
+            return to_representation
+
+        def convert(value):
+            if type(value) is str or value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+        return convert
+    return bind
+
+
+def _converter(field: serializers.Field) -> Callable[[], Converter]:
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+
+    convert: Optional[Converter] = None
+    if isinstance(field, serializers.DecimalField):
+        convert = _decimal_converter(field)
+    elif isinstance(field, serializers.DateField):
+        convert = _date_converter(field)
+    elif isinstance(field, serializers.CharField):
+        convert = _text
+    elif isinstance(field, (serializers.IntegerField, serializers.BooleanField)):
+        # З бази приходять уже int/bool
+        convert = _identity
+    elif isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        # values() дає сам id
+        convert = _identity
+    convert = convert or field.to_representation
+    return lambda: convert
+
+
+@dataclass(frozen=True)
+class _CompiledField:
+    key: str
+    lookup: str
+    converter: Optional[Callable[[], Converter]] = None
+    nested: Optional["_CompiledSerializer"] = None
+
+
+@dataclass(frozen=True)
+class _CompiledSerializer:
+    fields: Tuple[_CompiledField, ...]
+
+    @property
+    def lookups(self) -> Tuple[str, ...]:
+        lookups: List[str] = []
+        for field in self.fields:
+            lookups.append(field.lookup)
+            if field.nested is not None:
+                lookups.extend(field.nested.lookups)
+        return tuple(dict.fromkeys(lookups))
+
+    def bind(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        entries = []
+        for field in self.fields:
+            if field.nested is None:
+                entries.append((field.key, field.lookup, field.converter(), False))
+            else:
+                entries.append((field.key, field.lookup, _cached(field.nested.bind()), True))
+
+        def serialize(row):
+            result = {}
+            for key, lookup, convert, nested in entries:
+                value = row[lookup]
+                if value is None:
+                    result[key] = None
+                elif nested:
+                    result[key] = convert(value, row)
+                else:
+                    result[key] = convert(value)
+            return result
+        return serialize
+
+
+def _cached(serialize):
+    # Вкладений об'єкт (магазин, тип) однаковий для всіх рядків сторінки з тим самим id
+    cache: Dict[Any, Dict[str, Any]] = {}
+
+    def build(related_id, row):
+        value = cache.get(related_id)
+        if value is None:
+            value = cache[related_id] = serialize(row)
+        return dict(value)
+    return build
+
+
+def _compile(serializer: serializers.BaseSerializer, prefix: str = "") -> _CompiledSerializer:
+    model = serializer.Meta.model
+    compiled = []
+    for key, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == "*" or isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            raise ImproperlyConfigured(f"{type(serializer).__name__}.{key} cannot be read from values()")
+        lookup = prefix + "__".join(field.source_attrs)
+        if not isinstance(field, serializers.BaseSerializer):
+            compiled.append(_CompiledField(key, lookup, converter=_converter(field)))
+            continue
+        model_field = model._meta.get_field(field.source_attrs[0])
+        if len(field.source_attrs) > 1 or not (model_field.many_to_one or model_field.one_to_one) \
+                or not model_field.concrete:
+            raise ImproperlyConfigured(f"{type(serializer).__name__}.{key} must serialize a forward relation")
+        compiled.append(_CompiledField(key, lookup, nested=_compile(field, lookup + "__")))
+    return _CompiledSerializer(tuple(compiled))
+
+
+class ValuesSerializer:
+    """Серіалізатор лише для читання: ModelSerializer, скомпільований під рядки values()."""
+
+    def __init__(self, serializer_class) -> None:
+        self.serializer_class = serializer_class
+        self._compiled: Optional[_CompiledSerializer] = None
+
+    @property
+    def compiled(self) -> _CompiledSerializer:
+        # Поля серіалізатора будуються ліниво — компілюємо при першому використанні, а не при імпорті
+        if self._compiled is None:
+            self._compiled = _compile(self.serializer_class())
+        return self._compiled
+
+    @property
+    def lookups(self) -> Tuple[str, ...]:
+        return self.compiled.lookups
+
+    def serialize(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        serialize = self.compiled.bind()
+        return [serialize(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def values_serializer(serializer_class) -> ValuesSerializer:
+    # Один скомпільований ValuesSerializer на клас, зокрема на кожен розріджений набір полів
+    return ValuesSerializer(serializer_class)
@@ -0,0 +1,51 @@
+"""Розріджені набори полів: ?fields=id,sku,regular_price&expand=store_info.
+
+Для кожного набору полів будується (і кешується) підклас серіалізатора з урізаним
+Meta.fields. Далі все працює як для звичайного серіалізатора: read_plan дає під нього
+only()/select_related(), ValuesSerializer — lookups для values(), тож непотрібні
+колонки й JOIN-и не потрапляють у SQL.
+"""
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def _names(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(name.strip() for name in (value or "").split(",") if name.strip())
+
+
+def _nested_fields(serializer_class):
+    return [
+        name for name, field in serializer_class._declared_fields.items()
+        if isinstance(field, serializers.BaseSerializer)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _sparse_serializer(serializer_class, selected: FrozenSet[str]):
+    fields = tuple(name for name in serializer_class.Meta.fields if name in selected)
+    meta = type("Meta", (serializer_class.Meta,), {"fields": fields})
+    return type(serializer_class.__name__, (serializer_class,), {"Meta": meta, "__module__": __name__})
+
+
+def sparse_serializer(serializer_class, fields: Optional[str] = None, expand: Optional[str] = None):
+    """Серіалізатор лише з полями з ?fields= плюс вкладеними з ?expand=.
+
+    Без ?fields= повертається повний серіалізатор. id включається завжди: за ним
+    курсорна пагінація та посилання на об'єкт.
+    """
+    requested, expanded = _names(fields), _names(expand)
+    available = set(serializer_class.Meta.fields)
+    nested = _nested_fields(serializer_class)
+
+    unknown = sorted(requested - available)
+    if unknown:
+        raise ValidationError({"fields": f"unknown fields: {', '.join(unknown)}; available: {', '.join(serializer_class.Meta.fields)}"})
+    unknown = sorted(expanded - set(nested))
+    if unknown:
+        raise ValidationError({"expand": f"unknown relations: {', '.join(unknown)}; available: {', '.join(nested) or '-'}"})
+    if not requested:
+        return serializer_class
+    return _sparse_serializer(serializer_class, frozenset(requested | expanded | {"id"}))
@@ -0,0 +1,166 @@
+"""Keyset-пагінація звітів аналітики.
+
+Курсор — це значення ключа сортування останнього рядка сторінки, тож наступна
+сторінка продовжується з нього (WHERE key > cursor) замість OFFSET, і її ціна
+не залежить від глибини.
+"""
+import base64
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+from decimal import Decimal
+from functools import total_ordering
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from rest_framework.pagination import CursorPagination
+
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+
+_DECODERS = {
+    'decimal': Decimal,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'value': lambda value: value,
+}
+
+
+def _encode_value(value):
+    if hasattr(value, 'item'):
+        # Скаляри NumPy з колонкового рушія
+        value = value.item()
+    if isinstance(value, Decimal):
+        return ['decimal', str(value)]
+    if isinstance(value, datetime):
+        return ['datetime', value.isoformat()]
+    if isinstance(value, date):
+        return ['date', value.isoformat()]
+    return ['value', value]
+
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = tuple(_DECODERS[kind](value) for kind, value in json.loads(payload))
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('cursor is invalid')
+    if len(values) != size:
+        raise ValueError('cursor is invalid')
+    return values
+
+
+def parse_page_size(value, default=None):
+    if value is None or value == '':
+        page_size = default or settings.ANALYTICS_PAGE_SIZE
+    else:
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValueError('page_size must be a positive integer')
+        if page_size < 1:
+            raise ValueError('page_size must be a positive integer')
+    return min(page_size, settings.ANALYTICS_MAX_PAGE_SIZE)
+
+
+@total_ordering
+class _Descending:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class KeysetPaginator:
+    """ordering — поля сортування як у order_by; останнє поле має бути унікальним у межах звіту."""
+
+    def __init__(self, ordering, page_size, cursor=None):
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+        self.descending = tuple(field.startswith('-') for field in self.ordering)
+        self.page_size = page_size
+        self.after = decode_cursor(cursor, len(self.fields)) if cursor else None
+        self.next_cursor = None
+
+    @classmethod
+    def from_request(cls, request, ordering, page_size=None):
+        if page_size is None:
+            page_size = parse_page_size(request.GET.get(PAGE_SIZE_PARAM))
+        return cls(ordering, page_size, request.GET.get(CURSOR_PARAM) or None)
+
+    def paginate(self, rows):
+        # Зрізаний QuerySet (репозиторій уже обмежив звіт) не можна пересортувати — це вже сторінка
+        if isinstance(rows, QuerySet) and not rows.query.is_sliced:
+            rows = self._queryset_rows(rows)
+        else:
+            rows = self._list_rows(rows)
+
+        page = rows[:self.page_size]
+        if len(rows) > self.page_size:
+            self.next_cursor = encode_cursor(self._values(page[-1]))
+        return page
+
+    def metadata(self):
+        return {
+            'page_size': self.page_size,
+            'next_cursor': self.next_cursor,
+            'has_more': self.next_cursor is not None,
+        }
+
+    def _queryset_rows(self, queryset):
+        queryset = queryset.order_by(*self.ordering)
+        if self.after is not None:
+            queryset = queryset.filter(self._after_filter())
+        return list(queryset[:self.page_size + 1])
+
+    def _after_filter(self):
+        # (a, b) після (x, y): a далі за x, або a = x і b далі за y
+        condition = None
+        for field, descending, value in reversed(list(zip(self.fields, self.descending, self.after))):
+            beyond = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+            condition = beyond if condition is None else beyond | (Q(**{field: value}) & condition)
+        return condition
+
+    def _list_rows(self, rows):
+        # Результати з кешу чи рушіїв уже в пам'яті: впорядковуємо і шукаємо курсор бінарно
+        rows = sorted(rows, key=self._sort_key)
+        start = 0
+        if self.after is not None:
+            start = bisect_right(rows, self._key(self.after), key=self._sort_key)
+        return rows[start:start + self.page_size + 1]
+
+    def _values(self, row):
+        return tuple(row[field] for field in self.fields)
+
+    def _key(self, values):
+        return tuple(
+            _Descending(value) if descending else value
+            for value, descending in zip(values, self.descending)
+        )
+
+    def _sort_key(self, row):
+        return self._key(self._values(row))
+
+
+class CrudCursorPagination(CursorPagination):
+    """Курсорна пагінація списків CRUD за первинним ключем: сторінка — WHERE id > курсор, без OFFSET."""
+
+    ordering = 'id'
+    page_size_query_param = PAGE_SIZE_PARAM
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,44 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer для даних, уже зведених до str/int/bool/None (див. ValuesSerializer).
+
+    Вихід той самий, що в JSONRenderer з налаштуваннями за замовчуванням (компактний, без
+    екранування не-ASCII); orjson, якщо встановлений, інакше json без проходу через default.
+    Відступи (?indent у Accept) і нестандартні налаштування віддаються батьківському класу.
+    """
+
+    _encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), allow_nan=False, default=encoders.JSONEncoder().default
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not (self.compact and not self.ensure_ascii and self.strict) or \
+                self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if orjson is not None:
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=self._encoder.default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS,
+                )
+            except (orjson.JSONEncodeError, TypeError):
+                return super().render(data, accepted_media_type, renderer_context)
+        else:
+            ret = self._encoder.encode(data).encode()
+        # Як і JSONRenderer: U+2028/U+2029 валідні в JSON, але не в JavaScript
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from monitoring.models import ProductType, Store, Product
+from monitoring.prices import from_kopecks
 
 
 class ProductTypeSerializer(serializers.ModelSerializer):
@@ -90,3 +91,52 @@ class ProductSerializer(serializers.ModelSerializer):
             "promo_ends_at": {"required": False, "allow_null": True},
             "is_active": {"required": False},
         }
+
+
+class ProductBulkSerializer(ProductSerializer):
+    # Зв'язки й унікальність name/sku перевіряє ProductBulkWriter одним запитом на батч
+    product_type = serializers.IntegerField(min_value=1)
+    store = serializers.IntegerField(min_value=1)
+
+    class Meta(ProductSerializer.Meta):
+        extra_kwargs = {
+            **ProductSerializer.Meta.extra_kwargs,
+            "name": {"validators": []},
+            "sku": {"validators": []},
+        }
+
+
+class KopecksField(serializers.DecimalField):
+    # Історія цін зберігає копійки; назовні — той самий формат, що й ціни Product
+    def to_representation(self, value):
+        return super().to_representation(from_kopecks(value))
+
+
+class PriceObservationSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    product = serializers.IntegerField(source="product_id", read_only=True)
+    observed_at = serializers.DateTimeField(read_only=True)
+    regular_price = KopecksField(source="regular_price_kop", max_digits=8, decimal_places=2, read_only=True)
+    promo_price = KopecksField(source="promo_price_kop", max_digits=8, decimal_places=2, read_only=True)
+
+
+class PriceSnapshotSerializer(serializers.Serializer):
+    product = serializers.IntegerField(source="product_id", read_only=True)
+    store = serializers.IntegerField(source="store_id", read_only=True)
+    observed_at = serializers.DateTimeField(read_only=True)
+    regular_price = KopecksField(source="regular_price_kop", max_digits=8, decimal_places=2, read_only=True)
+    promo_price = KopecksField(source="promo_price_kop", max_digits=8, decimal_places=2, read_only=True)
+    # raw — точне спостереження, hour/day — контрольна точка з бару
+    source = serializers.CharField(read_only=True)
+
+
+class PriceBarSerializer(serializers.Serializer):
+    product = serializers.IntegerField(source="product_id", read_only=True)
+    resolution = serializers.CharField(read_only=True)
+    bucket_start = serializers.DateTimeField(read_only=True)
+    open = KopecksField(source="open_kop", max_digits=8, decimal_places=2, read_only=True)
+    high = KopecksField(source="high_kop", max_digits=8, decimal_places=2, read_only=True)
+    low = KopecksField(source="low_kop", max_digits=8, decimal_places=2, read_only=True)
+    close = KopecksField(source="close_kop", max_digits=8, decimal_places=2, read_only=True)
+    had_promo = serializers.BooleanField(read_only=True)
+    observation_count = serializers.IntegerField(read_only=True)
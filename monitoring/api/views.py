@@ -1,29 +1,80 @@
+import io
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils.decorators import method_decorator
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from monitoring.analytics.filters import AnalyticsFilters, day_bounds
+from monitoring.analytics.price_bars import RESOLUTIONS
+from monitoring.bulk import BulkItem, BulkReport, ProductBulkWriter
+from monitoring.export import FORMAT_NDJSON
+from monitoring.ingestion import FORMAT_JSONL, FeedError, PriceFeedIngestor, feed_format, text_stream
 from monitoring.repositories import repository_registry
 
-from .serializers import ProductTypeSerializer, StoreSerializer, ProductSerializer
+from .conditional import conditional_get
+from .export_views import export_response
+from .fast_serializers import values_serializer
+from .fieldsets import sparse_serializer
+from .pagination import CrudCursorPagination, KeysetPaginator
+from .renderers import FastJSONRenderer
+from .serializers import (
+    ProductTypeSerializer, StoreSerializer, ProductSerializer, ProductBulkSerializer, PriceObservationSerializer,
+    PriceBarSerializer,
+)
+
+
+class FastListMixin:
+    # list() віддає рядки values() через ValuesSerializer, тож і рендерер може бути швидким;
+    # list() і retrieve() приймають розріджені набори полів
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action != "list" or not settings.API_FAST_LIST_SERIALIZATION:
+            return renderers
+        return [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+
+    def get_read_serializer_class(self, request):
+        # ?fields=/?expand= звужують і JSON, і колонки та JOIN-и запиту
+        return sparse_serializer(
+            self.serializer_class, request.query_params.get("fields"), request.query_params.get("expand")
+        )
+
+    def _list(self, request):
+        paginator = self.pagination_class()
+        repository = self.get_repository()
+        serializer_class = self.get_read_serializer_class(request)
+        if settings.API_FAST_LIST_SERIALIZATION:
+            fast_serializer = values_serializer(serializer_class)
+            page = paginator.paginate_queryset(repository.get_read_values(fast_serializer.lookups), request, view=self)
+            return paginator.get_paginated_response(fast_serializer.serialize(page))
+
+        page = paginator.paginate_queryset(repository.get_read_queryset(serializer_class), request, view=self)
+        serializer = serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class ProductTypeViewSet(viewsets.ViewSet):
+class ProductTypeViewSet(FastListMixin, viewsets.ViewSet):
     serializer_class = ProductTypeSerializer
+    pagination_class = CrudCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_repository(self):
         return repository_registry.product_types
 
+    @method_decorator(conditional_get)
     def list(self, request):
-        queryset = self.get_repository().get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return self._list(request)
 
+    @method_decorator(conditional_get)
     def retrieve(self, request, pk=None):
-        instance = self._get_object(pk)
-        serializer = self.serializer_class(instance)
+        serializer_class = self.get_read_serializer_class(request)
+        instance = self._get_object(pk, serializer_class)
+        serializer = serializer_class(instance)
         return Response(serializer.data)
 
     def create(self, request):
@@ -45,8 +96,8 @@ class ProductTypeViewSet(viewsets.ViewSet):
             raise NotFound("Product type not found.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    def _get_object(self, pk):
-        instance = self.get_repository().get_by_id(pk)
+    def _get_object(self, pk, serializer_class=None):
+        instance = self.get_repository().get_by_id(pk, serializer_class)
         if not instance:
             raise NotFound("Product type not found.")
         return instance
@@ -67,21 +118,23 @@ class ProductTypeViewSet(viewsets.ViewSet):
         return Response(output_serializer.data)
 
 
-class StoreViewSet(viewsets.ViewSet):
+class StoreViewSet(FastListMixin, viewsets.ViewSet):
     serializer_class = StoreSerializer
+    pagination_class = CrudCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_repository(self):
         return repository_registry.stores
 
+    @method_decorator(conditional_get)
     def list(self, request):
-        queryset = self.get_repository().get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return self._list(request)
 
+    @method_decorator(conditional_get)
     def retrieve(self, request, pk=None):
-        instance = self._get_object(pk)
-        serializer = self.serializer_class(instance)
+        serializer_class = self.get_read_serializer_class(request)
+        instance = self._get_object(pk, serializer_class)
+        serializer = serializer_class(instance)
         return Response(serializer.data)
 
     def create(self, request):
@@ -103,8 +156,8 @@ class StoreViewSet(viewsets.ViewSet):
             raise NotFound("Store not found.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    def _get_object(self, pk):
-        instance = self.get_repository().get_by_id(pk)
+    def _get_object(self, pk, serializer_class=None):
+        instance = self.get_repository().get_by_id(pk, serializer_class)
         if not instance:
             raise NotFound("Store not found.")
         return instance
@@ -125,21 +178,23 @@ class StoreViewSet(viewsets.ViewSet):
         return Response(output_serializer.data)
 
 
-class ProductViewSet(viewsets.ViewSet):
+class ProductViewSet(FastListMixin, viewsets.ViewSet):
     serializer_class = ProductSerializer
+    pagination_class = CrudCursorPagination
     permission_classes = [AllowAny]
 
     def get_repository(self):
         return repository_registry.products
 
+    @method_decorator(conditional_get)
     def list(self, request):
-        queryset = self.get_repository().get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return self._list(request)
 
+    @method_decorator(conditional_get)
     def retrieve(self, request, pk=None):
-        instance = self._get_object(pk)
-        serializer = self.serializer_class(instance)
+        serializer_class = self.get_read_serializer_class(request)
+        instance = self._get_object(pk, serializer_class)
+        serializer = serializer_class(instance)
         return Response(serializer.data)
 
     def create(self, request):
@@ -166,8 +221,119 @@ class ProductViewSet(viewsets.ViewSet):
         report_data = self.get_repository().get_report_by_stores()
         return Response(report_data)
 
-    def _get_object(self, pk):
-        instance = self.get_repository().get_by_id(pk)
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def export(self, request):
+        # Увесь каталог потоком з назвами типу, магазину й міста; ?export_format=ndjson|csv (або parquet|arrow)
+        return export_response("products", request.query_params.get("export_format", FORMAT_NDJSON))
+
+    @action(detail=False, methods=["post", "put", "patch", "delete"], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        # Масив до API_BULK_MAX_ITEMS елементів; для DELETE — масив id. Результат — статус на кожен елемент
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError("request body must be a JSON array")
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            raise ValidationError(f"at most {settings.API_BULK_MAX_ITEMS} items per request")
+
+        report = BulkReport()
+        writer = ProductBulkWriter()
+        try:
+            if request.method == "DELETE":
+                writer.delete(items, report)
+            elif request.method == "POST":
+                writer.create(self._bulk_items(items, report, with_id=False), report)
+            else:
+                writer.update(self._bulk_items(items, report, with_id=True, partial=request.method == "PATCH"), report)
+        except IntegrityError as error:
+            # Конкурентний запис між перевіркою й вставкою — батч відкочено цілком
+            return Response({"detail": f"batch rolled back: {error}"}, status=status.HTTP_409_CONFLICT)
+        return Response(report.as_dict())
+
+    def _bulk_items(self, items, report, with_id, partial=False):
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                report.add_error(index, 400, {"non_field_errors": ["Expected an object."]})
+                continue
+            object_id = None
+            if with_id:
+                object_id = item.get("id")
+                if isinstance(object_id, bool) or not isinstance(object_id, int) or object_id < 1:
+                    report.add_error(index, 400, {"id": ["A valid integer is required."]})
+                    continue
+            serializer = ProductBulkSerializer(data=item, partial=partial)
+            if not serializer.is_valid():
+                report.add_error(index, 400, serializer.errors, object_id)
+                continue
+            valid.append(BulkItem(index, dict(serializer.validated_data), object_id))
+        return valid
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated])
+    def ingest(self, request):
+        # Файл фіду в multipart-полі file або сирим тілом text/csv чи application/x-ndjson
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                raise ValidationError("file is required")
+            binary, name = upload.file, upload.name
+        else:
+            binary = io.BytesIO(request.body)
+            name = FORMAT_JSONL if "ndjson" in request.content_type or "jsonl" in request.content_type else None
+        try:
+            format = feed_format(request.query_params.get("feed_format") or name)
+        except FeedError as error:
+            raise ValidationError(str(error))
+
+        report = PriceFeedIngestor(
+            create_missing=request.query_params.get("create", "true").lower() not in ("0", "false", "no")
+        ).ingest(text_stream(binary), format)
+        return Response(report.as_dict())
+
+    @action(detail=True, methods=["get"], url_path="price-history")
+    def price_history(self, request, pk=None):
+        instance = self._get_object(pk)
+        try:
+            filters = AnalyticsFilters.coerce(
+                date_from=request.GET.get("date_from"), date_to=request.GET.get("date_to")
+            )
+            paginator = KeysetPaginator.from_request(request, ("observed_at", "id"))
+        except ValueError as error:
+            raise ValidationError(str(error))
+
+        start, end = day_bounds(filters.date_from, filters.date_to)
+        observations = paginator.paginate(
+            repository_registry.price_history.get_price_series(instance.pk, start=start, end=end)
+        )
+        return Response({
+            "data": PriceObservationSerializer(observations, many=True).data,
+            "pagination": paginator.metadata(),
+        })
+
+    @action(detail=True, methods=["get"], url_path="price-bars")
+    def price_bars(self, request, pk=None):
+        # resolution=auto — найгрубша роздільність, якої досить для діапазону
+        instance = self._get_object(pk)
+        resolution = request.GET.get("resolution", "auto")
+        if resolution != "auto" and resolution not in RESOLUTIONS:
+            raise ValidationError(f"resolution must be one of: auto, {', '.join(RESOLUTIONS)}")
+        try:
+            filters = AnalyticsFilters.coerce(
+                date_from=request.GET.get("date_from"), date_to=request.GET.get("date_to")
+            )
+        except ValueError as error:
+            raise ValidationError(str(error))
+
+        start, end = day_bounds(filters.date_from, filters.date_to)
+        resolution, bars = repository_registry.price_history.get_price_bars(
+            instance.pk, start=start, end=end, resolution=None if resolution == "auto" else resolution
+        )
+        return Response({
+            "resolution": resolution,
+            "data": PriceBarSerializer(bars, many=True).data,
+        })
+
+    def _get_object(self, pk, serializer_class=None):
+        instance = self.get_repository().get_by_id(pk, serializer_class)
         if not instance:
             raise NotFound("Product not found.")
         return instance
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from django.db import transaction
+from django.utils import timezone
+
+from monitoring.changes import ProductState, bump_data_version, deferred_propagation, propagate_product_changes
+from monitoring.models import Product, ProductType, Store
+
+
+logger = logging.getLogger(__name__)
+
+# Поле запиту -> (модель, атрибут Product)
+REFERENCES = {
+    "product_type": (ProductType, "product_type_id"),
+    "store": (Store, "store_id"),
+}
+UNIQUE_FIELDS = ("name", "sku")
+BATCH_SIZE = 1000
+
+
+@dataclass
+class BulkItem:
+    index: int
+    data: Dict[str, Any]
+    object_id: Optional[int] = None
+
+
+@dataclass
+class BulkReport:
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+    def add_result(self, index: int, status: int, object_id: Optional[int] = None) -> None:
+        self.results.append({"index": index, "status": status, "id": object_id})
+
+    def add_error(self, index: int, status: int, errors: Any, object_id: Optional[int] = None) -> None:
+        self.failed += 1
+        self.results.append({"index": index, "status": status, "id": object_id, "errors": errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "results": sorted(self.results, key=lambda result: result["index"]),
+        }
+
+
+def _object_id(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        object_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return object_id if object_id > 0 and str(object_id) == str(value).strip() else None
+
+
+class ProductBulkWriter:
+    """Пакетні create/update/delete продуктів: на батч — по запиту на кожен довідник і унікальне поле,
+    запис через bulk_create/bulk_update в одній транзакції.
+
+    Поля елементів уже провалідовані серіалізатором; тут — лише те, що потребує бази.
+    Записи йдуть в обхід сигналів, тож зміни поширюємо через propagate_product_changes.
+    """
+
+    def create(self, items: List[BulkItem], report: BulkReport) -> None:
+        items = self._check_unique(self._check_references(items, report), report)
+        if not items:
+            return
+
+        with transaction.atomic():
+            products = Product.objects.bulk_create([self._product(item.data) for item in items], batch_size=BATCH_SIZE)
+            if any(product.pk is None for product in products):
+                # Бекенди без RETURNING (MySQL) не повертають id — дочитуємо одним запитом
+                ids = dict(Product.objects.filter(sku__in=[product.sku for product in products]).values_list("sku", "id"))
+                for product in products:
+                    product.pk = ids[product.sku]
+            propagate_product_changes([(None, ProductState.from_instance(product)) for product in products])
+        bump_data_version()
+
+        for item, product in zip(items, products):
+            report.add_result(item.index, 201, product.pk)
+        report.created += len(products)
+        logger.info(f"Bulk created {len(products)} products")
+
+    def update(self, items: List[BulkItem], report: BulkReport) -> None:
+        existing = Product.objects.in_bulk([item.object_id for item in items])
+        pending, seen = [], set()
+        for item in items:
+            if item.object_id not in existing:
+                report.add_error(item.index, 404, {"id": ["Product not found."]}, item.object_id)
+            elif item.object_id in seen:
+                report.add_error(item.index, 400, {"id": ["Duplicate id in batch."]}, item.object_id)
+            else:
+                seen.add(item.object_id)
+                pending.append(item)
+
+        pending = self._check_unique(self._check_references(pending, report), report)
+        if not pending:
+            return
+
+        now = timezone.now()
+        changed, changes, fields = [], [], {"updated_at"}
+        for item in pending:
+            product = existing[item.object_id]
+            old_state = ProductState.from_instance(product)
+            for name, value in item.data.items():
+                attribute = REFERENCES[name][1] if name in REFERENCES else name
+                setattr(product, attribute, value)
+                fields.add(attribute)
+            product.updated_at = now
+            changed.append(product)
+            changes.append((old_state, ProductState.from_instance(product)))
+
+        with transaction.atomic():
+            Product.objects.bulk_update(changed, sorted(fields), batch_size=BATCH_SIZE)
+            propagate_product_changes(changes)
+        bump_data_version()
+
+        for item in pending:
+            report.add_result(item.index, 200, item.object_id)
+        report.updated += len(changed)
+        logger.info(f"Bulk updated {len(changed)} products")
+
+    def delete(self, items: List[Any], report: BulkReport) -> None:
+        requested = []
+        for index, value in enumerate(items):
+            object_id = _object_id(value)
+            if object_id is None:
+                report.add_error(index, 400, {"id": ["A valid integer is required."]})
+            else:
+                requested.append((index, object_id))
+
+        found = set(Product.objects.filter(pk__in=[object_id for _, object_id in requested]).values_list("id", flat=True))
+        deleted: Set[int] = set()
+        for index, object_id in requested:
+            if object_id in found and object_id not in deleted:
+                deleted.add(object_id)
+                report.add_result(index, 204, object_id)
+            else:
+                report.add_error(index, 404, {"id": ["Product not found."]}, object_id)
+        if not deleted:
+            return
+
+        # Каскад і сигнали post_delete лишаються за Django, але зведення оновлюються одним flush
+        with transaction.atomic(), deferred_propagation():
+            Product.objects.filter(pk__in=deleted).delete()
+        report.deleted += len(deleted)
+        logger.info(f"Bulk deleted {len(deleted)} products")
+
+    def _product(self, data: Dict[str, Any]) -> Product:
+        values = {REFERENCES[name][1] if name in REFERENCES else name: value for name, value in data.items()}
+        return Product(**values)
+
+    def _check_references(self, items: List[BulkItem], report: BulkReport) -> List[BulkItem]:
+        # На кожен довідник один запит на весь батч
+        known = {}
+        for name, (model, _) in REFERENCES.items():
+            ids = {item.data[name] for item in items if name in item.data}
+            known[name] = set(model._default_manager.filter(pk__in=ids).values_list("id", flat=True)) if ids else set()
+
+        valid = []
+        for item in items:
+            errors = {
+                name: [f'Invalid pk "{item.data[name]}" - object does not exist.']
+                for name in REFERENCES if name in item.data and item.data[name] not in known[name]
+            }
+            if errors:
+                report.add_error(item.index, 400, errors, item.object_id)
+            else:
+                valid.append(item)
+        return valid
+
+    def _check_unique(self, items: List[BulkItem], report: BulkReport) -> List[BulkItem]:
+        # Зайняті значення в базі — запит на поле; дублікати всередині батчу — перший виграє
+        taken = {}
+        for name in UNIQUE_FIELDS:
+            values = {item.data[name] for item in items if name in item.data}
+            taken[name] = dict(Product.objects.filter(**{f"{name}__in": values}).values_list(name, "id")) if values else {}
+
+        valid, claimed = [], {name: set() for name in UNIQUE_FIELDS}
+        for item in items:
+            errors = {}
+            for name in UNIQUE_FIELDS:
+                if name not in item.data:
+                    continue
+                value = item.data[name]
+                owner = taken[name].get(value)
+                if (owner is not None and owner != item.object_id) or value in claimed[name]:
+                    errors[name] = [f"product with this {name} already exists."]
+            if errors:
+                report.add_error(item.index, 400, errors, item.object_id)
+                continue
+            for name in UNIQUE_FIELDS:
+                if name in item.data:
+                    claimed[name].add(item.data[name])
+            valid.append(item)
+        return valid
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from monitoring.models import DataVersion, Product
+
+DATA_VERSION_ID = 1
+
+STATE_FIELDS = (
+    "id",
+    "product_type_id",
+    "store_id",
+    "is_active",
+    "regular_price",
+    "promo_price",
+    "created_at",
+)
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+@dataclass(frozen=True)
+class ProductState:
+    id: int
+    product_type_id: int
+    store_id: int
+    is_active: bool
+    regular_price: Decimal
+    promo_price: Optional[Decimal]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_instance(cls, instance: Product) -> "ProductState":
+        return cls(
+            id=instance.pk,
+            product_type_id=instance.product_type_id,
+            store_id=instance.store_id,
+            is_active=instance.is_active,
+            regular_price=_to_decimal(instance.regular_price),
+            promo_price=_to_decimal(instance.promo_price),
+            created_at=instance.created_at,
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "ProductState":
+        return cls(*row)
+
+
+# (старий стан, новий стан); None означає, що продукту не було / він видалений
+ProductChange = Tuple[Optional[ProductState], Optional[ProductState]]
+
+
+def load_product_states(ids: Iterable[int]) -> Dict[int, ProductState]:
+    rows = Product.objects.filter(pk__in=list(ids)).values_list(*STATE_FIELDS)
+    return {row[0]: ProductState.from_row(row) for row in rows}
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_propagation():
+    """Зміни всередині блоку (зокрема з сигналів post_delete) застосовуються одним flush при виході."""
+    if getattr(_deferred, "changes", None) is not None:
+        yield
+        return
+    _deferred.changes = []
+    try:
+        yield
+        changes = _deferred.changes
+    finally:
+        _deferred.changes = None
+    propagate_product_changes(changes)
+
+
+def propagate_product_changes(changes: List[ProductChange]) -> None:
+    buffered = getattr(_deferred, "changes", None)
+    if buffered is not None:
+        buffered.extend(changes)
+        return
+
+    from monitoring.alerts import AlertDelta
+    from monitoring.analytics.price_history import PriceHistoryDelta
+    from monitoring.analytics.rollups import CreationRollupDelta
+    from monitoring.analytics.summaries import SummaryDelta
+    from monitoring.analytics.top_products import TopProductsDelta
+
+    changes = [change for change in changes if change != (None, None)]
+    if not changes:
+        return
+
+    # AlertDelta — після SummaryDelta: читає вже оновлені зведення магазинів
+    deltas = (SummaryDelta(), CreationRollupDelta(), TopProductsDelta(), PriceHistoryDelta(), AlertDelta())
+    for delta in deltas:
+        for old_state, new_state in changes:
+            delta.add_change(old_state, new_state)
+        delta.flush()
+
+
+def get_data_watermark() -> Tuple[int, float]:
+    """(версія даних, час останньої зміни як Unix time) одним запитом."""
+    row = DataVersion.objects.filter(pk=DATA_VERSION_ID).values_list("version", "modified_at").first()
+    if row is None:
+        # Рядка немає (нова чи очищена база): стартуємо з мітки часу, щоб нова версія
+        # не збіглася з жодною з тих, під якими вже лежать результати в кеші
+        now = timezone.now()
+        DataVersion.objects.get_or_create(
+            pk=DATA_VERSION_ID, defaults={"version": int(now.timestamp() * 1000), "modified_at": now}
+        )
+        return get_data_watermark()
+    version, modified_at = row
+    return version, modified_at.timestamp()
+
+
+def get_data_version() -> int:
+    return get_data_watermark()[0]
+
+
+def get_data_modified() -> float:
+    # Час останньої зміни (Unix time) для Last-Modified
+    return get_data_watermark()[1]
+
+
+def bump_data_version() -> None:
+    # Той самий запит у транзакції запису: інші процеси побачать нову версію разом із даними
+    updated = DataVersion.objects.filter(pk=DATA_VERSION_ID).update(
+        version=F("version") + 1, modified_at=timezone.now()
+    )
+    if not updated:
+        get_data_watermark()
+        bump_data_version()
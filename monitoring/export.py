@@ -0,0 +1,303 @@
+"""Експорт каталогу та історії цін: колонковий (Parquet, Arrow IPC) і рядковий (NDJSON, CSV).
+
+Дані читаються чанками по id (keyset), кожен чанк — одна row group / record batch
+або один шматок тексту, тож пам'ять обмежена розміром чанку. У колонкових форматах
+повторювані рядки (тип, магазин, місто) пишуться словниковими колонками.
+pyarrow — опційна залежність: потрібна лише для Parquet та Arrow.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timezone as dt_timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from monitoring.models import PriceObservation, Product, ProductType, Store
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+TEXT_FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+EXPORT_FORMATS = (FORMAT_PARQUET, FORMAT_ARROW, *TEXT_FORMATS)
+
+CONTENT_TYPES = {
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+    FORMAT_ARROW: "application/vnd.apache.arrow.file",
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    lookup: str
+    # int64, string, dictionary, bool, decimal, date, timestamp
+    kind: str
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    model: Any
+    columns: Tuple[ExportColumn, ...]
+
+
+def _column(name: str, kind: str, lookup: Optional[str] = None) -> ExportColumn:
+    return ExportColumn(name, lookup or name, kind)
+
+
+_TIMESTAMPS = (_column("created_at", "timestamp"), _column("updated_at", "timestamp"))
+
+DATASETS: Dict[str, ExportDataset] = {
+    dataset.name: dataset
+    for dataset in (
+        ExportDataset("products", Product, (
+            _column("id", "int64"),
+            _column("sku", "string"),
+            _column("name", "string"),
+            _column("product_type_id", "int64"),
+            _column("product_type", "dictionary", "product_type__name"),
+            _column("store_id", "int64"),
+            _column("store", "dictionary", "store__name"),
+            _column("city", "dictionary", "store__city"),
+            _column("is_active", "bool"),
+            _column("regular_price", "decimal"),
+            _column("promo_price", "decimal"),
+            _column("promo_ends_at", "date"),
+            *_TIMESTAMPS,
+        )),
+        ExportDataset("stores", Store, (
+            _column("id", "int64"),
+            _column("name", "string"),
+            _column("city", "dictionary"),
+            _column("address", "string"),
+            _column("is_active", "bool"),
+            *_TIMESTAMPS,
+        )),
+        ExportDataset("product_types", ProductType, (
+            _column("id", "int64"),
+            _column("name", "string"),
+            _column("slug", "string"),
+            _column("is_active", "bool"),
+            *_TIMESTAMPS,
+        )),
+        ExportDataset("price_history", PriceObservation, (
+            _column("id", "int64"),
+            _column("product_id", "int64"),
+            _column("observed_at", "timestamp"),
+            _column("regular_price_kop", "int64"),
+            _column("promo_price_kop", "int64"),
+        )),
+    )
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ExportError("pyarrow is required for columnar export: pip install pyarrow")
+    return pyarrow
+
+
+def get_dataset(name: str) -> ExportDataset:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ExportError(f"dataset must be one of: {', '.join(DATASETS)}")
+
+
+def validate_format(format: str) -> str:
+    if format not in EXPORT_FORMATS:
+        raise ExportError(f"export format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return format
+
+
+def _arrow_type(pa, kind: str):
+    return {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+        "bool": pa.bool_(),
+        "decimal": pa.decimal128(8, 2),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+def export_schema(dataset: ExportDataset):
+    pa = _pyarrow()
+    return pa.schema([pa.field(column.name, _arrow_type(pa, column.kind)) for column in dataset.columns])
+
+
+class _DictionaryEncoder:
+    # Словник росте між чанками лише дописуванням, тож Arrow IPC пише дельти замість заміни
+    def __init__(self) -> None:
+        self.positions: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, pa, values: Sequence[Optional[str]]):
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            position = self.positions.get(value)
+            if position is None:
+                position = self.positions[value] = len(self.values)
+                self.values.append(value)
+            indices.append(position)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+
+def iter_rows(dataset: ExportDataset, chunk_size: int) -> Iterator[List[Tuple]]:
+    # Keyset по первинному ключу: кожен чанк — окремий діапазонний скан, без OFFSET і серверних курсорів
+    lookups = [column.lookup for column in dataset.columns]
+    queryset = dataset.model._default_manager.order_by("id")
+    last_id = None
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        rows = list(chunk.values_list(*lookups)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def iter_record_batches(dataset: ExportDataset, chunk_size: Optional[int] = None):
+    pa = _pyarrow()
+    schema = export_schema(dataset)
+    encoders = {column.name: _DictionaryEncoder() for column in dataset.columns if column.kind == "dictionary"}
+    for rows in iter_rows(dataset, chunk_size or settings.EXPORT_ROW_GROUP_SIZE):
+        arrays = []
+        for column, field, values in zip(dataset.columns, schema, zip(*rows)):
+            if column.name in encoders:
+                arrays.append(encoders[column.name].encode(pa, values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        yield pa.record_batch(arrays, schema=schema)
+
+
+class _WriteBuffer:
+    """Приймач для writer-ів pyarrow: накопичує байти, які стрімінг забирає після кожного чанку."""
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _open_writer(pa, format: str, sink, schema):
+    if format == FORMAT_PARQUET:
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+
+def _timestamp(value):
+    # Як у API: ISO 8601 в UTC із суфіксом Z
+    return value.astimezone(dt_timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+_TEXT_CONVERTERS = {
+    "decimal": lambda value: f"{value:f}",
+    "date": lambda value: value.isoformat(),
+    "timestamp": _timestamp,
+}
+
+
+def _text_rows(dataset: ExportDataset, rows: List[Tuple]) -> Iterator[List[Any]]:
+    converters = [_TEXT_CONVERTERS.get(column.kind) for column in dataset.columns]
+    for row in rows:
+        yield [
+            value if value is None or convert is None else convert(value)
+            for convert, value in zip(converters, row)
+        ]
+
+
+def _stream_text(dataset: ExportDataset, format: str, chunk_size: int) -> Iterator[bytes]:
+    names = [column.name for column in dataset.columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    # Заголовок CSV іде ще до першого запиту; для NDJSON — порожній шматок
+    if format == FORMAT_CSV:
+        writer.writerow(names)
+    yield buffer.getvalue().encode()
+
+    total = 0
+    for rows in iter_rows(dataset, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        if format == FORMAT_CSV:
+            writer.writerows(_text_rows(dataset, rows))
+        else:
+            for values in _text_rows(dataset, rows):
+                buffer.write(json.dumps(dict(zip(names, values)), ensure_ascii=False, separators=(",", ":")))
+                buffer.write("\n")
+        total += len(rows)
+        yield buffer.getvalue().encode()
+    logger.info(f"Exported {total} {dataset.name} rows as {format}")
+
+
+def stream_export(dataset: ExportDataset, format: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Файл експорту шматками байтів — по одному на row group / record batch / чанк рядків."""
+    validate_format(format)
+    if format in TEXT_FORMATS:
+        yield from _stream_text(dataset, format, chunk_size or settings.EXPORT_TEXT_CHUNK_SIZE)
+        return
+
+    pa = _pyarrow()
+    sink = _WriteBuffer()
+    writer = _open_writer(pa, format, sink, export_schema(dataset))
+    rows = 0
+    for batch in iter_record_batches(dataset, chunk_size):
+        writer.write_batch(batch)
+        rows += batch.num_rows
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+    logger.info(f"Exported {rows} {dataset.name} rows as {format}")
+
+
+def export_to_file(dataset: ExportDataset, format: str, destination: BinaryIO, chunk_size: Optional[int] = None) -> int:
+    written = 0
+    for data in stream_export(dataset, format, chunk_size):
+        destination.write(data)
+        written += len(data)
+    return written
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from monitoring.changes import ProductState, bump_data_version, propagate_product_changes
+from monitoring.models import Product, ProductType, Store
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FEED_FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+PRICE_FIELDS = ("regular_price", "promo_price", "promo_ends_at")
+# Для нових SKU: продукт створюється лише з назвою, типом (id або slug) і магазином (id)
+NEW_PRODUCT_FIELDS = ("name", "product_type", "store")
+
+MAX_PRICE = Decimal("1000000")
+CENT = Decimal("0.01")
+MAX_REPORTED_ERRORS = 100
+
+
+class FeedError(ValueError):
+    pass
+
+
+@dataclass
+class FeedRow:
+    line: int
+    sku: str
+    regular_price: Decimal
+    promo_price: Optional[Decimal]
+    promo_ends_at: Optional[date]
+    fields: Dict[str, Any]
+
+
+@dataclass
+class IngestionReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def feed_format(name: Optional[str], default: str = FORMAT_CSV) -> str:
+    # Формат з явного параметра або з розширення файлу
+    if not name:
+        return default
+    name = name.lower()
+    if name in FEED_FORMATS:
+        return name
+    if name.endswith((".jsonl", ".ndjson")):
+        return FORMAT_JSONL
+    if name.endswith(".csv"):
+        return FORMAT_CSV
+    raise FeedError(f"feed format must be one of: {', '.join(FEED_FORMATS)}")
+
+
+def read_feed(stream: Iterable[str], format: str = FORMAT_CSV) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Рядки фіду як (номер рядка, dict) без читання всього файлу в пам'ять."""
+    if format == FORMAT_CSV:
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            yield line, None
+            continue
+        yield line, record if isinstance(record, dict) else None
+
+
+def text_stream(binary) -> io.TextIOWrapper:
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def _chunks(records: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _parse_price(value, name: str, required: bool) -> Optional[Decimal]:
+    if _blank(value):
+        if required:
+            raise FeedError(f"{name} is required")
+        return None
+    try:
+        price = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise FeedError(f"{name} must be a number")
+    if not price.is_finite() or price < 0 or price >= MAX_PRICE:
+        raise FeedError(f"{name} must be between 0 and {MAX_PRICE}")
+    if price != price.quantize(CENT):
+        raise FeedError(f"{name} must have at most 2 decimal places")
+    return price.quantize(CENT)
+
+
+def validate_record(line: int, record: Optional[Dict[str, Any]]) -> FeedRow:
+    if record is None:
+        raise FeedError("row is not a JSON object")
+    sku = str(record.get("sku") or "").strip()
+    if not sku:
+        raise FeedError("sku is required")
+    if len(sku) > Product._meta.get_field("sku").max_length:
+        raise FeedError("sku is too long")
+
+    promo_ends_at = record.get("promo_ends_at")
+    if _blank(promo_ends_at):
+        promo_ends_at = None
+    else:
+        try:
+            promo_ends_at = parse_date(str(promo_ends_at).strip())
+        except ValueError:
+            promo_ends_at = None
+        if promo_ends_at is None:
+            raise FeedError("promo_ends_at must be a date in YYYY-MM-DD format")
+
+    return FeedRow(
+        line=line,
+        sku=sku,
+        regular_price=_parse_price(record.get("regular_price"), "regular_price", required=True),
+        promo_price=_parse_price(record.get("promo_price"), "promo_price", required=False),
+        promo_ends_at=promo_ends_at,
+        fields={name: record.get(name) for name in NEW_PRODUCT_FIELDS if not _blank(record.get(name))},
+    )
+
+
+class PriceFeedIngestor:
+    """Застосовує фід цін чанками: один запит по SKU на чанк, bulk_update/bulk_create в одній транзакції.
+
+    Записи йдуть в обхід сигналів, тож зведення, top-K та історію цін оновлюємо
+    через propagate_product_changes для кожного чанку.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None, create_missing: bool = True) -> None:
+        self.chunk_size = chunk_size or settings.PRICE_FEED_CHUNK_SIZE
+        self.create_missing = create_missing
+
+    def ingest(self, stream: Iterable[str], format: str = FORMAT_CSV) -> IngestionReport:
+        report = IngestionReport()
+        started = time.perf_counter()
+        for chunk in _chunks(read_feed(stream, format), self.chunk_size):
+            self._ingest_chunk(chunk, report)
+            report.seconds = time.perf_counter() - started
+            logger.info(
+                f"Price feed: {report.rows} rows, {report.created} created, {report.updated} updated, "
+                f"{report.failed} failed ({report.rows_per_second:.0f} rows/s)"
+            )
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _ingest_chunk(self, chunk: List[Tuple[int, Optional[Dict[str, Any]]]], report: IngestionReport) -> None:
+        report.rows += len(chunk)
+
+        # Валідація батчем; останній рядок з тим самим SKU перемагає
+        rows: Dict[str, FeedRow] = {}
+        for line, record in chunk:
+            try:
+                row = validate_record(line, record)
+            except FeedError as error:
+                report.add_error(line, str(error))
+                continue
+            if row.sku in rows:
+                report.duplicates += 1
+            rows[row.sku] = row
+        if not rows:
+            return
+
+        with transaction.atomic():
+            existing = {
+                product.sku: product
+                for product in Product.objects.filter(sku__in=list(rows)).only(
+                    "id", "sku", "product_type_id", "store_id", "is_active",
+                    "regular_price", "promo_price", "promo_ends_at", "created_at",
+                )
+            }
+            changes = self._update_existing(rows, existing, report)
+            if self.create_missing:
+                changes.extend(self._create_missing(rows, existing, report))
+            else:
+                for row in rows.values():
+                    if row.sku not in existing:
+                        report.add_error(row.line, f"unknown sku {row.sku}")
+
+            propagate_product_changes(changes)
+        if changes:
+            bump_data_version()
+
+    def _update_existing(self, rows: Dict[str, FeedRow], existing: Dict[str, Product], report: IngestionReport):
+        now = timezone.now()
+        changed, changes = [], []
+        for sku, product in existing.items():
+            row = rows[sku]
+            if (product.regular_price, product.promo_price, product.promo_ends_at) == (
+                row.regular_price, row.promo_price, row.promo_ends_at
+            ):
+                report.unchanged += 1
+                continue
+            old_state = ProductState.from_instance(product)
+            product.regular_price = row.regular_price
+            product.promo_price = row.promo_price
+            product.promo_ends_at = row.promo_ends_at
+            product.updated_at = now
+            changed.append(product)
+            changes.append((old_state, ProductState.from_instance(product)))
+
+        Product.objects.bulk_update(changed, [*PRICE_FIELDS, "updated_at"], batch_size=1000)
+        report.updated += len(changed)
+        return changes
+
+    def _create_missing(self, rows: Dict[str, FeedRow], existing: Dict[str, Product], report: IngestionReport):
+        missing = []
+        for sku, row in rows.items():
+            if sku in existing:
+                continue
+            absent = [name for name in NEW_PRODUCT_FIELDS if name not in row.fields]
+            if absent:
+                report.add_error(row.line, f"unknown sku {row.sku}: {', '.join(absent)} required to create it")
+            else:
+                missing.append(row)
+        if not missing:
+            return []
+
+        # Довідники для всього чанку — по одному запиту
+        type_refs = {str(row.fields["product_type"]).strip() for row in missing}
+        product_types = dict(ProductType.objects.filter(slug__in=type_refs).values_list("slug", "id"))
+        numeric_types = {int(ref) for ref in type_refs if ref.isdigit()}
+        if numeric_types:
+            for type_id in ProductType.objects.filter(pk__in=numeric_types).values_list("id", flat=True):
+                product_types[str(type_id)] = type_id
+        store_refs = {str(row.fields["store"]).strip() for row in missing}
+        stores = set(Store.objects.filter(
+            pk__in=[int(ref) for ref in store_refs if ref.isdigit()]
+        ).values_list("id", flat=True))
+        # Назва продукту унікальна — зайняті перевіряємо заздалегідь, щоб не відкотити весь чанк
+        taken_names = set(Product.objects.filter(
+            name__in=[str(row.fields["name"]).strip() for row in missing]
+        ).values_list("name", flat=True))
+
+        products = []
+        for row in missing:
+            product_type_id = product_types.get(str(row.fields["product_type"]).strip())
+            store_ref = str(row.fields["store"]).strip()
+            if product_type_id is None:
+                report.add_error(row.line, f"unknown product_type {row.fields['product_type']}")
+                continue
+            if not store_ref.isdigit() or int(store_ref) not in stores:
+                report.add_error(row.line, f"unknown store {row.fields['store']}")
+                continue
+            name = str(row.fields["name"]).strip()
+            if name in taken_names or len(name) > Product._meta.get_field("name").max_length:
+                report.add_error(row.line, f"product name {name!r} is taken or too long")
+                continue
+            taken_names.add(name)
+            products.append(Product(
+                sku=row.sku,
+                name=name,
+                product_type_id=product_type_id,
+                store_id=int(store_ref),
+                regular_price=row.regular_price,
+                promo_price=row.promo_price,
+                promo_ends_at=row.promo_ends_at,
+            ))
+
+        created = Product.objects.bulk_create(products, batch_size=1000)
+        if any(product.pk is None for product in created):
+            # Бекенди без RETURNING (MySQL) не повертають id — дочитуємо одним запитом
+            ids = dict(Product.objects.filter(sku__in=[product.sku for product in created]).values_list("sku", "id"))
+            for product in created:
+                product.pk = ids[product.sku]
+        report.created += len(created)
+        return [(None, ProductState.from_instance(product)) for product in created]
+
+
+def ingest_price_feed(stream: Iterable[str], format: str = FORMAT_CSV, **options) -> IngestionReport:
+    return PriceFeedIngestor(**options).ingest(stream, format)
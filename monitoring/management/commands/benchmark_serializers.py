@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from monitoring.api.fast_serializers import ValuesSerializer
+from monitoring.api.renderers import FastJSONRenderer
+from monitoring.api.serializers import ProductSerializer
+from monitoring.repositories import repository_registry
+
+
+class Command(BaseCommand):
+    help = 'Порівнює пропускну здатність ProductSerializer і ValuesSerializer на сторінці продуктів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Скільки продуктів серіалізувати за прохід')
+        parser.add_argument('--repeat', type=int, default=5, help='Скільки проходів; береться найкращий')
+
+    def handle(self, *args, **options):
+        repository = repository_registry.products
+        rows, repeat = options['rows'], options['repeat']
+        fast = ValuesSerializer(ProductSerializer)
+
+        def model_serializer():
+            page = list(repository.get_read_queryset(ProductSerializer).order_by('id')[:rows])
+            return JSONRenderer().render(ProductSerializer(page, many=True).data)
+
+        def values_serializer():
+            page = list(repository.get_read_values(fast.lookups).order_by('id')[:rows])
+            return FastJSONRenderer().render(fast.serialize(page))
+
+        results = {}
+        for name, run in (('ProductSerializer', model_serializer), ('ValuesSerializer', values_serializer)):
+            best = None
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                body = run()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = (best, body)
+
+        (slow, slow_body), (quick, quick_body) = results['ProductSerializer'], results['ValuesSerializer']
+        count = len(list(repository.get_queryset().order_by('id')[:rows]))
+        for name, (elapsed, body) in results.items():
+            self.stdout.write(f'{name}: {count} рядків за {elapsed * 1000:.1f} мс ({count / elapsed:.0f} рядків/с, {len(body)} байт)')
+        if quick:
+            self.stdout.write(f'Прискорення: {slow / quick:.1f}x, вихід {"однаковий" if slow_body == quick_body else "ВІДРІЗНЯЄТЬСЯ"}')
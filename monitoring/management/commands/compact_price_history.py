@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.analytics.price_bars import compact_price_history
+
+
+class Command(BaseCommand):
+    help = 'Згортає історію цін у годинні та денні OHLC-бари і видаляє сирі дані, старші за термін зберігання (запускати з cron)'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Згортання історії цін...')
+        result = compact_price_history()
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: годинних барів {result['hourly_bars']}, денних барів {result['daily_bars']}, "
+            f"видалено спостережень {result['raw_deleted']}, годинних барів {result['hourly_deleted']}"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.promotions import expire_promos
+from monitoring.scheduler import PeriodicRunner
+
+
+class Command(BaseCommand):
+    help = 'Знімає промо-ціни, у яких минув promo_ends_at (одним UPDATE); з --every працює як планувальник'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=int, help='Повторювати кожні N секунд, доки процес не зупинять')
+
+    def handle(self, *args, **options):
+        if not options['every']:
+            expired = expire_promos()
+            self.stdout.write(self.style.SUCCESS(f'Знято промо: {expired}'))
+            return
+
+        self.stdout.write(f"Знімання промо кожні {options['every']} с (Ctrl+C — зупинити)...")
+        runner = PeriodicRunner(expire_promos, options['every'], name='promo-expiry')
+        runner.run_once()
+        try:
+            runner.run()
+        except KeyboardInterrupt:
+            runner.stop()
@@ -0,0 +1,38 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.export import DATASETS, EXPORT_FORMATS, FORMAT_PARQUET, ExportError, export_to_file, get_dataset
+
+
+class Command(BaseCommand):
+    help = 'Експортує продукти, магазини, типи та історію цін у Parquet, Arrow IPC, NDJSON або CSV (по файлу на набір)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Каталог для файлів експорту')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default=FORMAT_PARQUET)
+        parser.add_argument(
+            '--datasets', default=','.join(DATASETS),
+            help=f"Набори через кому (за замовчуванням усі: {', '.join(DATASETS)})"
+        )
+        parser.add_argument('--chunk-size', type=int, help='Рядків на чанк (EXPORT_ROW_GROUP_SIZE або EXPORT_TEXT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        try:
+            datasets = [get_dataset(name.strip()) for name in options['datasets'].split(',') if name.strip()]
+        except ExportError as error:
+            raise CommandError(str(error))
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        for dataset in datasets:
+            path = os.path.join(options['output_dir'], f"{dataset.name}.{options['format']}")
+            started = time.perf_counter()
+            try:
+                with open(path, 'wb') as destination:
+                    written = export_to_file(dataset, options['format'], destination, options['chunk_size'])
+            except ExportError as error:
+                raise CommandError(str(error))
+            self.stdout.write(self.style.SUCCESS(
+                f'{dataset.name}: {path}, {written / 1024:.0f} КБ за {time.perf_counter() - started:.1f} с'
+            ))
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.ingestion import FEED_FORMATS, FeedError, PriceFeedIngestor, feed_format, text_stream
+
+
+class Command(BaseCommand):
+    help = 'Імпортує фід цін (CSV або JSONL) чанками з upsert продуктів за SKU'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Шлях до файлу фіду або '-' для stdin")
+        parser.add_argument('--format', choices=FEED_FORMATS, help='Формат фіду (за замовчуванням — з розширення файлу)')
+        parser.add_argument('--chunk-size', type=int, help='Рядків на транзакцію (PRICE_FEED_CHUNK_SIZE)')
+        parser.add_argument('--no-create', action='store_true', help='Не створювати продукти з невідомими SKU')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            format = feed_format(options['format'] or (None if path == '-' else path))
+        except FeedError as error:
+            raise CommandError(str(error))
+
+        ingestor = PriceFeedIngestor(chunk_size=options['chunk_size'], create_missing=not options['no_create'])
+        self.stdout.write(f'Імпорт фіду цін {path} ({format})...')
+        if path == '-':
+            report = ingestor.ingest(text_stream(sys.stdin.buffer), format)
+        else:
+            try:
+                with open(path, 'rb') as binary:
+                    report = ingestor.ingest(text_stream(binary), format)
+            except OSError as error:
+                raise CommandError(str(error))
+
+        for error in report.errors:
+            self.stderr.write(f"Рядок {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: рядків {report.rows}, створено {report.created}, оновлено {report.updated}, "
+            f"без змін {report.unchanged}, дублікатів {report.duplicates}, помилок {report.failed} "
+            f"за {report.seconds:.1f} с ({report.rows_per_second:.0f} рядків/с)"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.analytics.price_history import backfill_price_history
+from monitoring.analytics.rollups import rebuild_creation_rollups
+from monitoring.analytics.summaries import rebuild_summaries
+from monitoring.analytics.top_products import rebuild_top_products
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує таблиці-зведення, денні зведення створення та top-K індекс з поточних даних Product/Store; додає початкову точку історії цін продуктам без неї'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Перебудова таблиць-зведень...')
+        result = rebuild_summaries()
+        rollups = rebuild_creation_rollups()
+        top_entries = rebuild_top_products()
+        observations = backfill_price_history()
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: типів продуктів {result['product_types']}, "
+            f"магазинів {result['stores']}, міст {result['cities']}, "
+            f"денних зведень {rollups}, записів top-K {top_entries}, "
+            f"нових точок історії цін {observations}"
+        ))
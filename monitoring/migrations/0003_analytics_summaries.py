@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_add_analytics_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CitySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=64, unique=True)),
+                ('store_count', models.IntegerField(default=0)),
+                ('product_count', models.IntegerField(default=0)),
+                ('sum_regular_price', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('promo_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'City summary',
+                'verbose_name_plural': 'City summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductTypeSummary',
+            fields=[
+                ('product_type', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='monitoring.producttype')),
+                ('product_count', models.IntegerField(default=0)),
+                ('sum_regular_price', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('promo_count', models.IntegerField(default=0)),
+                ('sum_promo_price', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product type summary',
+                'verbose_name_plural': 'Product type summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='StoreSummary',
+            fields=[
+                ('store', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='monitoring.store')),
+                ('product_count', models.IntegerField(default=0)),
+                ('sum_regular_price', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('promo_count', models.IntegerField(default=0)),
+                ('sum_discount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('sum_discount_percent', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Store summary',
+                'verbose_name_plural': 'Store summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:13
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_creation_rollups(apps, schema_editor):
+    Product = apps.get_model('monitoring', 'Product')
+    ProductCreationRollup = apps.get_model('monitoring', 'ProductCreationRollup')
+
+    rows = Product.objects.filter(is_active=True).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'product_type_id', 'store_id').annotate(products_added=Count('id')).order_by()
+
+    ProductCreationRollup.objects.bulk_create([
+        ProductCreationRollup(
+            day=row['day'],
+            product_type_id=row['product_type_id'],
+            store_id=row['store_id'],
+            products_added=row['products_added'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0003_analytics_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCreationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('products_added', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Product creation rollup',
+                'verbose_name_plural': 'Product creation rollups',
+            },
+        ),
+        migrations.AddField(
+            model_name='productcreationrollup',
+            name='product_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creation_rollups', to='monitoring.producttype'),
+        ),
+        migrations.AddField(
+            model_name='productcreationrollup',
+            name='store',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creation_rollups', to='monitoring.store'),
+        ),
+        migrations.AddConstraint(
+            model_name='productcreationrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'product_type', 'store'), name='unique_creation_rollup_day_type_store'),
+        ),
+        migrations.RunPython(backfill_creation_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+import django.db.models.deletion
+
+
+def backfill_top_product_entries(apps, schema_editor):
+    Product = apps.get_model('monitoring', 'Product')
+    TopProductEntry = apps.get_model('monitoring', 'TopProductEntry')
+    k = getattr(settings, 'TOP_PRODUCTS_K', 100)
+
+    entries = []
+    for partition in ((), ('product_type_id',), ('store__city',), ('product_type_id', 'store__city')):
+        rows = Product.objects.filter(is_active=True).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F(field_name) for field_name in partition] or None,
+                order_by=[F('regular_price').desc(), F('id').asc()],
+            )
+        ).filter(position__lte=k).values_list('id', 'regular_price', *partition)
+
+        for product_id, regular_price, *keys in rows:
+            values = dict(zip(partition, keys))
+            parts = []
+            if 'product_type_id' in values:
+                parts.append(f"type:{values['product_type_id']}")
+            if 'store__city' in values:
+                parts.append(f"city:{values['store__city']}")
+            entries.append(TopProductEntry(
+                scope='|'.join(parts) or 'global',
+                product_id=product_id,
+                regular_price=regular_price,
+            ))
+
+    TopProductEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_product_creation_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopProductEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=128)),
+                ('regular_price', models.DecimalField(decimal_places=2, max_digits=8)),
+            ],
+            options={
+                'verbose_name': 'Top product entry',
+                'verbose_name_plural': 'Top product entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='topproductentry',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='top_entries', to='monitoring.product'),
+        ),
+        migrations.AddIndex(
+            model_name='topproductentry',
+            index=models.Index(fields=['scope', '-regular_price', 'product'], name='top_entry_scope_price_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='topproductentry',
+            constraint=models.UniqueConstraint(fields=('scope', 'product'), name='unique_top_entry_scope_product'),
+        ),
+        migrations.RunPython(backfill_top_product_entries, migrations.RunPython.noop),
+    ]
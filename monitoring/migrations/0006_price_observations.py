@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_price_observations(apps, schema_editor):
+    Product = apps.get_model('monitoring', 'Product')
+    PriceObservation = apps.get_model('monitoring', 'PriceObservation')
+
+    observations = [
+        PriceObservation(
+            product_id=product_id,
+            observed_at=updated_at,
+            regular_price_kop=int(regular_price.scaleb(2).to_integral_value()),
+            promo_price_kop=int(promo_price.scaleb(2).to_integral_value()) if promo_price is not None else None,
+        )
+        for product_id, regular_price, promo_price, updated_at in Product.objects.values_list(
+            'id', 'regular_price', 'promo_price', 'updated_at'
+        ).order_by('id').iterator(chunk_size=2000)
+    ]
+    PriceObservation.objects.bulk_create(observations, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0005_top_product_entries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceObservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('observed_at', models.DateTimeField()),
+                ('regular_price_kop', models.IntegerField()),
+                ('promo_price_kop', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Price observation',
+                'verbose_name_plural': 'Price observations',
+            },
+        ),
+        migrations.AddField(
+            model_name='priceobservation',
+            name='product',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_observations', to='monitoring.product'),
+        ),
+        migrations.AddIndex(
+            model_name='priceobservation',
+            index=models.Index(fields=['product', 'observed_at'], name='price_obs_product_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priceobservation',
+            index=models.Index(fields=['observed_at', 'id'], name='price_obs_time_idx'),
+        ),
+        migrations.RunPython(backfill_price_observations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0006_price_observations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('open_kop', models.IntegerField()),
+                ('high_kop', models.IntegerField()),
+                ('low_kop', models.IntegerField()),
+                ('close_kop', models.IntegerField()),
+                ('had_promo', models.BooleanField(default=False)),
+                ('observation_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Price bar',
+                'verbose_name_plural': 'Price bars',
+            },
+        ),
+        migrations.AddField(
+            model_name='pricebar',
+            name='product',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_bars', to='monitoring.product'),
+        ),
+        migrations.AddIndex(
+            model_name='pricebar',
+            index=models.Index(fields=['resolution', 'bucket_start'], name='price_bar_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricebar',
+            constraint=models.UniqueConstraint(fields=('product', 'resolution', 'bucket_start'), name='unique_price_bar_product_resolution_bucket'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0007_price_bars'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricebar',
+            name='close_promo_kop',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pricebar',
+            name='close_regular_kop',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0008_price_bar_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromoExpiration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('promo_price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('promo_ends_at', models.DateField()),
+                ('expired_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Promo expiration',
+                'verbose_name_plural': 'Promo expirations',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['promo_ends_at'], name='product_promo_ends_idx'),
+        ),
+        migrations.AddField(
+            model_name='promoexpiration',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promo_expirations', to='monitoring.product'),
+        ),
+        migrations.AddIndex(
+            model_name='promoexpiration',
+            index=models.Index(fields=['expired_at'], name='promo_expiration_time_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0009_promo_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Alert event',
+                'verbose_name_plural': 'Alert events',
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('price_below', 'Price below'), ('store_discount_above', 'Store average discount above')], max_length=32)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Alert rule',
+                'verbose_name_plural': 'Alert rules',
+            },
+        ),
+        migrations.AddField(
+            model_name='alertrule',
+            name='product',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_rules', to='monitoring.product'),
+        ),
+        migrations.AddField(
+            model_name='alertrule',
+            name='product_type',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_rules', to='monitoring.producttype'),
+        ),
+        migrations.AddField(
+            model_name='alertrule',
+            name='store',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_rules', to='monitoring.store'),
+        ),
+        migrations.AddField(
+            model_name='alertevent',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_events', to='monitoring.product'),
+        ),
+        migrations.AddField(
+            model_name='alertevent',
+            name='rule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='monitoring.alertrule'),
+        ),
+        migrations.AddField(
+            model_name='alertevent',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alert_events', to='monitoring.store'),
+        ),
+        migrations.AddIndex(
+            model_name='alertrule',
+            index=models.Index(fields=['product', 'kind', 'threshold'], name='alert_rule_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertrule',
+            index=models.Index(fields=['product_type', 'kind', 'threshold'], name='alert_rule_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertrule',
+            index=models.Index(fields=['store', 'kind', 'threshold'], name='alert_rule_store_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='alertrule',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('product__isnull', True), ('product_type__isnull', True)), models.Q(('product__isnull', True), ('store__isnull', True)), models.Q(('product_type__isnull', True), ('store__isnull', True)), _connector='OR'), name='alert_rule_single_scope'),
+        ),
+        migrations.AddConstraint(
+            model_name='alertrule',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('kind', 'store_discount_above'), _negated=True), models.Q(('product__isnull', True), ('product_type__isnull', True)), _connector='OR'), name='alert_rule_store_discount_scope'),
+        ),
+        migrations.AddIndex(
+            model_name='alertevent',
+            index=models.Index(fields=['delivered_at', 'id'], name='alert_event_outbox_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0010_alert_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+                ('modified_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Data version',
+                'verbose_name_plural': 'Data version',
+            },
+        ),
+    ]
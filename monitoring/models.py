@@ -51,6 +51,10 @@ class Product(MonitoredObject):
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
+        indexes = [
+            # Пошук промо, що закінчились (expire_promos)
+            models.Index(fields=["promo_ends_at"], name="product_promo_ends_idx"),
+        ]
 
 
 class BeerProduct(Product):
@@ -58,3 +62,302 @@ class BeerProduct(Product):
         proxy = True
         verbose_name = "Beer product"
         verbose_name_plural = "Beer products"
+
+
+class ProductTypeSummary(models.Model):
+    product_type = models.OneToOneField(
+        ProductType,
+        related_name="summary",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    product_count = models.IntegerField(default=0)
+    sum_regular_price = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    promo_count = models.IntegerField(default=0)
+    sum_promo_price = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Product type summary"
+        verbose_name_plural = "Product type summaries"
+
+
+class StoreSummary(models.Model):
+    store = models.OneToOneField(
+        Store,
+        related_name="summary",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    product_count = models.IntegerField(default=0)
+    sum_regular_price = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    promo_count = models.IntegerField(default=0)
+    sum_discount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    sum_discount_percent = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Store summary"
+        verbose_name_plural = "Store summaries"
+
+
+class CitySummary(models.Model):
+    city = models.CharField(max_length=64, unique=True)
+    store_count = models.IntegerField(default=0)
+    product_count = models.IntegerField(default=0)
+    sum_regular_price = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    promo_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "City summary"
+        verbose_name_plural = "City summaries"
+
+
+class ProductCreationRollup(models.Model):
+    day = models.DateField()
+    product_type = models.ForeignKey(
+        ProductType,
+        related_name="creation_rollups",
+        on_delete=models.CASCADE,
+    )
+    store = models.ForeignKey(
+        Store,
+        related_name="creation_rollups",
+        on_delete=models.CASCADE,
+    )
+    products_added = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Product creation rollup"
+        verbose_name_plural = "Product creation rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product_type", "store"],
+                name="unique_creation_rollup_day_type_store",
+            ),
+        ]
+
+
+class TopProductEntry(models.Model):
+    # scope: "global", "type:<id>", "city:<місто>" або "type:<id>|city:<місто>"
+    scope = models.CharField(max_length=128)
+    product = models.ForeignKey(
+        Product,
+        related_name="top_entries",
+        on_delete=models.CASCADE,
+    )
+    regular_price = models.DecimalField(max_digits=8, decimal_places=2)
+
+    class Meta:
+        verbose_name = "Top product entry"
+        verbose_name_plural = "Top product entries"
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "product"], name="unique_top_entry_scope_product"),
+        ]
+        indexes = [
+            models.Index(fields=["scope", "-regular_price", "product"], name="top_entry_scope_price_idx"),
+        ]
+
+
+class PriceObservation(models.Model):
+    # Ціни в копійках; рядок додається лише коли ціна продукту змінилась
+    product = models.ForeignKey(
+        Product,
+        related_name="price_observations",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    observed_at = models.DateTimeField()
+    regular_price_kop = models.IntegerField()
+    promo_price_kop = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Price observation"
+        verbose_name_plural = "Price observations"
+        indexes = [
+            # Ряд цін продукту — діапазон по (product, observed_at);
+            # зміни за вікно часу — діапазон по observed_at
+            models.Index(fields=["product", "observed_at"], name="price_obs_product_time_idx"),
+            models.Index(fields=["observed_at", "id"], name="price_obs_time_idx"),
+        ]
+
+
+class PriceBar(models.Model):
+    # OHLC у копійках за годину/день; ціна, що діяла на початок періоду, входить в open/high/low
+    RESOLUTION_HOUR = "hour"
+    RESOLUTION_DAY = "day"
+    RESOLUTION_CHOICES = (
+        (RESOLUTION_HOUR, "Hour"),
+        (RESOLUTION_DAY, "Day"),
+    )
+
+    product = models.ForeignKey(
+        Product,
+        related_name="price_bars",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    resolution = models.CharField(max_length=8, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    open_kop = models.IntegerField()
+    high_kop = models.IntegerField()
+    low_kop = models.IntegerField()
+    close_kop = models.IntegerField()
+    # Контрольна точка для запитів «ціна на момент»: пара цін на кінець періоду
+    close_regular_kop = models.IntegerField(null=True, blank=True)
+    close_promo_kop = models.IntegerField(null=True, blank=True)
+    had_promo = models.BooleanField(default=False)
+    observation_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Price bar"
+        verbose_name_plural = "Price bars"
+        constraints = [
+            # Заодно індекс під ряд барів продукту
+            models.UniqueConstraint(
+                fields=["product", "resolution", "bucket_start"],
+                name="unique_price_bar_product_resolution_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["resolution", "bucket_start"], name="price_bar_time_idx"),
+        ]
+
+
+class PromoExpiration(models.Model):
+    # Журнал знятих після promo_ends_at промо-цін
+    product = models.ForeignKey(
+        Product,
+        related_name="promo_expirations",
+        on_delete=models.CASCADE,
+    )
+    promo_price = models.DecimalField(max_digits=8, decimal_places=2)
+    promo_ends_at = models.DateField()
+    expired_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Promo expiration"
+        verbose_name_plural = "Promo expirations"
+        indexes = [
+            models.Index(fields=["expired_at"], name="promo_expiration_time_idx"),
+        ]
+
+
+class AlertRule(models.Model):
+    # price_below: ціна на полиці (промо або регулярна) опустилась нижче threshold, грн;
+    # store_discount_above: середня знижка магазину піднялась до threshold, %
+    KIND_PRICE_BELOW = "price_below"
+    KIND_STORE_DISCOUNT_ABOVE = "store_discount_above"
+    KIND_CHOICES = (
+        (KIND_PRICE_BELOW, "Price below"),
+        (KIND_STORE_DISCOUNT_ABOVE, "Store average discount above"),
+    )
+
+    name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    # Не більше одного з product/product_type/store; жодного — правило для всіх
+    product = models.ForeignKey(
+        Product,
+        related_name="alert_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    product_type = models.ForeignKey(
+        ProductType,
+        related_name="alert_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    store = models.ForeignKey(
+        Store,
+        related_name="alert_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    threshold = models.DecimalField(max_digits=8, decimal_places=2)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Alert rule"
+        verbose_name_plural = "Alert rules"
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(product__isnull=True, product_type__isnull=True)
+                    | models.Q(product__isnull=True, store__isnull=True)
+                    | models.Q(product_type__isnull=True, store__isnull=True)
+                ),
+                name="alert_rule_single_scope",
+            ),
+            models.CheckConstraint(
+                check=(
+                    ~models.Q(kind="store_discount_above")
+                    | models.Q(product__isnull=True, product_type__isnull=True)
+                ),
+                name="alert_rule_store_discount_scope",
+            ),
+        ]
+        indexes = [
+            # Правила для пачки змін вибираються за id продуктів, типів і магазинів
+            models.Index(fields=["product", "kind", "threshold"], name="alert_rule_product_idx"),
+            models.Index(fields=["product_type", "kind", "threshold"], name="alert_rule_type_idx"),
+            models.Index(fields=["store", "kind", "threshold"], name="alert_rule_store_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class AlertEvent(models.Model):
+    # Локальний outbox: спрацювання пишуться в тій самій транзакції, що й зміна цін,
+    # доставка позначає delivered_at
+    rule = models.ForeignKey(
+        AlertRule,
+        related_name="events",
+        on_delete=models.CASCADE,
+    )
+    product = models.ForeignKey(
+        Product,
+        related_name="alert_events",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    store = models.ForeignKey(
+        Store,
+        related_name="alert_events",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    previous_value = models.DecimalField(max_digits=10, decimal_places=2)
+    value = models.DecimalField(max_digits=10, decimal_places=2)
+    threshold = models.DecimalField(max_digits=8, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Alert event"
+        verbose_name_plural = "Alert events"
+        indexes = [
+            models.Index(fields=["delivered_at", "id"], name="alert_event_outbox_idx"),
+        ]
+
+
+class DataVersion(models.Model):
+    # Єдиний рядок-лічильник версії даних: ключ кешу аналітики, ETag і Last-Modified.
+    # Живе в базі, щоб усі процеси бачили одну версію, і змінюється в транзакції запису.
+    version = models.BigIntegerField()
+    modified_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Data version"
+        verbose_name_plural = "Data version"
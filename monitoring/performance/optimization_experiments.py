@@ -9,10 +9,11 @@ from monitoring.repositories.analytics import AnalyticsRepository
 
 class DatabaseOptimizationExperiments:
     
-    def __init__(self):
+    def __init__(self, use_snapshot: bool = False):
         self.executor = ParallelDatabaseExecutor()
         self.experiment_results = []
         self.analytics_repo = AnalyticsRepository()
+        self.use_snapshot = use_snapshot
     
     def run_full_experiment(self, num_queries: int = 100, max_workers: int = 20) -> pd.DataFrame:
         self.experiment_results = []
@@ -58,6 +59,10 @@ class DatabaseOptimizationExperiments:
             'dynamics'
         ]
         
+        if self.use_snapshot:
+            # Один знімок замінює шість окремих аналітичних запитів
+            return ['snapshot'] * max(1, num_queries // len(query_names))
+        
         queries = []
         for i in range(num_queries):
             queries.append(query_names[i % len(query_names)])
@@ -27,12 +27,14 @@ def _execute_query_wrapper(query_name: str):
             'top_products': repo.get_top_expensive_products,
             'price_ranges': repo.get_products_by_price_ranges,
             'promo_analysis': repo.get_promo_analysis_by_store,
-            'dynamics': repo.get_product_creation_dynamics
+            'dynamics': repo.get_product_creation_dynamics,
+            'snapshot': repo.get_analytics_snapshot
         }
         
         method = query_methods.get(query_name)
         if method:
-            return list(method())
+            result = method()
+            return result if isinstance(result, dict) else list(result)
         return []
     except Exception as e:
         logger.error(f"Error in subprocess query {query_name}: {e}")
@@ -61,11 +63,13 @@ class ParallelDatabaseExecutor:
                     'top_products': repo.get_top_expensive_products,
                     'price_ranges': repo.get_products_by_price_ranges,
                     'promo_analysis': repo.get_promo_analysis_by_store,
-                    'dynamics': repo.get_product_creation_dynamics
+                    'dynamics': repo.get_product_creation_dynamics,
+                    'snapshot': repo.get_analytics_snapshot
                 }
                 method = query_methods.get(query_name)
                 if method:
-                    return list(method())
+                    result = method()
+                    return result if isinstance(result, dict) else list(result)
                 return []
             except Exception as e:
                 logger.error(f"Query failed: {e}")
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+
+KOPECKS_PER_UAH = 100
+
+
+def to_kopecks(value) -> Optional[int]:
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value.scaleb(2).to_integral_value())
+
+
+def from_kopecks(value: Optional[int]) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(int(value)).scaleb(-2)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import replace
+from datetime import date
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from monitoring.changes import STATE_FIELDS, ProductState, bump_data_version, propagate_product_changes
+from monitoring.models import Product, PromoExpiration
+
+
+logger = logging.getLogger(__name__)
+
+# Межа id в одному UPDATE ... WHERE id IN (...): ліміт змінних SQLite
+EXPIRE_BATCH_SIZE = 1000
+
+
+def _expired_rows(today: date):
+    # product_promo_ends_idx: діапазон promo_ends_at < today
+    expired = Product.objects.filter(promo_ends_at__lt=today)
+    return list(expired.select_for_update().values_list(*STATE_FIELDS, "promo_ends_at"))
+
+
+def _clear_promos(ids, today: date, now) -> set:
+    """Умовний UPDATE: лише рядки, які досі прострочені, і повертає id саме цим запуском змінених.
+
+    На SQLite select_for_update нічого не блокує, тож паралельний запуск міг зняти частину промо
+    після нашого читання — такі рядки вже не підходять під умову і не поширюються вдруге.
+    """
+    changed = set()
+    for offset in range(0, len(ids), EXPIRE_BATCH_SIZE):
+        batch = ids[offset:offset + EXPIRE_BATCH_SIZE]
+        updated = Product.objects.filter(pk__in=batch, promo_ends_at__lt=today).update(
+            promo_price=None, promo_ends_at=None, updated_at=now
+        )
+        if updated == len(batch):
+            changed.update(batch)
+        elif updated:
+            changed.update(Product.objects.filter(pk__in=batch, updated_at=now).values_list("id", flat=True))
+    return changed
+
+
+def expire_promos(today: Optional[date] = None) -> int:
+    """Знімає промо, у яких promo_ends_at раніше за today, умовним UPDATE (пачками по EXPIRE_BATCH_SIZE).
+
+    Записи йдуть в обхід сигналів, тож переходи пишемо в PromoExpiration,
+    а зведення, top-K та історію цін оновлюємо через propagate_product_changes —
+    лише для рядків, які змінив саме цей запуск, тож повторні й паралельні запуски безпечні.
+    """
+    today = today or timezone.localdate()
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = _expired_rows(today)
+        if not rows:
+            return 0
+        changed = _clear_promos([row[0] for row in rows], today, now)
+
+        changes = []
+        expirations = []
+        for *state, promo_ends_at in rows:
+            old_state = ProductState.from_row(state)
+            if old_state.id not in changed or old_state.promo_price is None:
+                continue
+            changes.append((old_state, replace(old_state, promo_price=None)))
+            expirations.append(PromoExpiration(
+                product_id=old_state.id,
+                promo_price=old_state.promo_price,
+                promo_ends_at=promo_ends_at,
+                expired_at=now,
+            ))
+        PromoExpiration.objects.bulk_create(expirations, batch_size=1000)
+        propagate_product_changes(changes)
+    if changed:
+        bump_data_version()
+
+    logger.info(f"Expired {len(expirations)} promos ({len(changed)} of {len(rows)} products past promo_ends_at {today})")
+    return len(expirations)
@@ -2,6 +2,11 @@ from .base import BaseRepository
 from .product_type import ProductTypeRepository
 from .store import StoreRepository
 from .product import ProductRepository
+from .price_history import PriceHistoryRepository
+from .alerts import AlertRepository
+from .analytics import AnalyticsRepository
+from .summary import SummaryAnalyticsRepository
+from .cache import CachedAnalyticsRepository
 from .registry import repository_registry
 
 __all__ = [
@@ -9,5 +14,10 @@ __all__ = [
     "ProductTypeRepository",
     "StoreRepository",
     "ProductRepository",
+    "PriceHistoryRepository",
+    "AlertRepository",
+    "AnalyticsRepository",
+    "SummaryAnalyticsRepository",
+    "CachedAnalyticsRepository",
     "repository_registry",
 ]
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from monitoring.models import AlertEvent, AlertRule
+
+from .base import BaseRepository
+
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = (
+    "id", "rule_id", "rule__name", "rule__kind", "product_id", "store_id",
+    "previous_value", "value", "threshold", "created_at",
+)
+
+
+class AlertRepository(BaseRepository[AlertRule]):
+    """Правила сповіщень і їхній outbox."""
+
+    def __init__(self) -> None:
+        super().__init__(AlertRule)
+
+    def get_pending_events(self, limit: int = 100, after: Optional[int] = None) -> QuerySet:
+        # alert_event_outbox_idx: delivered_at IS NULL, по зростанню id
+        events = AlertEvent.objects.filter(delivered_at__isnull=True)
+        if after is not None:
+            events = events.filter(id__gt=after)
+        return events.values(*EVENT_FIELDS).order_by("id")[:limit]
+
+    def mark_delivered(self, event_ids: Iterable[int]) -> int:
+        delivered = AlertEvent.objects.filter(
+            id__in=list(event_ids), delivered_at__isnull=True
+        ).update(delivered_at=timezone.now())
+        logger.info(f"Marked {delivered} alert events as delivered")
+        return delivered
@@ -1,21 +1,99 @@
 
-from django.db.models import Avg, Count, Sum, F, Q, Case, When, Value, DecimalField, CharField, ExpressionWrapper, FloatField
-from django.db.models.functions import TruncMonth
+from django.db.models import Avg, Count, Max, Min, Sum, F, Q, Case, When, Value, DecimalField, ExpressionWrapper, FloatField, IntegerField
+from django.db.models.functions import Coalesce, TruncMonth
 from django.utils import timezone
 from datetime import timedelta
-from monitoring.models import Product, ProductType, Store
+from monitoring.models import Product, ProductCreationRollup, ProductType, Store, TopProductEntry
+from monitoring.analytics.snapshot import AnalyticsSnapshotBuilder, SNAPSHOT_FIELDS
+from monitoring.analytics.approximate import ApproximateAnalyticsEngine
+from monitoring.analytics.columnar import ColumnarAnalyticsEngine
+from monitoring.analytics.rollups import GRANULARITY_MONTH, creation_day, month_start, period_expression
+from monitoring.analytics.top_products import scope_key, top_products_k
+from monitoring.analytics.filters import NO_FILTERS, AnalyticsFilters
+from monitoring.analytics.report_statistics import summarize_price_ranges, summarize_top_products
+from monitoring.analytics.histogram import (
+    BUCKETING_FIXED,
+    DEFAULT_BUCKET_COUNT,
+    DEFAULT_PRICE_EDGES,
+    bucket_labels,
+    build_price_histogram,
+    edges_for_type,
+    histogram_rows,
+    validate_bucketing,
+)
+from monitoring.prices import to_kopecks
+from collections.abc import Mapping
+import numpy as np
+import functools
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+ENGINE_ORM = 'orm'
+ENGINE_NUMPY = 'numpy'
+ENGINE_SKETCH = 'sketch'
+ENGINES = (ENGINE_ORM, ENGINE_NUMPY, ENGINE_SKETCH)
+
+
+# Аргументи фільтрів у старому стилі; зводяться до AnalyticsFilters
+LEGACY_FILTER_ARGUMENTS = ('city', 'product_type', 'store_id', 'date_from', 'date_to')
+
+
+def typed_filters(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, filters=None, **kwargs):
+        legacy = {name: kwargs.pop(name) for name in LEGACY_FILTER_ARGUMENTS if name in kwargs}
+        return method(self, *args, filters=AnalyticsFilters.coerce(filters, **legacy), **kwargs)
+    return wrapper
+
+
+def selectable_engine(method):
+    # engine='numpy' рахує звіт з колонкового знімка в пам'яті замість ORM-агрегації,
+    # engine='sketch' — наближено зі скетчів (лише для звітів, що це підтримують)
+    @typed_filters
+    @functools.wraps(method)
+    def wrapper(self, *args, engine=ENGINE_ORM, **kwargs):
+        if engine == ENGINE_NUMPY:
+            return getattr(ColumnarAnalyticsEngine.current(), method.__name__)(*args, **kwargs)
+        if engine == ENGINE_SKETCH:
+            if not hasattr(ApproximateAnalyticsEngine, method.__name__):
+                raise ValueError(f"{method.__name__} has no approximate mode")
+            return getattr(ApproximateAnalyticsEngine.current(), method.__name__)(*args, **kwargs)
+        if engine != ENGINE_ORM:
+            raise ValueError(f"Unknown analytics engine: {engine}")
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _price_bucket_expression(edges):
+    # CASE з номером цінового діапазону; для типів з власними межами — окремі гілки
+    branches = []
+    if isinstance(edges, Mapping):
+        for product_type_name, type_edges in edges.items():
+            type_edges = edges_for_type(edges, product_type_name)
+            branches.extend(
+                When(product_type__name=product_type_name, regular_price__lt=edge, then=Value(index))
+                for index, edge in enumerate(type_edges)
+            )
+            branches.append(When(product_type__name=product_type_name, then=Value(len(type_edges))))
+        default_edges = DEFAULT_PRICE_EDGES
+    else:
+        default_edges = edges_for_type(edges, None)
+
+    branches.extend(
+        When(regular_price__lt=edge, then=Value(index))
+        for index, edge in enumerate(default_edges)
+    )
+    return Case(*branches, default=Value(len(default_edges)), output_field=IntegerField())
+
 
 class AnalyticsRepository:
     
-    def get_avg_prices_by_product_type(self):
-        logger.info("Executing avg_prices_by_product_type query")
-        
-        result = ProductType.objects.filter(
+    def _avg_prices_queryset(self, filters=NO_FILTERS):
+        # Умови на продукти — в тому ж filter(), щоб агрегати йшли по тому ж JOIN
+        return ProductType.objects.filter(
+            filters.product_q('products__'),
             products__is_active=True
         ).annotate(
             product_type_name=F('name'),
@@ -29,60 +107,104 @@ class AnalyticsRepository:
             'avg_promo_price',
             'product_count'
         ).order_by('-avg_regular_price')
+    
+    @selectable_engine
+    def get_avg_prices_by_product_type(self, filters=NO_FILTERS):
+        logger.info("Executing avg_prices_by_product_type query")
+        
+        result = self._avg_prices_queryset(filters)
         
         logger.info(f"Query returned {len(result)} product types")
         return result
     
-    def get_store_statistics_by_city(self):
-        logger.info("Executing store_statistics_by_city query")
-        from django.db.models import OuterRef, Subquery
-        
-        products_per_store = Product.objects.filter(
-            store=OuterRef('pk'),
-            is_active=True
-        ).values('store').annotate(
-            count=Count('id')
-        ).values('count')
-        
-        promo_products_per_store = Product.objects.filter(
-            store=OuterRef('pk'),
-            is_active=True,
-            promo_price__isnull=False
-        ).values('store').annotate(
-            count=Count('id')
-        ).values('count')
-        
-        avg_price_per_store = Product.objects.filter(
-            store=OuterRef('pk'),
-            is_active=True
-        ).values('store').annotate(
-            avg=Avg('regular_price')
-        ).values('avg')
-        
-        from django.db.models import CharField
-        from django.db.models.functions import Coalesce
-        
-        stores_data = Store.objects.filter(
+    @selectable_engine
+    def get_avg_prices_by_product_type_statistics(self, filters=NO_FILTERS):
+        # Підсумок рахує БД: агрегат поверх згрупованого запиту (підзапит у FROM)
+        statistics = self._avg_prices_queryset(filters).order_by().aggregate(
+            total_product_types=Count('id'),
+            avg_regular_price_overall=Avg('avg_regular_price', output_field=FloatField()),
+            avg_promo_price_overall=Avg(Coalesce('avg_promo_price', Value(0), output_field=FloatField())),
+            total_products=Sum('product_count'),
+            max_avg_regular_price=Max('avg_regular_price'),
+            min_avg_regular_price=Min('avg_regular_price')
+        )
+        return statistics if statistics['total_product_types'] else {}
+    
+    def _store_statistics_queryset(self, filters=NO_FILTERS):
+        products_filter = Q(products__is_active=True) & filters.product_q('products__', with_store=False)
+        return Store.objects.filter(
+            filters.store_q(),
             is_active=True
         ).values('city').annotate(
             store_count=Count('id', distinct=True),
-            total_products=Count('products', filter=Q(products__is_active=True)),
-            avg_price=Avg('products__regular_price', filter=Q(products__is_active=True)),
+            total_products=Count('products', filter=products_filter),
+            avg_price=Avg('products__regular_price', filter=products_filter),
             promo_products_count=Count(
                 'products',
-                filter=Q(products__is_active=True, products__promo_price__isnull=False)
+                filter=products_filter & Q(products__promo_price__isnull=False)
             )
         ).order_by('-store_count')
+    
+    @selectable_engine
+    def get_store_statistics_by_city(self, filters=NO_FILTERS):
+        logger.info("Executing store_statistics_by_city query")
+        
+        stores_data = self._store_statistics_queryset(filters)
         
         logger.info(f"Query returned {len(stores_data)} cities")
         return stores_data
     
-    def get_top_expensive_products(self, limit=10):
+    @selectable_engine
+    def get_store_statistics_by_city_statistics(self, filters=NO_FILTERS):
+        # Псевдоніми агрегатів не збігаються з колонками звіту, інакше aggregate() їх перезапише
+        totals = self._store_statistics_queryset(filters).order_by().aggregate(
+            cities=Count('city'),
+            stores=Sum('store_count'),
+            products=Sum('total_products'),
+            mean_price=Avg(Coalesce('avg_price', Value(0), output_field=FloatField())),
+            promo_total=Sum('promo_products_count')
+        )
+        if not totals['cities']:
+            return {}
+        return {
+            'total_cities': totals['cities'],
+            'total_stores': totals['stores'],
+            'total_products': totals['products'],
+            'avg_products_per_store': totals['products'] / totals['stores'] if totals['stores'] > 0 else 0,
+            'avg_price_overall': totals['mean_price'],
+            'total_promo_products': totals['promo_total']
+        }
+    
+    @selectable_engine
+    def get_top_expensive_products(self, limit=10, filters=NO_FILTERS, after=None):
         logger.info(f"Executing top_expensive_products query with limit={limit}")
         
-        products = Product.objects.filter(
-            is_active=True
-        ).select_related('store', 'product_type').annotate(
+        # Індекс тримає лише перші K рядків розрізів тип/місто, тож наступні сторінки
+        # (after = (regular_price, product_id) останнього рядка) та інші фільтри читаємо з каталогу
+        if after is None and limit <= top_products_k() and not filters.unsupported('city', 'product_type_ids'):
+            return self._get_top_products_from_index(limit, filters)
+        
+        products = self._top_products_queryset(filters, after)[:limit]
+        
+        logger.info(f"Query returned {len(products)} products")
+        return products
+    
+    @selectable_engine
+    def get_top_expensive_products_statistics(self, limit=10, filters=NO_FILTERS, after=None):
+        # Підсумок по тій самій сторінці рейтингу: рядків не більше limit, тож рахуємо з них,
+        # а не другим ORDER BY по всьому каталогу (перша сторінка йде з індексу топ-K)
+        return summarize_top_products(self.get_top_expensive_products(limit=limit, filters=filters, after=after))
+    
+    def _top_products_queryset(self, filters=NO_FILTERS, after=None):
+        products = Product.objects.filter(filters.product_q(), is_active=True)
+        if after is not None:
+            regular_price, product_id = after
+            products = products.filter(
+                Q(regular_price__lt=regular_price) | Q(regular_price=regular_price, id__gt=product_id)
+            )
+        
+        return products.select_related('store', 'product_type').annotate(
+            product_id=F('id'),
             product_name=F('name'),
             store_name=F('store__name'),
             city=F('store__city'),
@@ -96,6 +218,7 @@ class AnalyticsRepository:
                 output_field=DecimalField()
             )
         ).values(
+            'product_id',
             'product_name',
             'sku',
             'regular_price',
@@ -104,73 +227,133 @@ class AnalyticsRepository:
             'store_name',
             'city',
             'product_type_name'
-        ).order_by('-regular_price')[:limit]
-        
-        logger.info(f"Query returned {len(products)} products")
-        return products
+        ).order_by('-regular_price', 'id')
     
-    def get_products_by_price_ranges(self):
-        logger.info("Executing products_by_price_ranges query")
-        
-        total_products = Product.objects.filter(is_active=True).count()
+    def _get_top_products_from_index(self, limit, filters=NO_FILTERS):
+        # Читаємо підтримуваний top-K розріз замість сортування всього каталогу
+        type_ids = filters.product_type_ids if filters.product_type_ids is not None else [None]
+        if filters.city is None:
+            entries = TopProductEntry.objects.filter(scope__in=[scope_key(type_id) for type_id in type_ids])
+        else:
+            # Розрізи індексу — по точних назвах міст, тож частину назви шукаємо серед усіх міських розрізів
+            scopes = Q()
+            for type_id in type_ids:
+                scopes |= Q(scope__startswith=scope_key(type_id, ''))
+            entries = TopProductEntry.objects.filter(scopes, product__store__city__icontains=filters.city)
         
-        products = Product.objects.filter(
-            is_active=True
-        ).annotate(
-            price_range=Case(
-                When(regular_price__lt=30, then=Value('0-30 грн')),
-                When(regular_price__gte=30, regular_price__lt=60, then=Value('30-60 грн')),
-                When(regular_price__gte=60, regular_price__lt=100, then=Value('60-100 грн')),
-                When(regular_price__gte=100, then=Value('100+ грн')),
-                output_field=CharField()
-            ),
-            product_type_name=F('product_type__name')
-        ).values('price_range', 'product_type_name').annotate(
-            count=Count('id')
-        ).annotate(
-            percentage=Case(
-                When(count__gt=0, then=F('count') * 100.0 / total_products),
-                default=Value(0.0),
+        products = entries.annotate(
+            product_name=F('product__name'),
+            sku=F('product__sku'),
+            promo_price=F('product__promo_price'),
+            discount=Case(
+                When(
+                    product__promo_price__isnull=False,
+                    then=F('product__regular_price') - F('product__promo_price')
+                ),
+                default=Value(0),
                 output_field=DecimalField()
-            )
-        ).order_by('price_range', 'product_type_name')
+            ),
+            store_name=F('product__store__name'),
+            city=F('product__store__city'),
+            product_type_name=F('product__product_type__name')
+        ).values(
+            'product_id',
+            'product_name',
+            'sku',
+            'regular_price',
+            'promo_price',
+            'discount',
+            'store_name',
+            'city',
+            'product_type_name'
+        ).order_by('-regular_price', 'product_id')[:limit]
         
-        logger.info(f"Query returned {len(products)} price range groups")
+        logger.info(f"Top-K index returned {len(products)} products")
         return products
     
-    def get_promo_analysis_by_store(self):
-        logger.info("Executing promo_analysis_by_store query")
-        
-        stores = Store.objects.filter(
-            is_active=True,
+    @selectable_engine
+    def get_products_by_price_ranges(self, filters=NO_FILTERS, edges=None, bucketing=BUCKETING_FIXED,
+                                     bucket_count=DEFAULT_BUCKET_COUNT):
+        logger.info(f"Executing products_by_price_ranges query (bucketing={bucketing})")
+        validate_bucketing(bucketing, bucket_count)
+
+        products = Product.objects.filter(filters.product_q(), is_active=True)
+        # Відсоток рахується від усіх активних продуктів, тож з фільтрами база — окремий COUNT
+        total = None if filters.is_empty else Product.objects.filter(is_active=True).count()
+
+        if bucketing == BUCKETING_FIXED:
+            # Один GROUP BY; відсоток рахуємо з сум груп замість окремого COUNT(*)
+            rows = products.annotate(
+                bucket=_price_bucket_expression(edges)
+            ).values('product_type__name', 'bucket').annotate(
+                count=Count('id')
+            ).order_by()
+
+            counts = {(row['product_type__name'], row['bucket']): row['count'] for row in rows}
+            labels = {
+                product_type_name: bucket_labels(edges_for_type(edges, product_type_name))
+                for product_type_name, _ in counts
+            }
+            result = histogram_rows(counts, labels, total if total is not None else sum(counts.values()))
+        else:
+            type_codes = {}
+            codes, prices = [], []
+            for product_type_name, regular_price in products.values_list('product_type__name', 'regular_price'):
+                codes.append(type_codes.setdefault(product_type_name, len(type_codes)))
+                prices.append(to_kopecks(regular_price))
+
+            result = build_price_histogram(
+                list(type_codes),
+                np.array(codes, dtype=np.int32),
+                np.array(prices, dtype=np.int64),
+                bucketing=bucketing,
+                bucket_count=bucket_count,
+                total=total,
+            )
+
+        logger.info(f"Query returned {len(result)} price range groups")
+        return result
+    
+    @selectable_engine
+    def get_products_by_price_ranges_statistics(self, filters=NO_FILTERS, edges=None, bucketing=BUCKETING_FIXED,
+                                                bucket_count=DEFAULT_BUCKET_COUNT):
+        # Рядків гістограми не більше «типів × діапазонів», тож ROLLUP по діапазонах — над ними
+        return summarize_price_ranges(self.get_products_by_price_ranges(
+            filters=filters, edges=edges, bucketing=bucketing, bucket_count=bucket_count
+        ))
+    
+    def _promo_analysis_queryset(self, filters=NO_FILTERS, min_promo_products=None):
+        promo_filter = Q(
             products__promo_price__isnull=False,
             products__is_active=True
+        ) & filters.product_q('products__', with_store=False)
+        stores = Store.objects.filter(
+            filters.store_q(),
+            promo_filter,
+            is_active=True
         ).annotate(
             store_name=F('name'),
-            promo_products=Count('products', filter=Q(
-                products__promo_price__isnull=False,
-                products__is_active=True
-            )),
+            promo_products=Count('products', filter=promo_filter),
             avg_discount_amount=Avg(
                 ExpressionWrapper(
                     F('products__regular_price') - F('products__promo_price'),
                     output_field=FloatField()
                 ),
-                filter=Q(products__promo_price__isnull=False, products__is_active=True)
+                filter=promo_filter
             ),
             avg_discount_percent=Avg(
                 ExpressionWrapper(
                     (F('products__regular_price') - F('products__promo_price')) * 100.0 / F('products__regular_price'),
                     output_field=FloatField()
                 ),
-                filter=Q(products__promo_price__isnull=False, products__is_active=True)
+                filter=promo_filter
             ),
             total_savings=Sum(
                 ExpressionWrapper(
                     F('products__regular_price') - F('products__promo_price'),
                     output_field=FloatField()
                 ),
-                filter=Q(products__promo_price__isnull=False, products__is_active=True)
+                filter=promo_filter
             )
         ).values(
             'id',
@@ -181,18 +364,53 @@ class AnalyticsRepository:
             'total_savings'
         ).order_by('-promo_products')
         
+        # Умова на агрегат — єдине, що лишається в HAVING
+        if min_promo_products:
+            stores = stores.filter(promo_products__gte=min_promo_products)
+        return stores
+    
+    @selectable_engine
+    def get_promo_analysis_by_store(self, filters=NO_FILTERS, min_promo_products=None):
+        logger.info("Executing promo_analysis_by_store query")
+        
+        stores = self._promo_analysis_queryset(filters, min_promo_products)
+        
         logger.info(f"Query returned {len(stores)} stores with promo products")
         return stores
     
-    def get_product_creation_dynamics(self):
+    @selectable_engine
+    def get_promo_analysis_by_store_statistics(self, filters=NO_FILTERS, min_promo_products=None):
+        stores = self._promo_analysis_queryset(filters, min_promo_products)
+        totals = stores.order_by().aggregate(
+            stores=Count('id'),
+            promo_total=Sum('promo_products'),
+            mean_discount_percent=Avg('avg_discount_percent'),
+            savings=Sum('total_savings'),
+            max_discount_percent=Max('avg_discount_percent')
+        )
+        if not totals['stores']:
+            return {}
+        return {
+            'total_stores': totals['stores'],
+            'total_promo_products': totals['promo_total'],
+            'avg_discount_percent': totals['mean_discount_percent'],
+            'total_savings': totals['savings'],
+            'max_discount_percent': totals['max_discount_percent'],
+            # Супутній запит з LIMIT 1 замість max() по всіх рядках
+            'store_with_most_promos': stores.order_by('-promo_products', 'id').values_list(
+                'store_name', flat=True
+            )[0]
+        }
+    
+    @selectable_engine
+    def get_product_creation_dynamics(self, filters=NO_FILTERS):
         logger.info("Executing product_creation_dynamics query")
         
-        one_year_ago = timezone.now() - timedelta(days=365)
+        products = Product.objects.filter(filters.product_q(), is_active=True)
+        if filters.date_from is None and filters.date_to is None:
+            products = products.filter(created_at__gte=timezone.now() - timedelta(days=365))
         
-        products = Product.objects.filter(
-            created_at__gte=one_year_ago,
-            is_active=True
-        ).annotate(
+        products = products.annotate(
             month=TruncMonth('created_at'),
             product_type_name=F('product_type__name')
         ).values('month', 'product_type_name').annotate(
@@ -201,3 +419,95 @@ class AnalyticsRepository:
         
         logger.info(f"Query returned {len(products)} time period records")
         return products
+    
+    def _creation_rollups(self, filters=NO_FILTERS):
+        unsupported = filters.unsupported('city', 'store_ids', 'product_type_ids', 'date_from', 'date_to')
+        if unsupported:
+            raise ValueError(f"creation dynamics cannot be filtered by: {', '.join(unsupported)}")
+        
+        date_from, date_to = filters.date_from, filters.date_to
+        if date_from is None and date_to is None:
+            date_from = creation_day(timezone.now() - timedelta(days=365))
+        
+        # Сумуємо денні зведення замість групування сирих created_at
+        rollups = ProductCreationRollup.objects.all()
+        if date_from:
+            rollups = rollups.filter(day__gte=date_from)
+        if date_to:
+            rollups = rollups.filter(day__lte=date_to)
+        if filters.city is not None:
+            rollups = rollups.filter(store__city__icontains=filters.city)
+        if filters.store_ids is not None:
+            rollups = rollups.filter(store_id__in=filters.store_ids)
+        if filters.product_type_ids is not None:
+            rollups = rollups.filter(product_type_id__in=filters.product_type_ids)
+        return rollups
+    
+    @typed_filters
+    def get_creation_dynamics(self, granularity=GRANULARITY_MONTH, filters=NO_FILTERS):
+        logger.info(f"Executing creation_dynamics rollup query (granularity={granularity})")
+        
+        result = self._creation_rollups(filters).annotate(
+            period=period_expression(granularity),
+            product_type_name=F('product_type__name')
+        ).values('period', 'product_type_name').annotate(
+            products_added=Sum('products_added')
+        ).filter(products_added__gt=0).order_by('period', 'product_type_name')
+        
+        logger.info(f"Query returned {len(result)} time period records")
+        return result
+    
+    @typed_filters
+    def get_creation_dynamics_statistics(self, granularity=GRANULARITY_MONTH, filters=NO_FILTERS):
+        rollups = self._creation_rollups(filters).filter(products_added__gt=0)
+        statistics = rollups.aggregate(
+            total_periods=Count(period_expression(granularity), distinct=True),
+            total_products_added=Sum('products_added'),
+            product_types_tracked=Count('product_type__name', distinct=True)
+        )
+        if not statistics['total_periods']:
+            return {}
+        
+        # Пік — супутній GROUP BY лише за періодом з LIMIT 1
+        peak = rollups.annotate(period=period_expression(granularity)).values('period').annotate(
+            period_total=Sum('products_added')
+        ).order_by('-period_total', 'period')[0]
+        statistics.update({
+            'granularity': granularity,
+            'avg_products_per_period': statistics['total_products_added'] / statistics['total_periods'],
+            'peak_period': str(peak['period']),
+            'peak_period_count': peak['period_total'],
+        })
+        if granularity == GRANULARITY_MONTH:
+            statistics.update({
+                'total_months': statistics['total_periods'],
+                'avg_products_per_month': statistics['avg_products_per_period'],
+                'peak_month': str(month_start(peak['period'])),
+                'peak_month_count': statistics['peak_period_count'],
+            })
+        return statistics
+    
+    def get_analytics_snapshot(self, top_limit=10):
+        logger.info(f"Executing analytics snapshot with top_limit={top_limit}")
+        
+        builder = AnalyticsSnapshotBuilder(
+            top_limit=top_limit,
+            dynamics_since=timezone.now() - timedelta(days=365)
+        )
+        
+        # Один прохід по активних продуктах з колонками магазину та типу
+        rows = Product.objects.filter(
+            is_active=True
+        ).values_list(*SNAPSHOT_FIELDS).order_by('id')
+        builder.add_rows(rows.iterator(chunk_size=2000))
+        
+        # Магазини без активних продуктів теж враховуються в store_count
+        store_counts = dict(
+            Store.objects.filter(is_active=True).values('city').annotate(
+                store_count=Count('id')
+            ).values_list('city', 'store_count')
+        )
+        
+        snapshot = builder.build(store_counts)
+        logger.info(f"Snapshot built from {builder.product_count} products")
+        return snapshot
@@ -4,6 +4,8 @@ from typing import Any, Generic, Iterable, Optional, Type, TypeVar
 
 from django.db import models
 
+from .read_plan import read_plan
+
 ModelType = TypeVar("ModelType", bound=models.Model)
 
 
@@ -19,8 +21,18 @@ class BaseRepository(Generic[ModelType]):
     def get_all(self) -> Iterable[ModelType]:
         return self.get_queryset().all()
 
-    def get_by_id(self, object_id: Any) -> Optional[ModelType]:
-        return self.get_queryset().filter(pk=object_id).first()
+    def get_read_queryset(self, serializer_class: Optional[type] = None) -> models.QuerySet[ModelType]:
+        # select_related/only() під поля, які прочитає серіалізатор
+        queryset = self.get_queryset()
+        if serializer_class is None:
+            return queryset
+        return read_plan(self.model, serializer_class).apply(queryset)
+
+    def get_read_values(self, lookups: Iterable[str]) -> models.QuerySet:
+        return self.get_queryset().values(*lookups)
+
+    def get_by_id(self, object_id: Any, serializer_class: Optional[type] = None) -> Optional[ModelType]:
+        return self.get_read_queryset(serializer_class).filter(pk=object_id).first()
 
     def add(self, **payload: Any) -> ModelType:
         instance = self.model(**payload)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import QuerySet
+
+from monitoring.changes import get_data_version
+
+from .analytics import ENGINE_ORM, AnalyticsRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class CachedAnalyticsRepository:
+    """Кешує результати get_* методів під ключем (метод, параметри, версія даних).
+
+    Версія даних збільшується при кожному записі Product/Store/ProductType,
+    тому попадання в кеш завжди повертає актуальні дані. Звіти з рушіїв у пам'яті
+    (engine=numpy|sketch) не кешуються: їхній знімок може відставати від версії.
+    """
+
+    def __init__(self, repository: AnalyticsRepository, cache_alias: str = None, timeout: int = None) -> None:
+        self.repository = repository
+        self.cache_alias = cache_alias or getattr(settings, "ANALYTICS_CACHE_ALIAS", "default")
+        self.timeout = timeout if timeout is not None else getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 3600)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.repository, name)
+        if name.startswith("get_") and callable(attribute):
+            return self._cached(name, attribute)
+        return attribute
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "data_version": get_data_version(),
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    def make_key(self, method_name: str, args: tuple, kwargs: Dict[str, Any], version: int) -> str:
+        params = repr((args, sorted(kwargs.items())))
+        digest = hashlib.md5(params.encode("utf-8")).hexdigest()
+        return f"analytics:{type(self.repository).__name__}:{method_name}:{version}:{digest}"
+
+    def _cached(self, method_name: str, method: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            if kwargs.get("engine", ENGINE_ORM) != ENGINE_ORM:
+                return method(*args, **kwargs)
+            key = self.make_key(method_name, args, kwargs, get_data_version())
+            result = self.cache.get(key)
+            if result is not None:
+                self._count(hit=True)
+                return result
+
+            self._count(hit=False)
+            logger.info(f"Analytics cache miss for {method_name}")
+            result = method(*args, **kwargs)
+            if isinstance(result, QuerySet):
+                result = list(result)
+            self.cache.set(key, result, self.timeout)
+            return result
+
+        wrapper.__name__ = method_name
+        return wrapper
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from monitoring.analytics.price_bars import (
+    PRODUCT_BATCH_SIZE,
+    RESOLUTION_DAY,
+    RESOLUTION_HOUR,
+    RESOLUTION_RAW,
+    Bar,
+    bucket_floor,
+    build_bars,
+    choose_resolution,
+    compaction_watermark,
+    observation_bars,
+    raw_rows,
+    rollup_bars,
+    stored_bars,
+)
+from monitoring.analytics.price_history import latest_price_points
+from monitoring.analytics.price_snapshot import prices_as_of
+from monitoring.models import PriceObservation, Product
+
+from .base import BaseRepository
+
+
+logger = logging.getLogger(__name__)
+
+OBSERVATION_FIELDS = ("id", "product_id", "observed_at", "regular_price_kop", "promo_price_kop")
+
+
+class PriceHistoryRepository(BaseRepository[PriceObservation]):
+    """Читання історії цін; обидва запити — діапазонні скани по своєму індексу."""
+
+    def __init__(self) -> None:
+        super().__init__(PriceObservation)
+
+    def get_price_series(
+        self,
+        product_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> QuerySet:
+        # price_obs_product_time_idx: product_id = X AND observed_at у [start, end)
+        observations = self.get_queryset().filter(product_id=product_id)
+        if start is not None:
+            observations = observations.filter(observed_at__gte=start)
+        if end is not None:
+            observations = observations.filter(observed_at__lt=end)
+        return observations.values(*OBSERVATION_FIELDS).order_by("observed_at", "id")
+
+    def get_price_changes(
+        self,
+        start: datetime,
+        end: Optional[datetime] = None,
+        product_ids: Optional[Iterable[int]] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> QuerySet:
+        # price_obs_time_idx: діапазон observed_at, продовження з (observed_at, id) останнього рядка
+        logger.info(f"Executing price_changes query from {start} to {end}")
+
+        observations = self.get_queryset().filter(observed_at__gte=start)
+        if end is not None:
+            observations = observations.filter(observed_at__lt=end)
+        if product_ids is not None:
+            observations = observations.filter(product_id__in=list(product_ids))
+        if after is not None:
+            observed_at, observation_id = after
+            observations = observations.filter(
+                Q(observed_at__gt=observed_at) | Q(observed_at=observed_at, id__gt=observation_id)
+            )
+
+        observations = observations.values(*OBSERVATION_FIELDS).order_by("observed_at", "id")
+        if limit is not None:
+            observations = observations[:limit]
+        return observations
+
+    def get_price_bars(
+        self,
+        product_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: Optional[str] = None,
+    ) -> Tuple[str, List[Dict]]:
+        """OHLC-бари продукту; без resolution обирається найгрубша, якої досить для діапазону.
+
+        Збережені бари доповнюються хвостом, який ще не згорнуто, тож останні години/дні
+        видно до наступного запуску compact_price_history.
+        """
+        resolution = resolution or choose_resolution(start, end)
+        end = end or timezone.now()
+        logger.info(f"Executing price_bars query for product {product_id} at {resolution} from {start} to {end}")
+
+        if resolution == RESOLUTION_RAW:
+            return resolution, [
+                bar.as_dict() for bar in observation_bars(
+                    (row["product_id"], row["observed_at"], row["regular_price_kop"], row["promo_price_kop"])
+                    for row in self.get_price_series(product_id, start, end)
+                )
+            ]
+
+        start = bucket_floor(start, resolution) if start is not None else None
+        bars = list(stored_bars([product_id], resolution, start, end))
+        tail_start = _later(compaction_watermark(resolution), start)
+        if resolution == RESOLUTION_HOUR:
+            bars.extend(self._hourly_tail(product_id, tail_start, end))
+        else:
+            hour_start = _later(compaction_watermark(RESOLUTION_HOUR), tail_start)
+            hourly = list(stored_bars([product_id], RESOLUTION_HOUR, tail_start, end))
+            hourly.extend(self._hourly_tail(product_id, hour_start, end))
+            bars.extend(rollup_bars(hourly, RESOLUTION_DAY))
+        return resolution, [bar.as_dict() for bar in bars]
+
+    def get_prices_as_of(
+        self,
+        at: datetime,
+        product_ids: Optional[Iterable[int]] = None,
+        store_ids: Optional[Iterable[int]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Знімок цін каталогу на момент at, упорядкований за product_id.
+
+        Продукти обходяться пачками за id, тож ціна — O(продуктів), а не O(спостережень);
+        продукти без ціни на той момент (ще не існували) пропускаються.
+        """
+        logger.info(f"Executing prices_as_of query at {at}")
+
+        products = Product.objects.order_by("id")
+        if product_ids is not None:
+            products = products.filter(id__in=list(product_ids))
+        if store_ids is not None:
+            products = products.filter(store_id__in=list(store_ids))
+
+        snapshot: List[Dict] = []
+        last_id = after
+        while limit is None or len(snapshot) < limit:
+            batch = products if last_id is None else products.filter(id__gt=last_id)
+            stores = dict(batch.values_list("id", "store_id")[:PRODUCT_BATCH_SIZE])
+            if not stores:
+                break
+            prices = prices_as_of(stores, at)
+            for product_id in sorted(stores):
+                if product_id in prices:
+                    snapshot.append({**prices[product_id], "store_id": stores[product_id]})
+            last_id = max(stores)
+        return snapshot if limit is None else snapshot[:limit]
+
+    def _hourly_tail(self, product_id: int, start: Optional[datetime], end: datetime) -> List[Bar]:
+        # Сирі спостереження після межі згортання, з ціною, що діяла на її початок
+        carry = latest_price_points([product_id], before=start) if start is not None else {}
+        return list(build_bars(raw_rows([product_id], start, end), RESOLUTION_HOUR, carry))
+
+
+def _later(first: Optional[datetime], second: Optional[datetime]) -> Optional[datetime]:
+    if first is None or second is None:
+        return first or second
+    return max(first, second)
@@ -0,0 +1,111 @@
+"""Плани читання: які зв'язки та колонки прочитає серіалізатор.
+
+План будується один раз на пару (модель, серіалізатор) з декларації полів:
+вкладений серіалізатор на FK — select_related і лише його колонки,
+PrimaryKeyRelatedField — сама колонка <fk>_id, many=True — prefetch_related.
+Якщо серіалізатор читає щось поза полями моделі (методи, властивості, source="*"),
+only() не застосовується — краще зайві колонки, ніж ледачі дочитування по рядку.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+@dataclass(frozen=True)
+class ReadPlan:
+    select_related: Tuple[str, ...] = ()
+    prefetch_related: Tuple[str, ...] = ()
+    # None — колонки не обмежуються
+    only: Optional[Tuple[str, ...]] = None
+
+    def apply(self, queryset: models.QuerySet) -> models.QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only is not None:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+class _Planner:
+    def __init__(self) -> None:
+        self.select_related: List[str] = []
+        self.prefetch_related: List[str] = []
+        self.columns: List[str] = []
+        self.exact = True
+
+    def _add(self, target: List[str], path: str) -> None:
+        if path not in target:
+            target.append(path)
+
+    def _forward_relation(self, model_field) -> bool:
+        return model_field.is_relation and model_field.concrete and (model_field.many_to_one or model_field.one_to_one)
+
+    def walk(self, model, serializer: serializers.BaseSerializer, prefix: str = "") -> None:
+        self._add(self.columns, prefix + model._meta.pk.name)
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                self.exact = False
+                continue
+            self.walk_field(model, field, list(field.source_attrs), prefix)
+
+    def walk_field(self, model, field, attrs: List[str], prefix: str) -> None:
+        attr = attrs.pop(0)
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            self.exact = False
+            return
+        path = prefix + attr
+
+        if attrs:
+            # source="store.city": ланцюжок прямих FK
+            if not self._forward_relation(model_field):
+                self.exact = False
+                return
+            self._add(self.select_related, path)
+            self._add(self.columns, path)
+            self.walk_field(model_field.related_model, field, attrs, path + "__")
+            return
+
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)) or model_field.many_to_many \
+                or model_field.one_to_many or not model_field.concrete:
+            # Зворотні та many-to-many зв'язки — окремим запитом на сторінку, без only()
+            self._add(self.prefetch_related, path)
+            if prefix:
+                self.exact = False
+            return
+
+        self._add(self.columns, path)
+        if not model_field.is_relation or isinstance(field, serializers.PrimaryKeyRelatedField):
+            return
+
+        self._add(self.select_related, path)
+        if isinstance(field, serializers.BaseSerializer):
+            self.walk(model_field.related_model, field, path + "__")
+        else:
+            # SlugRelatedField тощо читають довільний атрибут пов'язаного об'єкта
+            self.exact = False
+
+    def plan(self) -> ReadPlan:
+        return ReadPlan(
+            select_related=tuple(self.select_related),
+            prefetch_related=tuple(self.prefetch_related),
+            only=tuple(self.columns) if self.exact else None,
+        )
+
+
+@lru_cache(maxsize=None)
+def read_plan(model, serializer_class) -> ReadPlan:
+    planner = _Planner()
+    planner.walk(model, serializer_class())
+    return planner.plan()
@@ -2,9 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+from django.conf import settings
+
+from .alerts import AlertRepository
+from .analytics import AnalyticsRepository
+from .cache import CachedAnalyticsRepository
+from .price_history import PriceHistoryRepository
 from .product import ProductRepository
 from .product_type import ProductTypeRepository
 from .store import StoreRepository
+from .summary import SummaryAnalyticsRepository
+
+
+def _analytics_repository_factory():
+    if getattr(settings, "ANALYTICS_USE_SUMMARY_TABLES", False):
+        repository = SummaryAnalyticsRepository()
+    else:
+        repository = AnalyticsRepository()
+
+    if getattr(settings, "ANALYTICS_CACHE_ENABLED", False):
+        return CachedAnalyticsRepository(repository)
+    return repository
 
 
 @dataclass(frozen=True)
@@ -14,6 +32,11 @@ class RepositoryRegistry:
     )
     stores: StoreRepository = field(default_factory=StoreRepository)
     products: ProductRepository = field(default_factory=ProductRepository)
+    price_history: PriceHistoryRepository = field(default_factory=PriceHistoryRepository)
+    alerts: AlertRepository = field(default_factory=AlertRepository)
+    analytics: AnalyticsRepository | CachedAnalyticsRepository = field(
+        default_factory=_analytics_repository_factory
+    )
 
 
 repository_registry = RepositoryRegistry()
@@ -0,0 +1,104 @@
+import logging
+
+from django.db.models import DecimalField, ExpressionWrapper, F, FloatField
+from django.db.models.functions import NullIf
+
+from monitoring.analytics.filters import NO_FILTERS
+from monitoring.models import CitySummary, ProductTypeSummary, StoreSummary
+from .analytics import AnalyticsRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+def _ratio(numerator, denominator, output_field):
+    return ExpressionWrapper(
+        F(numerator) * 1.0 / NullIf(F(denominator), 0),
+        output_field=output_field
+    )
+
+
+class SummaryAnalyticsRepository(AnalyticsRepository):
+    """Читає агрегати з таблиць-зведень замість сканування monitoring_product.
+
+    Перевизначає лише побудову запитів, тож get_* та get_*_statistics беруть ті самі зведення.
+    Фільтри, яких немає в ключі зведення (ціна, дати тощо), рахуються живим запитом.
+    """
+
+    def _avg_prices_queryset(self, filters=NO_FILTERS):
+        if filters.unsupported('product_type_ids'):
+            return super()._avg_prices_queryset(filters)
+        logger.info("Reading avg_prices_by_product_type from summary tables")
+
+        result = ProductTypeSummary.objects.filter(
+            product_count__gt=0
+        )
+        if filters.product_type_ids is not None:
+            result = result.filter(product_type_id__in=filters.product_type_ids)
+
+        result = result.annotate(
+            id=F('product_type_id'),
+            product_type_name=F('product_type__name'),
+            avg_regular_price=_ratio('sum_regular_price', 'product_count', DecimalField()),
+            avg_promo_price=_ratio('sum_promo_price', 'promo_count', DecimalField()),
+        ).values(
+            'id',
+            'product_type_name',
+            'avg_regular_price',
+            'avg_promo_price',
+            'product_count'
+        ).order_by('-avg_regular_price')
+        return result
+
+    def _store_statistics_queryset(self, filters=NO_FILTERS):
+        if filters.unsupported('city'):
+            return super()._store_statistics_queryset(filters)
+        logger.info("Reading store_statistics_by_city from summary tables")
+
+        stores_data = CitySummary.objects.filter(
+            store_count__gt=0
+        )
+        if filters.city is not None:
+            stores_data = stores_data.filter(city__icontains=filters.city)
+
+        stores_data = stores_data.annotate(
+            total_products=F('product_count'),
+            avg_price=_ratio('sum_regular_price', 'product_count', DecimalField()),
+            promo_products_count=F('promo_count'),
+        ).values(
+            'city',
+            'store_count',
+            'total_products',
+            'avg_price',
+            'promo_products_count'
+        ).order_by('-store_count')
+        return stores_data
+
+    def _promo_analysis_queryset(self, filters=NO_FILTERS, min_promo_products=None):
+        if filters.has_product_filters:
+            return super()._promo_analysis_queryset(filters, min_promo_products)
+        logger.info("Reading promo_analysis_by_store from summary tables")
+
+        stores = StoreSummary.objects.filter(
+            filters.store_q('store__'),
+            store__is_active=True,
+            promo_count__gt=0
+        ).annotate(
+            id=F('store_id'),
+            store_name=F('store__name'),
+            city=F('store__city'),
+            promo_products=F('promo_count'),
+            avg_discount_percent=_ratio('sum_discount_percent', 'promo_count', FloatField()),
+            total_savings=ExpressionWrapper(F('sum_discount'), output_field=FloatField()),
+        ).values(
+            'id',
+            'store_name',
+            'city',
+            'promo_products',
+            'avg_discount_percent',
+            'total_savings'
+        ).order_by('-promo_products')
+
+        if min_promo_products:
+            stores = stores.filter(promo_products__gte=min_promo_products)
+        return stores
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicRunner(threading.Thread):
+    """Викликає job кожні interval секунд у фоновому потоці, доки не викличуть stop()."""
+
+    def __init__(self, job: Callable[[], object], interval: float, name: Optional[str] = None) -> None:
+        super().__init__(name=name or f"periodic-{job.__name__}", daemon=True)
+        self.job = job
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> None:
+        # Потік тримає власне з'єднання з БД — закриваємо застарілі, як після запиту
+        close_old_connections()
+        try:
+            self.job()
+        except Exception:
+            logger.exception(f"Periodic job {self.name} failed")
+        finally:
+            close_old_connections()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+_promo_expiry_runner: Optional[PeriodicRunner] = None
+
+
+def start_promo_expiry_runner(interval: Optional[float] = None) -> Optional[PeriodicRunner]:
+    # Вимкнено, якщо PROMO_EXPIRY_INTERVAL_SECONDS = 0 (тоді — cron з expire_promos)
+    global _promo_expiry_runner
+    from monitoring.promotions import expire_promos
+
+    interval = settings.PROMO_EXPIRY_INTERVAL_SECONDS if interval is None else interval
+    if not interval:
+        return None
+    if _promo_expiry_runner is None or not _promo_expiry_runner.is_alive():
+        _promo_expiry_runner = PeriodicRunner(expire_promos, interval, name="promo-expiry")
+        _promo_expiry_runner.start()
+        logger.info(f"Promo expiry runner started, every {interval}s")
+    return _promo_expiry_runner
@@ -0,0 +1,76 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from monitoring.analytics.summaries import SummaryDelta
+from monitoring.analytics.top_products import refresh_city_scopes
+from monitoring.changes import (
+    ProductState,
+    bump_data_version,
+    load_product_states,
+    propagate_product_changes,
+)
+from monitoring.models import Product, ProductType, Store
+
+
+# Підписуємось без sender, щоб проксі-моделі (BeerProduct) теж оновлювали зведення
+
+
+@receiver(pre_save, dispatch_uid="monitoring_product_pre_save")
+def capture_previous_product_state(sender, instance, raw=False, **kwargs):
+    if raw or not isinstance(instance, Product):
+        return
+    previous_state = None
+    if not instance._state.adding and instance.pk is not None:
+        previous_state = load_product_states([instance.pk]).get(instance.pk)
+    instance._previous_state = previous_state
+
+
+@receiver(post_save, dispatch_uid="monitoring_product_post_save")
+def propagate_product_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not isinstance(instance, Product):
+        return
+    previous_state = instance.__dict__.pop("_previous_state", None)
+    propagate_product_changes([(previous_state, ProductState.from_instance(instance))])
+
+
+@receiver(post_delete, dispatch_uid="monitoring_product_post_delete")
+def propagate_product_delete(sender, instance, **kwargs):
+    if not isinstance(instance, Product):
+        return
+    propagate_product_changes([(ProductState.from_instance(instance), None)])
+
+
+@receiver(pre_save, sender=Store, dispatch_uid="monitoring_store_pre_save")
+def capture_previous_store_location(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous_location = None
+    if not instance._state.adding and instance.pk is not None:
+        previous_location = Store.objects.filter(pk=instance.pk).values_list("city", "is_active").first()
+    instance._previous_location = previous_location
+
+
+@receiver(post_save, sender=Store, dispatch_uid="monitoring_store_post_save")
+def update_store_location(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_location = instance.__dict__.pop("_previous_location", None)
+    delta = SummaryDelta()
+    delta.add_store_change(instance.pk, previous_location, (instance.city, instance.is_active))
+    delta.flush()
+    if previous_location is not None and previous_location[0] != instance.city:
+        refresh_city_scopes([previous_location[0], instance.city])
+
+
+@receiver(post_delete, sender=Store, dispatch_uid="monitoring_store_post_delete")
+def remove_store_location(sender, instance, **kwargs):
+    delta = SummaryDelta()
+    delta.add_store_change(instance.pk, (instance.city, instance.is_active), None)
+    delta.flush()
+
+
+@receiver(post_save, dispatch_uid="monitoring_data_version_post_save")
+@receiver(post_delete, dispatch_uid="monitoring_data_version_post_delete")
+def invalidate_analytics_cache(sender, instance, **kwargs):
+    if isinstance(instance, (Product, Store, ProductType)):
+        bump_data_version()
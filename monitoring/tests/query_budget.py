@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """assertMaxQueries — верхня межа запитів на ендпоінт, щоб N+1 не повернувся непомітно."""
+
+    @contextmanager
+    def assertMaxQueries(self, limit):
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        executed = len(queries.captured_queries)
+        if executed > limit:
+            statements = '\n'.join(query['sql'] for query in queries.captured_queries)
+            self.fail(f'{executed} queries executed, budget is {limit}:\n{statements}')
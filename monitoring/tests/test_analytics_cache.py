@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.changes import get_data_version
+from monitoring.models import DataVersion, Product, ProductType, Store
+from monitoring.repositories import repository_registry
+from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories.cache import CachedAnalyticsRepository
+from web_interface.forms import ProductForm
+
+
+class CachedAnalyticsRepositoryTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer_type = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='BEER001', product_type=self.beer_type,
+            store=self.store, regular_price=Decimal('45.00'), promo_price=Decimal('38.00')
+        )
+        self.repo = CachedAnalyticsRepository(AnalyticsRepository())
+
+    def test_repeated_call_is_served_from_cache(self):
+        first = self.repo.get_avg_prices_by_product_type()
+
+        # Лише читання версії даних
+        with self.assertNumQueries(1):
+            second = self.repo.get_avg_prices_by_product_type()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.repo.stats()['hits'], 1)
+        self.assertEqual(self.repo.stats()['misses'], 1)
+
+    def test_parameters_are_part_of_the_key(self):
+        self.repo.get_store_statistics_by_city(city='Київ')
+        result = self.repo.get_store_statistics_by_city(city='Львів')
+
+        self.assertEqual(result, [])
+        self.assertEqual(self.repo.stats()['misses'], 2)
+
+    def test_repository_write_invalidates(self):
+        self.repo.get_avg_prices_by_product_type()
+        version = get_data_version()
+
+        repository_registry.products.update(self.product.pk, regular_price=Decimal('55.00'))
+
+        self.assertGreater(get_data_version(), version)
+        result = self.repo.get_avg_prices_by_product_type()
+        self.assertEqual(float(result[0]['avg_regular_price']), 55.0)
+        self.assertEqual(self.repo.stats()['misses'], 2)
+
+    def test_store_and_type_writes_invalidate(self):
+        self.repo.get_top_expensive_products()
+
+        self.store.name = 'Сільпо Центр'
+        self.store.save()
+        self.assertEqual(self.repo.get_top_expensive_products()[0]['store_name'], 'Сільпо Центр')
+
+        repository_registry.product_types.update(self.beer_type.pk, name='Beer')
+        self.assertEqual(self.repo.get_top_expensive_products()[0]['product_type_name'], 'Beer')
+        self.assertEqual(self.repo.stats()['hits'], 0)
+
+    def test_product_form_save_invalidates(self):
+        self.repo.get_top_expensive_products()
+
+        form = ProductForm(data={
+            'name': 'Львівське',
+            'sku': 'BEER002',
+            'product_type': self.beer_type.pk,
+            'store': self.store.pk,
+            'regular_price': '99.00',
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        result = self.repo.get_top_expensive_products()
+        self.assertEqual(result[0]['sku'], 'BEER002')
+
+    def test_delete_invalidates(self):
+        self.repo.get_avg_prices_by_product_type()
+
+        repository_registry.products.delete(self.product.pk)
+
+        self.assertEqual(self.repo.get_avg_prices_by_product_type(), [])
+
+
+class AnalyticsCacheStatsAPITestCase(TestCase):
+
+    def test_cache_stats_endpoint(self):
+        response = APIClient().get(reverse('analytics-cache-stats'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['enabled'])
+        self.assertIn('hits', response.data)
+        self.assertIn('misses', response.data)
+        self.assertIn('data_version', response.data)
+
+    def test_data_version_is_shared_through_database(self):
+        # Інший процес зі своїм LocMemCache бачить ту саму версію: вона в базі, не в кеші
+        version = get_data_version()
+        cache.clear()
+
+        self.assertEqual(get_data_version(), version)
+        DataVersion.objects.filter(pk=1).update(version=F('version') + 1)
+        self.assertEqual(get_data_version(), version + 1)
@@ -0,0 +1,175 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import date, datetime
+from decimal import Decimal
+
+from monitoring.analytics.columnar import ColumnarAnalyticsEngine
+from monitoring.analytics.filters import AnalyticsFilters
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories.summary import SummaryAnalyticsRepository
+
+
+def _normalize(rows):
+    return [
+        {key: round(float(value), 6) if isinstance(value, (Decimal, float)) else value for key, value in row.items()}
+        for row in rows
+    ]
+
+
+class AnalyticsFiltersTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ColumnarAnalyticsEngine.invalidate()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.wine = ProductType.objects.create(name='Вино', slug='wine')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.kyiv_second = Store.objects.create(name='Сільпо Поділ', city='Київ', address='вул. Тестова 2')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+
+        rows = [
+            (self.beer, self.kyiv, '45.00', '38.00', datetime(2025, 1, 10)),
+            (self.beer, self.kyiv_second, '55.00', None, datetime(2025, 2, 1)),
+            (self.beer, self.lviv, '29.99', '24.49', datetime(2025, 2, 15)),
+            (self.wine, self.kyiv, '125.10', '99.90', datetime(2025, 3, 1)),
+            (self.wine, self.lviv, '60.00', '50.00', datetime(2025, 3, 20)),
+            (self.wine, self.kyiv_second, '310.00', '250.00', datetime(2025, 4, 2)),
+        ]
+        for index, (product_type, store, regular_price, promo_price, created_at) in enumerate(rows):
+            product = Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=product_type, store=store,
+                regular_price=Decimal(regular_price),
+                promo_price=Decimal(promo_price) if promo_price else None,
+            )
+            product.created_at = timezone.make_aware(created_at)
+            product.save()
+
+        self.repo = AnalyticsRepository()
+        self.filters = [
+            AnalyticsFilters(city='Київ'),
+            AnalyticsFilters(city='Ки'),
+            AnalyticsFilters(store_ids=(self.lviv.pk,)),
+            AnalyticsFilters(product_type_ids=(self.wine.pk,)),
+            AnalyticsFilters(min_price=Decimal('40'), max_price=Decimal('130')),
+            AnalyticsFilters(date_from=date(2025, 2, 1), date_to=date(2025, 3, 1)),
+            AnalyticsFilters(city='Київ', product_type_ids=(self.beer.pk,), min_price=Decimal('50')),
+        ]
+
+    def test_coerce_resolves_product_types(self):
+        self.assertEqual(AnalyticsFilters.coerce(product_type='Пиво').product_type_ids, (self.beer.pk,))
+        self.assertEqual(
+            AnalyticsFilters.coerce(product_type=f'{self.wine.pk},Пив').product_type_ids,
+            tuple(sorted((self.beer.pk, self.wine.pk)))
+        )
+        self.assertEqual(AnalyticsFilters.coerce(product_type='Сидр').product_type_ids, ())
+        self.assertTrue(AnalyticsFilters.coerce().is_empty)
+
+        with self.assertRaises(ValueError):
+            AnalyticsFilters.coerce(min_price='abc')
+        with self.assertRaises(ValueError):
+            AnalyticsFilters.coerce(min_price='100', max_price='10')
+        with self.assertRaises(ValueError):
+            AnalyticsFilters.coerce(store_ids='1,x')
+
+    def test_filters_are_applied_before_grouping(self):
+        stores = self.repo.get_store_statistics_by_city(city='Київ')
+        promo = self.repo.get_promo_analysis_by_store(filters=AnalyticsFilters(city='Київ'), min_promo_products=2)
+
+        where, _, having = str(promo.query).partition('HAVING')
+        self.assertIn('"city" LIKE ', str(stores.query).split('GROUP BY')[0])
+        self.assertIn('"city" LIKE ', where)
+        self.assertNotIn('city', having)
+        self.assertIn('COUNT', having)
+
+    def test_filtered_reports(self):
+        filters = AnalyticsFilters(city='Київ', min_price=Decimal('50'))
+
+        self.assertEqual(
+            [(row['product_type_name'], row['product_count']) for row in self.repo.get_avg_prices_by_product_type(filters=filters)],
+            [('Вино', 2), ('Пиво', 1)]
+        )
+        self.assertEqual(
+            [row['sku'] for row in self.repo.get_top_expensive_products(limit=5, filters=filters)],
+            ['SKU005', 'SKU003', 'SKU001']
+        )
+        stores = list(self.repo.get_store_statistics_by_city(filters=filters))
+        self.assertEqual(len(stores), 1)
+        self.assertEqual((stores[0]['store_count'], stores[0]['total_products']), (2, 3))
+
+        ranges = self.repo.get_products_by_price_ranges(filters=AnalyticsFilters(product_type_ids=(self.beer.pk,)))
+        self.assertEqual(sum(row['count'] for row in ranges), 3)
+        self.assertAlmostEqual(sum(row['percentage'] for row in ranges), 50.0)
+
+        dynamics = self.repo.get_creation_dynamics(filters=AnalyticsFilters(
+            date_from=date(2025, 1, 1), date_to=date(2025, 12, 31), store_ids=(self.lviv.pk,)
+        ))
+        self.assertEqual(sum(row['products_added'] for row in dynamics), 2)
+        with self.assertRaises(ValueError):
+            self.repo.get_creation_dynamics(filters=AnalyticsFilters(min_price=Decimal('10')))
+
+    def test_engines_agree(self):
+        for filters in self.filters:
+            for method_name, kwargs in (
+                ('get_avg_prices_by_product_type', {}),
+                ('get_store_statistics_by_city', {}),
+                ('get_top_expensive_products', {'limit': 10}),
+                ('get_products_by_price_ranges', {}),
+                ('get_promo_analysis_by_store', {}),
+            ):
+                orm_rows = list(getattr(self.repo, method_name)(filters=filters, **kwargs))
+                numpy_rows = getattr(self.repo, method_name)(filters=filters, engine='numpy', **kwargs)
+                if method_name != 'get_top_expensive_products':
+                    orm_rows.sort(key=repr)
+                    numpy_rows = sorted(numpy_rows, key=repr)
+                self.assertEqual(_normalize(numpy_rows), _normalize(orm_rows), (method_name, filters))
+
+    def test_summary_tables_fall_back_for_product_filters(self):
+        summary_repo = SummaryAnalyticsRepository()
+
+        for filters in self.filters:
+            for method_name in ('get_avg_prices_by_product_type', 'get_store_statistics_by_city',
+                                'get_promo_analysis_by_store'):
+                self.assertEqual(
+                    sorted(_normalize(getattr(summary_repo, method_name)(filters=filters)), key=repr),
+                    sorted(_normalize(getattr(self.repo, method_name)(filters=filters)), key=repr),
+                    (method_name, filters)
+                )
+
+    def test_approximate_mode_rejects_unsupported_filters(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_avg_prices_by_product_type(filters=AnalyticsFilters(min_price=Decimal('10')), engine='sketch')
+
+    def test_api_parameters(self):
+        client = APIClient()
+
+        response = client.get(reverse('analytics-promo'), {'store': f'{self.kyiv.pk},{self.lviv.pk}', 'max_price': '100'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(row['store_name'] for row in response.data['data']), ['Сільпо Київ', 'Сільпо Львів']
+        )
+        self.assertEqual(response.data['statistics']['total_promo_products'], 3)
+
+        response = client.get(reverse('analytics-top-expensive'), {'product_type': str(self.beer.pk), 'date_from': '2025-02-01'})
+        self.assertEqual([row['sku'] for row in response.data['data']], ['SKU001', 'SKU002'])
+
+        self.assertEqual(client.get(reverse('analytics-avg-prices'), {'min_price': 'cheap'}).status_code, 400)
+        self.assertEqual(client.get(reverse('analytics-store-stats'), {'store': 'main'}).status_code, 400)
+
+    def test_partial_city_matches_like_baseline(self):
+        client = APIClient()
+
+        response = client.get(reverse('analytics-store-stats'), {'city': 'Ки'})
+        self.assertEqual([(row['city'], row['store_count']) for row in response.data['data']], [('Київ', 2)])
+
+        kyiv_skus = [row['sku'] for row in self.repo.get_top_expensive_products(filters=AnalyticsFilters(city='Київ'))]
+        self.assertTrue(kyiv_skus)
+        for engine in ('orm', 'numpy'):
+            response = client.get(reverse('analytics-top-expensive'), {'city': 'Ки', 'engine': engine})
+            self.assertEqual([row['sku'] for row in response.data['data']], kyiv_skus, engine)
+
+        response = client.get(reverse('analytics-top-expensive'), {'city': 'Одеса'})
+        self.assertEqual(response.data['data'], [])
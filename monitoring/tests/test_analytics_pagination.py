@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+from unittest import mock
+
+from monitoring.api import analytics_views
+from monitoring.api.pagination import KeysetPaginator
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories.registry import _analytics_repository_factory
+
+
+class AnalyticsPaginationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        beer = ProductType.objects.create(name='Пиво', slug='beer')
+        wine = ProductType.objects.create(name='Вино', slug='wine')
+
+        stores = [
+            Store.objects.create(name=f'Сільпо {index}', city=city, address=f'вул. Тестова {index}')
+            for index, city in enumerate(['Київ', 'Київ', 'Львів', 'Одеса', 'Дніпро'])
+        ]
+        prices = ['45.00', '55.00', '55.00', '55.00', '120.00', '20.00', '80.00', '99.90', '35.00', '60.00']
+        for index, price in enumerate(prices):
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}',
+                product_type=beer if index % 2 == 0 else wine,
+                store=stores[index % len(stores)],
+                regular_price=Decimal(price),
+                promo_price=Decimal(price) - Decimal('5.00') if index < 7 else None,
+            )
+
+    def walk(self, url_name, page_size_param='page_size', page_size=2, **params):
+        rows, cursor, requests = [], None, 0
+        while True:
+            query = {page_size_param: page_size, **params}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get(reverse(url_name), query)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['data']), page_size)
+            rows.extend(response.data['data'])
+            requests += 1
+            cursor = response.data['pagination']['next_cursor']
+            if not cursor:
+                return rows, requests
+
+    def test_pages_cover_full_report(self):
+        for url_name in ('analytics-promo', 'analytics-store-stats', 'analytics-avg-prices',
+                         'analytics-price-ranges', 'analytics-dynamics'):
+            full = self.client.get(reverse(url_name)).data['data']
+            rows, requests = self.walk(url_name)
+
+            self.assertEqual(rows, full, url_name)
+            self.assertEqual(requests, (len(full) + 1) // 2 or 1, url_name)
+
+    def test_top_expensive_pages_follow_ranking(self):
+        expected = [
+            product.sku for product in sorted(Product.objects.all(), key=lambda product: (-product.regular_price, product.pk))
+        ]
+
+        for engine in ('orm', 'numpy'):
+            rows, _ = self.walk('analytics-top-expensive', page_size_param='limit', page_size=3, engine=engine)
+            self.assertEqual([row['sku'] for row in rows], expected, engine)
+
+    @override_settings(ANALYTICS_CACHE_ENABLED=False)
+    def test_top_expensive_pages_without_cache(self):
+        # Без кешу репозиторій віддає зрізаний QuerySet, а не список
+        expected = [
+            product.sku for product in sorted(Product.objects.all(), key=lambda product: (-product.regular_price, product.pk))
+        ]
+
+        with mock.patch.object(analytics_views, 'analytics_repo', _analytics_repository_factory()):
+            rows, _ = self.walk('analytics-top-expensive', page_size_param='limit', page_size=3)
+            filtered, _ = self.walk('analytics-top-expensive', page_size_param='limit', page_size=2, city='Київ')
+
+        self.assertEqual([row['sku'] for row in rows], expected)
+        self.assertEqual([row['sku'] for row in filtered], ['SKU006', 'SKU001', 'SKU000', 'SKU005'])
+
+    def test_cursor_survives_insert_before_it(self):
+        first = self.client.get(reverse('analytics-top-expensive'), {'limit': 3}).data
+        Product.objects.create(
+            name='Новий', sku='NEW001', product_type=ProductType.objects.first(),
+            store=Store.objects.first(), regular_price=Decimal('500.00')
+        )
+
+        second = self.client.get(
+            reverse('analytics-top-expensive'), {'limit': 3, 'cursor': first['pagination']['next_cursor']}
+        ).data
+
+        self.assertEqual([row['sku'] for row in second['data']], ['SKU009', 'SKU001', 'SKU002'])
+
+    @override_settings(ANALYTICS_MAX_PAGE_SIZE=4)
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('analytics-top-expensive'), {'limit': 1000})
+
+        self.assertEqual(len(response.data['data']), 4)
+        self.assertEqual(response.data['pagination']['page_size'], 4)
+        self.assertTrue(response.data['pagination']['has_more'])
+
+    def test_invalid_parameters(self):
+        url = reverse('analytics-promo')
+
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'page_size': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'page_size': 'many'}).status_code, 400)
+
+    def test_queryset_keyset(self):
+        repo = AnalyticsRepository()
+        # Для агрегатів курсор потрапляє в HAVING
+        for queryset, ordering in (
+            (Product.objects.values('id', 'sku', 'regular_price'), ('-regular_price', 'id')),
+            (repo.get_promo_analysis_by_store(), ('-promo_products', 'id')),
+            (repo.get_store_statistics_by_city(), ('-store_count', 'city')),
+        ):
+            rows, cursor = [], None
+            while True:
+                paginator = KeysetPaginator(ordering, 2, cursor)
+                rows.extend(paginator.paginate(queryset))
+                cursor = paginator.next_cursor
+                if not cursor:
+                    break
+
+            self.assertEqual(rows, list(queryset.order_by(*ordering)), ordering)
@@ -0,0 +1,105 @@
+from django.test import TestCase
+from django.utils import timezone
+from decimal import Decimal
+from datetime import timedelta
+
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+def _normalize(rows):
+    # Знімок рахує в Decimal, SQLite — у float: порівнюємо з точністю відповіді API
+    return [
+        {
+            key: round(float(value), 6) if isinstance(value, (Decimal, float)) else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+class AnalyticsSnapshotTestCase(TestCase):
+
+    def setUp(self):
+        beer = ProductType.objects.create(name='Пиво', slug='beer')
+        wine = ProductType.objects.create(name='Вино', slug='wine')
+        ProductType.objects.create(name='Вода', slug='water')
+
+        kyiv = Store.objects.create(name='Сільпо Хрещатик', city='Київ', address='вул. Хрещатик 1')
+        lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+        Store.objects.create(name='Сільпо Одеса', city='Одеса', address='вул. Дерибасівська 1')
+        closed = Store.objects.create(name='Сільпо Закритий', city='Київ', address='вул. Стара 2', is_active=False)
+
+        prices = [
+            (beer, kyiv, '45.00', '38.00'),
+            (beer, kyiv, '55.55', None),
+            (beer, lviv, '29.99', '24.49'),
+            (wine, lviv, '125.10', '99.90'),
+            (wine, kyiv, '60.00', None),
+            (wine, closed, '310.00', '250.00'),
+            (beer, closed, '33.33', None),
+        ]
+        for index, (product_type, store, regular_price, promo_price) in enumerate(prices):
+            Product.objects.create(
+                name=f'Продукт {index}',
+                sku=f'SKU{index:03d}',
+                product_type=product_type,
+                store=store,
+                regular_price=Decimal(regular_price),
+                promo_price=Decimal(promo_price) if promo_price else None,
+            )
+
+        old_product = Product.objects.create(
+            name='Старий', sku='OLD001', product_type=beer, store=kyiv, regular_price=Decimal('12.00')
+        )
+        old_product.created_at = timezone.now() - timedelta(days=400)
+        old_product.save()
+
+        Product.objects.create(
+            name='Неактивний', sku='OFF001', product_type=wine, store=kyiv,
+            regular_price=Decimal('999.00'), is_active=False
+        )
+
+        self.repo = AnalyticsRepository()
+
+    def test_snapshot_matches_individual_queries(self):
+        snapshot = self.repo.get_analytics_snapshot(top_limit=5)
+
+        self.assertEqual(
+            _normalize(snapshot['avg_prices_by_product_type']),
+            _normalize(self.repo.get_avg_prices_by_product_type())
+        )
+        self.assertEqual(
+            _normalize(sorted(snapshot['store_statistics_by_city'], key=lambda item: item['city'])),
+            _normalize(sorted(self.repo.get_store_statistics_by_city(), key=lambda item: item['city']))
+        )
+        self.assertEqual(
+            _normalize(snapshot['top_expensive_products']),
+            _normalize(self.repo.get_top_expensive_products(limit=5))
+        )
+        self.assertEqual(snapshot['products_by_price_ranges'], list(self.repo.get_products_by_price_ranges()))
+        self.assertEqual(
+            _normalize(sorted(snapshot['promo_analysis_by_store'], key=lambda item: item['id'])),
+            _normalize(sorted(self.repo.get_promo_analysis_by_store(), key=lambda item: item['id']))
+        )
+        self.assertEqual(snapshot['product_creation_dynamics'], list(self.repo.get_product_creation_dynamics()))
+
+    def test_snapshot_averages_are_exact_decimals(self):
+        snapshot = self.repo.get_analytics_snapshot()
+
+        beer = next(row for row in snapshot['avg_prices_by_product_type'] if row['product_type_name'] == 'Пиво')
+        self.assertEqual(beer['avg_regular_price'], Decimal('175.87') / 5)
+        self.assertEqual(beer['avg_promo_price'], Decimal('31.245'))
+
+    def test_snapshot_uses_single_product_scan(self):
+        with self.assertNumQueries(2):
+            self.repo.get_analytics_snapshot()
+
+    def test_snapshot_on_empty_catalog(self):
+        Product.objects.all().delete()
+
+        snapshot = self.repo.get_analytics_snapshot()
+
+        self.assertEqual(snapshot['avg_prices_by_product_type'], [])
+        self.assertEqual(snapshot['top_expensive_products'], [])
+        self.assertEqual(len(snapshot['store_statistics_by_city']), 3)
@@ -0,0 +1,162 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import date, datetime
+from decimal import Decimal
+
+from monitoring.analytics.columnar import ColumnarAnalyticsEngine
+from monitoring.analytics.filters import NO_FILTERS, AnalyticsFilters
+from monitoring.analytics.report_statistics import (
+    summarize_avg_prices,
+    summarize_price_ranges,
+    summarize_promo_analysis,
+    summarize_store_statistics,
+    summarize_top_products,
+)
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories.summary import SummaryAnalyticsRepository
+
+
+REPORTS = (
+    ('get_avg_prices_by_product_type', {}, summarize_avg_prices),
+    ('get_store_statistics_by_city', {}, summarize_store_statistics),
+    ('get_top_expensive_products', {'limit': 4}, summarize_top_products),
+    ('get_products_by_price_ranges', {}, summarize_price_ranges),
+    ('get_promo_analysis_by_store', {}, summarize_promo_analysis),
+)
+
+
+def _normalize(statistics):
+    return {
+        key: round(float(value), 6) if isinstance(value, (Decimal, float)) else value
+        for key, value in statistics.items()
+    }
+
+
+class AnalyticsStatisticsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ColumnarAnalyticsEngine.invalidate()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.wine = ProductType.objects.create(name='Вино', slug='wine')
+        self.cider = ProductType.objects.create(name='Сидр', slug='cider')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.kyiv_second = Store.objects.create(name='Сільпо Поділ', city='Київ', address='вул. Тестова 2')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+        Store.objects.create(name='Сільпо Одеса', city='Одеса', address='вул. Дерибасівська 1')
+
+        rows = [
+            (self.beer, self.kyiv, '45.00', '38.00', datetime(2025, 1, 10)),
+            (self.beer, self.kyiv_second, '55.00', None, datetime(2025, 2, 1)),
+            (self.beer, self.lviv, '29.99', '24.49', datetime(2025, 2, 15)),
+            (self.wine, self.kyiv, '125.10', '99.90', datetime(2025, 3, 1)),
+            (self.wine, self.lviv, '60.00', '50.00', datetime(2025, 3, 20)),
+            (self.wine, self.kyiv_second, '310.00', '250.00', datetime(2025, 3, 22)),
+            (self.cider, self.lviv, '75.00', None, datetime(2025, 4, 2)),
+        ]
+        for index, (product_type, store, regular_price, promo_price, created_at) in enumerate(rows):
+            product = Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=product_type, store=store,
+                regular_price=Decimal(regular_price),
+                promo_price=Decimal(promo_price) if promo_price else None,
+            )
+            product.created_at = timezone.make_aware(created_at)
+            product.save()
+
+        self.filters = [
+            NO_FILTERS,
+            AnalyticsFilters(city='Київ'),
+            AnalyticsFilters(product_type_ids=(self.wine.pk,)),
+            AnalyticsFilters(min_price=Decimal('50')),
+            AnalyticsFilters(city='Одеса'),
+        ]
+
+    def test_sql_statistics_match_detail_rows(self):
+        for repo in (AnalyticsRepository(), SummaryAnalyticsRepository()):
+            for filters in self.filters:
+                for method_name, kwargs, summarize in REPORTS:
+                    statistics = getattr(repo, f'{method_name}_statistics')(filters=filters, **kwargs)
+                    rows = list(getattr(repo, method_name)(filters=filters, **kwargs))
+
+                    self.assertEqual(
+                        _normalize(statistics), _normalize(summarize(rows)), (type(repo).__name__, method_name, filters)
+                    )
+
+    def test_numpy_engine_statistics(self):
+        repo = AnalyticsRepository()
+
+        for filters in self.filters:
+            for method_name, kwargs, _ in REPORTS:
+                method = getattr(repo, f'{method_name}_statistics')
+                self.assertEqual(
+                    _normalize(method(filters=filters, engine='numpy', **kwargs)),
+                    _normalize(method(filters=filters, **kwargs)),
+                    (method_name, filters)
+                )
+
+    def test_statistics_are_aggregated_in_sql(self):
+        repo = AnalyticsRepository()
+
+        # Один агрегатний запит поверх згрупованого звіту, без вибірки його рядків
+        with self.assertNumQueries(1):
+            statistics = repo.get_avg_prices_by_product_type_statistics()
+        self.assertEqual(statistics['total_product_types'], 3)
+        self.assertEqual(statistics['total_products'], 7)
+
+        # Підсумок + супутній запит за магазином-лідером
+        with self.assertNumQueries(2):
+            statistics = repo.get_promo_analysis_by_store_statistics()
+        self.assertEqual(statistics['total_promo_products'], 5)
+        self.assertEqual(statistics['store_with_most_promos'], 'Сільпо Київ')
+
+        self.assertEqual(repo.get_store_statistics_by_city_statistics(city='Харків'), {})
+
+    def test_creation_dynamics_statistics(self):
+        repo = AnalyticsRepository()
+        period = {'date_from': date(2025, 1, 1), 'date_to': date(2025, 12, 31)}
+
+        statistics = repo.get_creation_dynamics_statistics(granularity='month', **period)
+
+        self.assertEqual(statistics['total_periods'], 4)
+        self.assertEqual(statistics['total_products_added'], 7)
+        self.assertEqual(statistics['avg_products_per_period'], 7 / 4)
+        self.assertEqual((statistics['peak_period'], statistics['peak_period_count']), ('2025-03-01', 3))
+        self.assertEqual(statistics['product_types_tracked'], 3)
+        self.assertEqual(statistics['peak_month'], '2025-03-01 00:00:00+00:00')
+
+        weekly = repo.get_creation_dynamics_statistics(granularity='week', city='Львів', **period)
+        self.assertEqual(weekly['total_products_added'], 3)
+        self.assertNotIn('peak_month', weekly)
+
+    def test_api_statistics_cover_all_pages(self):
+        client = APIClient()
+
+        for url_name, key, expected in (
+            ('analytics-avg-prices', 'total_products', 7),
+            ('analytics-store-stats', 'total_stores', 4),
+            ('analytics-price-ranges', 'total_products', 7),
+            ('analytics-promo', 'total_promo_products', 5),
+            ('analytics-dynamics', 'total_products_added', 7),
+        ):
+            params = {'page_size': 1}
+            if url_name == 'analytics-dynamics':
+                params.update(date_from='2025-01-01', date_to='2025-12-31')
+
+            response = client.get(reverse(url_name), params)
+
+            self.assertEqual(response.status_code, 200, url_name)
+            self.assertEqual(len(response.data['data']), 1, url_name)
+            self.assertEqual(response.data['statistics'][key], expected, url_name)
+
+        # Рейтинг підсумовує саме поточну сторінку
+        first = client.get(reverse('analytics-top-expensive'), {'limit': 2}).data
+        second = client.get(
+            reverse('analytics-top-expensive'), {'limit': 2, 'cursor': first['pagination']['next_cursor']}
+        ).data
+        self.assertEqual(first['statistics']['avg_regular_price'], (310.00 + 125.10) / 2)
+        self.assertEqual(second['statistics']['avg_regular_price'], (75.00 + 60.00) / 2)
+        self.assertEqual(second['statistics']['products_with_promo'], 1)
@@ -0,0 +1,236 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+from monitoring.analytics import StatisticalAnalyzer
+from monitoring.analytics.approximate import ApproximateAnalyticsEngine
+from monitoring.analytics.sketches import HyperLogLog, KLLSketch, ReservoirSample
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+class SketchTestCase(TestCase):
+
+    def setUp(self):
+        self.values = np.random.default_rng(7).lognormal(4, 1, 200000)
+        self.sorted_values = np.sort(self.values)
+
+    def rank_of(self, value):
+        return np.searchsorted(self.sorted_values, value) / len(self.values)
+
+    def test_kll_quantiles_within_rank_error(self):
+        sketch = KLLSketch(seed=1)
+        for chunk in np.array_split(self.values, 20):
+            sketch.update(chunk)
+
+        self.assertFalse(sketch.is_exact)
+        self.assertLess(sketch.retained, 2000)
+        for fraction in (0.1, 0.5, 0.9):
+            self.assertLessEqual(abs(self.rank_of(sketch.quantile(fraction)) - fraction), sketch.rank_error)
+
+    def test_kll_merge(self):
+        left = KLLSketch(seed=1).update(self.values[:100000])
+        right = KLLSketch(seed=2).update(self.values[100000:])
+
+        left.merge(right)
+
+        self.assertEqual(left.count, len(self.values))
+        self.assertEqual(int(left.weighted_items()[1].sum()), len(self.values))
+        self.assertLessEqual(abs(self.rank_of(left.quantile(0.5)) - 0.5), left.rank_error)
+
+    def test_kll_exact_for_small_inputs(self):
+        sketch = KLLSketch().update([5, 1, 3])
+
+        self.assertTrue(sketch.is_exact)
+        self.assertEqual(sketch.rank_error, 0.0)
+        self.assertEqual(sketch.quantile(0.5), 3)
+
+    def test_hyperloglog(self):
+        sketch = HyperLogLog().update(np.arange(50000))
+        other = HyperLogLog().update(np.arange(25000, 75000))
+
+        sketch.merge(other)
+
+        self.assertLessEqual(abs(sketch.estimate() - 75000) / 75000, 3 * sketch.relative_error)
+        self.assertEqual(HyperLogLog().update([1, 2, 2, 3]).estimate(), 3)
+
+    def test_reservoir_sample(self):
+        sample = ReservoirSample(seed=3)
+        for chunk in np.array_split(self.values, 20):
+            sample.update(chunk)
+
+        self.assertEqual(sample.count, len(self.values))
+        self.assertEqual(len(sample.items), sample.size)
+        self.assertLessEqual(abs(sample.mean() - self.values.mean()), 2 * sample.mean_error())
+
+    def test_statistical_analyzer_approximate(self):
+        df = pd.DataFrame({'price': self.values})
+
+        exact = StatisticalAnalyzer().calculate_basic_statistics(df, ['price'])['price']
+        approximate = StatisticalAnalyzer().calculate_basic_statistics(df, ['price'], approximate=True)['price']
+
+        self.assertEqual(approximate['min'], exact['min'])
+        self.assertEqual(approximate['max'], exact['max'])
+        self.assertLessEqual(
+            abs(self.rank_of(approximate['median']) - 0.5),
+            approximate['error_bounds']['quantile_rank']
+        )
+        self.assertIn('mean_95', approximate['error_bounds'])
+
+
+@override_settings(ANALYTICS_SKETCH_REFRESH_SECONDS=0)
+class ApproximateAnalyticsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ApproximateAnalyticsEngine.invalidate()
+        # Фонова перебудова — у потоці тесту, щоб бачити його транзакцію
+        patcher = mock.patch.object(ApproximateAnalyticsEngine, '_start', side_effect=lambda target: target())
+        self.start = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        beer = ProductType.objects.create(name='Пиво', slug='beer')
+        wine = ProductType.objects.create(name='Вино', slug='wine')
+        kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+        Store.objects.create(name='Сільпо Одеса', city='Одеса', address='вул. Морська 1')
+        closed = Store.objects.create(name='Сільпо Старий', city='Київ', address='вул. Стара 1', is_active=False)
+
+        rows = [
+            (beer, kyiv, '25.00', None),
+            (beer, kyiv, '45.00', '38.00'),
+            (beer, lviv, '55.00', None),
+            (wine, lviv, '120.00', '99.00'),
+            (wine, closed, '300.00', None),
+        ]
+        for index, (product_type, store, regular_price, promo_price) in enumerate(rows):
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=product_type, store=store,
+                regular_price=Decimal(regular_price),
+                promo_price=Decimal(promo_price) if promo_price else None,
+            )
+
+        self.repo = AnalyticsRepository()
+
+    def test_avg_prices_match_exact_values(self):
+        exact = list(self.repo.get_avg_prices_by_product_type())
+        approximate = self.repo.get_avg_prices_by_product_type(engine='sketch')
+
+        self.assertEqual([row['id'] for row in approximate], [row['id'] for row in exact])
+        for approx_row, exact_row in zip(approximate, exact):
+            self.assertEqual(approx_row['product_count'], exact_row['product_count'])
+            self.assertAlmostEqual(approx_row['avg_regular_price'], float(exact_row['avg_regular_price']))
+
+        beer = next(row for row in approximate if row['product_type_name'] == 'Пиво')
+        self.assertEqual(beer['median_price'], 45.0)
+        self.assertEqual(beer['stores_estimate'], 2)
+        self.assertEqual(beer['error_bounds']['quantile_rank'], 0.0)
+
+    def test_store_statistics_match_exact_values(self):
+        exact = {row['city']: row for row in self.repo.get_store_statistics_by_city()}
+        approximate = {row['city']: row for row in self.repo.get_store_statistics_by_city(engine='sketch')}
+
+        self.assertEqual(set(approximate), set(exact))
+        for city, row in approximate.items():
+            self.assertEqual(row['store_count'], exact[city]['store_count'])
+            self.assertEqual(row['total_products'], exact[city]['total_products'])
+            self.assertEqual(row['promo_products_count'], exact[city]['promo_products_count'])
+
+    def test_price_ranges_match_exact_counts(self):
+        exact = self.repo.get_products_by_price_ranges(edges=[50, 100])
+        approximate = self.repo.get_products_by_price_ranges(edges=[50, 100], engine='sketch')
+
+        self.assertEqual([{k: v for k, v in row.items() if k != 'count_error'} for row in approximate], exact)
+        self.assertTrue(all(row['count_error'] == 0 for row in approximate))
+
+    def test_unsupported_report(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_top_expensive_products(engine='sketch')
+
+    def test_sketches_rebuilt_after_write(self):
+        self.repo.get_avg_prices_by_product_type(engine='sketch')
+        Product.objects.filter(sku='SKU000').delete()
+
+        # Запит, що помітив зміну, ще отримує попередні скетчі й запускає перебудову
+        stale = ApproximateAnalyticsEngine.current()
+        self.assertTrue(stale.describe()['stale'])
+        self.assertEqual(self.start.call_count, 1)
+
+        beer = next(
+            row for row in self.repo.get_avg_prices_by_product_type(engine='sketch')
+            if row['product_type_name'] == 'Пиво'
+        )
+        self.assertEqual(beer['product_count'], 2)
+
+    def test_rebuild_in_progress_does_not_block_readers(self):
+        sketches = ApproximateAnalyticsEngine.current().sketches
+        Product.objects.filter(sku='SKU000').delete()
+
+        ApproximateAnalyticsEngine._rebuild_lock.acquire()  # перебудова вже йде
+        try:
+            # Лише читання версії даних — без сканування каталогу
+            with self.assertNumQueries(1):
+                self.assertIs(ApproximateAnalyticsEngine.current().sketches, sketches)
+        finally:
+            ApproximateAnalyticsEngine._rebuild_lock.release()
+        self.start.assert_not_called()
+
+    @override_settings(ANALYTICS_SKETCH_REFRESH_SECONDS=3600)
+    def test_refresh_interval_allows_stale_sketches(self):
+        ApproximateAnalyticsEngine.current()
+        Product.objects.filter(sku='SKU000').delete()
+
+        engine = ApproximateAnalyticsEngine.current()
+
+        self.assertTrue(engine.describe()['stale'])
+        self.start.assert_not_called()
+        self.assertEqual(
+            next(row for row in engine.get_avg_prices_by_product_type() if row['product_type_name'] == 'Пиво')['product_count'],
+            3
+        )
+
+    def test_api_approximate_mode(self):
+        client = APIClient()
+
+        response = client.get(reverse('analytics-avg-prices'), {'approximate': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('approximation', response.data)
+        self.assertIn('quantile_rank_error', response.data['approximation'])
+        self.assertIn('error_bounds', response.data['data'][0])
+
+        response = client.get(reverse('analytics-price-ranges'), {'approximate': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('count_error', response.data['data'][0])
+
+        response = client.get(reverse('analytics-avg-prices'))
+        self.assertNotIn('approximation', response.data)
+
+    def test_api_unsupported_filters(self):
+        client = APIClient()
+        store = Store.objects.get(city='Львів')
+
+        for url_name, params in (
+            ('analytics-store-stats', {'store': store.pk}),
+            ('analytics-avg-prices', {'min_price': 10}),
+            ('analytics-price-ranges', {'city': 'Київ'}),
+        ):
+            response = client.get(reverse(url_name), {'approximate': 'true', **params})
+            self.assertEqual(response.status_code, 400, url_name)
+            self.assertIn('approximate mode cannot be filtered by', response.data['error'])
+
+    def test_api_reports_without_approximate_mode_keep_etag(self):
+        # Рейтинг, промо й динаміка ігнорують approximate і віддають точні дані з версією
+        client = APIClient()
+        for url_name in ('analytics-top-expensive', 'analytics-promo', 'analytics-dynamics'):
+            exact = client.get(reverse(url_name))
+            response = client.get(reverse(url_name), {'approximate': 'true'})
+            self.assertEqual(response.status_code, 200, url_name)
+            self.assertIn('ETag', response, url_name)
+            self.assertEqual(response.data['data'], exact.data['data'], url_name)
+
+        self.assertNotIn('ETag', client.get(reverse('analytics-avg-prices'), {'approximate': 'true'}))
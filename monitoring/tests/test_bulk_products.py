@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.models import PriceObservation, Product, ProductType, Store, StoreSummary
+
+from .query_budget import QueryBudgetMixin
+
+
+class BulkProductsTestCase(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('integration', password='secret'))
+        self.url = reverse('product-bulk')
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.existing = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.store, regular_price=Decimal('45.00')
+        )
+
+    def _item(self, index, **overrides):
+        return {
+            'name': f'Продукт {index}', 'sku': f'SKU{index:03d}', 'product_type': self.beer.pk,
+            'store': self.store.pk, 'regular_price': '40.00', **overrides,
+        }
+
+    def _create(self, count):
+        return self.client.post(self.url, [self._item(index) for index in range(count)], format='json')
+
+    def test_create_reports_each_item(self):
+        response = self.client.post(self.url, [
+            self._item(0),
+            self._item(1, store=999),
+            self._item(2, sku='OB001'),
+            self._item(3, regular_price='abc'),
+            self._item(4, name='Продукт 0'),
+            'not an object',
+            self._item(5, promo_price='35.50'),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 5))
+        self.assertEqual([result['status'] for result in response.data['results']], [201, 400, 400, 400, 400, 400, 201])
+        results = response.data['results']
+        self.assertIn('store', results[1]['errors'])
+        self.assertIn('sku', results[2]['errors'])
+        self.assertIn('regular_price', results[3]['errors'])
+        self.assertIn('name', results[4]['errors'])
+        self.assertEqual(Product.objects.get(pk=results[6]['id']).promo_price, Decimal('35.50'))
+
+        # Зведення й історія цін оновлені без сигналів
+        summary = StoreSummary.objects.get(store=self.store)
+        self.assertEqual(summary.product_count, 3)
+        self.assertEqual(PriceObservation.objects.count(), 3)
+
+    def test_queries_do_not_grow_with_batch(self):
+        with self.assertMaxQueries(30) as small:
+            self._create(3)
+        Product.objects.exclude(pk=self.existing.pk).delete()
+        with self.assertMaxQueries(len(small.captured_queries)):
+            response = self._create(60)
+        self.assertEqual(response.data['created'], 60)
+
+    def test_update_and_delete(self):
+        created = [result['id'] for result in self._create(3).data['results']]
+
+        response = self.client.patch(self.url, [
+            {'id': created[0], 'promo_price': '30.00'},
+            {'id': created[1], 'name': 'Оболонь'},
+            {'id': 999999, 'promo_price': '30.00'},
+            {'id': created[0], 'regular_price': '1.00'},
+            {'promo_price': '30.00'},
+        ], format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 400, 404, 400, 400])
+        product = Product.objects.get(pk=created[0])
+        self.assertEqual((product.promo_price, product.regular_price), (Decimal('30.00'), Decimal('40.00')))
+        self.assertEqual(StoreSummary.objects.get(store=self.store).promo_count, 1)
+
+        response = self.client.put(self.url, [{'id': created[1], 'promo_price': '30.00'}], format='json')
+        self.assertIn('name', response.data['results'][0]['errors'])
+
+        response = self.client.delete(self.url, [created[0], created[1], 'x', 999999, created[0]], format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], [204, 204, 400, 404, 404])
+        self.assertEqual(response.data['deleted'], 2)
+        self.assertEqual(set(Product.objects.values_list('id', flat=True)), {self.existing.pk, created[2]})
+        summary = StoreSummary.objects.get(store=self.store)
+        self.assertEqual((summary.product_count, summary.promo_count), (2, 0))
+
+    @override_settings(API_BULK_MAX_ITEMS=2)
+    def test_limits_and_permissions(self):
+        self.assertEqual(self._create(3).status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'name': 'x'}, format='json').status_code, 400)
+        self.assertIn(APIClient().post(self.url, [], format='json').status_code, (401, 403))
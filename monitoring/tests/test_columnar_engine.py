@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from monitoring.analytics.columnar import ColumnarAnalyticsEngine, ColumnarProductSnapshot
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+def _normalize(rows):
+    return [
+        {
+            key: round(float(value), 6) if isinstance(value, (Decimal, float)) else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+class ColumnarEngineTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ColumnarAnalyticsEngine.invalidate()
+
+        beer = ProductType.objects.create(name='Пиво', slug='beer')
+        wine = ProductType.objects.create(name='Вино', slug='wine')
+        ProductType.objects.create(name='Вода', slug='water')
+
+        kyiv = Store.objects.create(name='Сільпо Хрещатик', city='Київ', address='вул. Хрещатик 1')
+        lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+        Store.objects.create(name='Сільпо Одеса', city='Одеса', address='вул. Дерибасівська 1')
+        closed = Store.objects.create(name='Сільпо Закритий', city='Київ', address='вул. Стара 2', is_active=False)
+
+        prices = [
+            (beer, kyiv, '45.00', '38.00'),
+            (beer, kyiv, '55.55', None),
+            (beer, lviv, '29.99', '24.49'),
+            (beer, lviv, '30.00', None),
+            (wine, lviv, '125.10', '99.90'),
+            (wine, kyiv, '60.00', None),
+            (wine, closed, '310.00', '250.00'),
+        ]
+        for index, (product_type, store, regular_price, promo_price) in enumerate(prices):
+            Product.objects.create(
+                name=f'Продукт {index}',
+                sku=f'SKU{index:03d}',
+                product_type=product_type,
+                store=store,
+                regular_price=Decimal(regular_price),
+                promo_price=Decimal(promo_price) if promo_price else None,
+            )
+
+        old_product = Product.objects.create(
+            name='Старий', sku='OLD001', product_type=beer, store=kyiv, regular_price=Decimal('12.00')
+        )
+        old_product.created_at = timezone.now() - timedelta(days=400)
+        old_product.save()
+
+        Product.objects.create(
+            name='Неактивний', sku='OFF001', product_type=wine, store=kyiv,
+            regular_price=Decimal('999.00'), is_active=False
+        )
+
+        self.repo = AnalyticsRepository()
+
+    def assertEnginesMatch(self, method_name, sort_key=None, **kwargs):
+        orm_rows = list(getattr(self.repo, method_name)(**kwargs))
+        numpy_rows = getattr(self.repo, method_name)(engine='numpy', **kwargs)
+        if sort_key:
+            orm_rows.sort(key=sort_key)
+            numpy_rows = sorted(numpy_rows, key=sort_key)
+        self.assertEqual(_normalize(numpy_rows), _normalize(orm_rows))
+
+    def test_snapshot_layout(self):
+        snapshot = ColumnarProductSnapshot.load()
+
+        self.assertEqual(len(snapshot), 8)
+        self.assertEqual(snapshot.regular_kop.dtype.name, 'int64')
+        self.assertEqual(int(snapshot.regular_kop.max()), 31000)
+        self.assertEqual(snapshot.city_names, ['Київ', 'Львів', 'Одеса'])
+
+    def test_avg_prices_by_product_type(self):
+        self.assertEnginesMatch('get_avg_prices_by_product_type')
+
+    def test_store_statistics_by_city(self):
+        self.assertEnginesMatch('get_store_statistics_by_city', sort_key=lambda row: row['city'])
+        self.assertEnginesMatch('get_store_statistics_by_city', city='Київ')
+
+    def test_top_expensive_products(self):
+        self.assertEnginesMatch('get_top_expensive_products', limit=4)
+        self.assertEnginesMatch('get_top_expensive_products', limit=2, product_type='Пиво', city='Київ')
+
+    def test_products_by_price_ranges(self):
+        self.assertEnginesMatch('get_products_by_price_ranges')
+        self.assertEnginesMatch('get_products_by_price_ranges', product_type='Вино')
+
+    def test_promo_analysis_by_store(self):
+        self.assertEnginesMatch('get_promo_analysis_by_store', sort_key=lambda row: row['id'])
+        self.assertEnginesMatch('get_promo_analysis_by_store', min_promo_products=2)
+
+    def test_product_creation_dynamics(self):
+        self.assertEnginesMatch('get_product_creation_dynamics')
+
+    def test_product_creation_dynamics_uses_offset_of_each_row(self):
+        # 31.01 23:30 за Києвом — ще січень (UTC+2), 01.07 00:30 — уже липень (UTC+3)
+        beer = ProductType.objects.get(slug='beer')
+        store = Store.objects.get(city='Львів')
+        for sku, created_at in (
+            ('DST001', datetime(2025, 1, 31, 21, 30, tzinfo=dt_timezone.utc)),
+            ('DST002', datetime(2025, 6, 30, 21, 30, tzinfo=dt_timezone.utc)),
+        ):
+            product = Product.objects.create(
+                name=sku, sku=sku, product_type=beer, store=store, regular_price=Decimal('10.00')
+            )
+            Product.objects.filter(pk=product.pk).update(created_at=created_at)
+
+        with timezone.override('Europe/Kyiv'):
+            self.assertEnginesMatch(
+                'get_product_creation_dynamics', date_from=date(2025, 1, 1), date_to=date(2025, 7, 31)
+            )
+            months = [row['month'] for row in self.repo.get_product_creation_dynamics(
+                engine='numpy', date_from=date(2025, 1, 1), date_to=date(2025, 7, 31)
+            )]
+        self.assertEqual([(month.year, month.month) for month in months], [(2025, 1), (2025, 7)])
+
+    @override_settings(ANALYTICS_COLUMNAR_REFRESH_SECONDS=0)
+    def test_snapshot_reloads_after_write(self):
+        self.repo.get_avg_prices_by_product_type(engine='numpy')
+        Product.objects.filter(sku='SKU000').get().delete()
+
+        self.assertEnginesMatch('get_avg_prices_by_product_type')
+
+    @override_settings(ANALYTICS_COLUMNAR_REFRESH_SECONDS=3600)
+    def test_snapshot_reload_is_rate_limited(self):
+        snapshot = ColumnarAnalyticsEngine.current().snapshot
+        Product.objects.filter(sku='SKU000').get().delete()
+
+        with self.assertNumQueries(1):
+            self.assertIs(ColumnarAnalyticsEngine.current().snapshot, snapshot)
+
+        snapshot.loaded_at -= 3600
+        self.assertEqual(len(ColumnarAnalyticsEngine.current().snapshot), len(snapshot) - 1)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_avg_prices_by_product_type(engine='gpu')
+
+    def test_unknown_engine_query_parameter(self):
+        client = APIClient()
+        for url_name in ('analytics-avg-prices', 'analytics-store-stats', 'analytics-top-expensive',
+                         'analytics-price-ranges', 'analytics-promo'):
+            response = client.get(reverse(url_name), {'engine': 'bogus'})
+            self.assertEqual(response.status_code, 400, url_name)
+            self.assertIn('orm, numpy', response.data['error'])
+
+        # Рейтинг і промо не мають наближеного режиму
+        response = client.get(reverse('analytics-top-expensive'), {'engine': 'sketch'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'engine must be one of: orm, numpy')
+
+    def test_engine_query_parameter(self):
+        response = APIClient().get(reverse('analytics-avg-prices'), {'engine': 'numpy'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['statistics']['total_products'], 8)
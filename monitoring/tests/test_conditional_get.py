@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from decimal import Decimal
+import time
+
+from monitoring.models import Product, ProductType, Store
+
+
+class ConditionalGetTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.store, regular_price=Decimal('45.00')
+        )
+
+    def test_if_none_match_returns_304_without_running_view(self):
+        for url in (reverse('product-list'), reverse('product-detail', args=[self.product.pk]),
+                    reverse('analytics-avg-prices')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertIn('Last-Modified', response)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('Accept', response['Vary'])
+
+                # Лише читання версії даних
+                with self.assertNumQueries(1):
+                    cached = self.client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached.content, b'')
+                self.assertEqual(cached['ETag'], etag)
+
+    def test_writes_change_the_etag(self):
+        url = reverse('product-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page_size': 1})['ETag'], etag)
+
+        self.product.regular_price = Decimal('40.00')
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['regular_price'], '40.00')
+
+    def test_if_modified_since(self):
+        url = reverse('analytics-avg-prices')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() - 3600)).status_code, 200)
+
+    @override_settings(API_CACHE_MAX_AGE=30)
+    def test_exemptions_and_cache_control(self):
+        url = reverse('analytics-avg-prices')
+        self.assertNotIn('ETag', self.client.get(url, {'approximate': 'true'}))
+        # Історія цін не має наближеного режиму — approximate її не стосується
+        response = self.client.get(reverse('analytics-price-changes'), {'date_from': '2025-01-01', 'approximate': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('max-age=30', self.client.get(url)['Cache-Control'])
+
+        self.client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        response = self.client.get(reverse('store-list'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('store-list'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(APIClient().get(reverse('store-list'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 401)
+
+        with override_settings(API_CONDITIONAL_GET=False):
+            self.assertNotIn('ETag', self.client.get(url))
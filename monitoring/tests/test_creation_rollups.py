@@ -0,0 +1,148 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import date, datetime
+from decimal import Decimal
+
+from monitoring.analytics.rollups import creation_day, rebuild_creation_rollups
+from monitoring.models import Product, ProductCreationRollup, ProductType, Store
+from monitoring.repositories import repository_registry
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+def _rollup_rows():
+    return sorted(
+        ProductCreationRollup.objects.filter(products_added__gt=0).values_list(
+            'day', 'product_type_id', 'store_id', 'products_added'
+        )
+    )
+
+
+def _live_rows():
+    counts = {}
+    for product in Product.objects.filter(is_active=True):
+        key = (creation_day(product.created_at), product.product_type_id, product.store_id)
+        counts[key] = counts.get(key, 0) + 1
+    return sorted(key + (count,) for key, count in counts.items())
+
+
+class CreationRollupTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.wine = ProductType.objects.create(name='Вино', slug='wine')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+
+        days = [
+            datetime(2025, 1, 6, 10), datetime(2025, 1, 8, 12), datetime(2025, 1, 20, 9),
+            datetime(2025, 2, 3, 15), datetime(2025, 4, 1, 8), datetime(2025, 4, 1, 18),
+        ]
+        self.products = []
+        for index, created_at in enumerate(days):
+            product = Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}',
+                product_type=self.beer if index % 2 == 0 else self.wine,
+                store=self.kyiv if index < 4 else self.lviv,
+                regular_price=Decimal('50.00'),
+            )
+            product.created_at = timezone.make_aware(created_at)
+            product.save()
+            self.products.append(product)
+
+        self.repo = AnalyticsRepository()
+        self.period = {'date_from': date(2025, 1, 1), 'date_to': date(2025, 12, 31)}
+
+    def test_rollup_follows_writes(self):
+        self.assertEqual(_rollup_rows(), _live_rows())
+
+        repository_registry.products.update(self.products[0].pk, product_type=self.wine, store=self.lviv)
+        self.products[1].is_active = False
+        self.products[1].save()
+        self.products[2].delete()
+        Product.objects.create(
+            name='Новий', sku='NEW001', product_type=self.beer, store=self.kyiv, regular_price=Decimal('10.00')
+        )
+
+        self.assertEqual(_rollup_rows(), _live_rows())
+
+    def test_rebuild_matches_incremental(self):
+        incremental = _rollup_rows()
+
+        rebuild_creation_rollups()
+
+        self.assertEqual(_rollup_rows(), incremental)
+
+    def test_granularities(self):
+        def totals(granularity):
+            result = self.repo.get_creation_dynamics(granularity=granularity, **self.period)
+            totals = {}
+            for row in result:
+                totals[row['period']] = totals.get(row['period'], 0) + row['products_added']
+            return totals
+
+        self.assertEqual(totals('day')[date(2025, 4, 1)], 2)
+        self.assertEqual(totals('week'), {
+            date(2025, 1, 6): 2, date(2025, 1, 20): 1, date(2025, 2, 3): 1, date(2025, 3, 31): 2,
+        })
+        self.assertEqual(totals('month'), {date(2025, 1, 1): 3, date(2025, 2, 1): 1, date(2025, 4, 1): 2})
+        self.assertEqual(totals('quarter'), {date(2025, 1, 1): 4, date(2025, 4, 1): 2})
+
+    def test_filters_and_range(self):
+        result = self.repo.get_creation_dynamics(
+            granularity='month', date_from=date(2025, 1, 7), date_to=date(2025, 3, 1), product_type='Пиво'
+        )
+
+        self.assertEqual(list(result), [
+            {'period': date(2025, 1, 1), 'product_type_name': 'Пиво', 'products_added': 1},
+        ])
+        self.assertEqual(
+            sum(row['products_added'] for row in self.repo.get_creation_dynamics(store_id=self.lviv.pk, **self.period)),
+            2
+        )
+
+    def test_month_granularity_matches_raw_dynamics(self):
+        recent = Product.objects.create(
+            name='Свіжий', sku='NEW002', product_type=self.beer, store=self.kyiv, regular_price=Decimal('10.00')
+        )
+
+        rollup = {
+            (row['period'], row['product_type_name']): row['products_added']
+            for row in self.repo.get_creation_dynamics()
+        }
+        raw = {
+            (timezone.localtime(row['month']).date(), row['product_type_name']): row['products_added']
+            for row in self.repo.get_product_creation_dynamics()
+        }
+
+        self.assertEqual(rollup, raw)
+        self.assertIn((creation_day(recent.created_at).replace(day=1), 'Пиво'), rollup)
+
+    def test_unknown_granularity(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_creation_dynamics(granularity='year')
+
+    def test_api(self):
+        client = APIClient()
+        url = reverse('analytics-dynamics')
+
+        response = client.get(url, {'granularity': 'week', 'date_from': '2025-01-01', 'date_to': '2025-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['statistics']['granularity'], 'week')
+        self.assertEqual(response.data['statistics']['total_products_added'], 6)
+        self.assertEqual(response.data['data'][0]['period'], '2025-01-06')
+
+        # month і peak_month — як до денних зведень: str() початку місяця з TruncMonth
+        response = client.get(url, {'date_from': '2025-01-01', 'date_to': '2025-12-31'})
+        self.assertEqual(response.data['statistics']['peak_month'], '2025-01-01 00:00:00+00:00')
+        self.assertEqual(response.data['data'][0]['month'], '2025-01-01 00:00:00+00:00')
+        self.assertEqual(response.data['data'][0]['period'], '2025-01-01')
+        with timezone.override('Europe/Kyiv'):
+            response = client.get(url, {'date_from': '2025-01-01', 'date_to': '2025-12-31'})
+        self.assertEqual(response.data['data'][0]['month'], '2025-01-01 00:00:00+02:00')
+
+        self.assertEqual(client.get(url, {'granularity': 'year'}).status_code, 400)
+        self.assertEqual(client.get(url, {'date_from': '2025-13-01'}).status_code, 400)
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.models import Product, ProductType, Store
+
+
+@override_settings(API_PAGE_SIZE=2, API_MAX_PAGE_SIZE=3)
+class CrudCursorPaginationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.products = [
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=self.beer, store=self.store,
+                regular_price=Decimal('40.00') + index
+            )
+            for index in range(5)
+        ]
+
+    def test_pages_follow_next_link_without_offset(self):
+        url = reverse('product-list')
+        ids = []
+        pages = 0
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(ids, [product.pk for product in self.products])
+        self.assertEqual(pages, 3)
+
+    def test_page_size_is_configurable_and_capped(self):
+        url = reverse('product-list')
+        self.assertEqual(len(self.client.get(url, {'page_size': 1}).data['results']), 1)
+        self.assertEqual(len(self.client.get(url, {'page_size': 100}).data['results']), 3)
+        self.assertEqual(self.client.get(url, {'cursor': 'зламаний'}).status_code, 404)
+
+    def test_store_and_product_type_lists(self):
+        for index in range(2):
+            Store.objects.create(name=f'Сільпо {index}', city='Львів', address=f'вул. Тестова {index + 2}')
+
+        response = self.client.get(reverse('store-list'))
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+        response = self.client.get(reverse('product-type-list'))
+        self.assertEqual([row['slug'] for row in response.data['results']], ['beer'])
+        self.assertIsNone(response.data['next'])
@@ -0,0 +1,145 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from monitoring.export import FORMAT_ARROW, FORMAT_CSV, FORMAT_NDJSON, FORMAT_PARQUET, get_dataset, stream_export
+from monitoring.models import Product, ProductType, Store
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+@unittest.skipIf(pq is None, 'pyarrow is not installed')
+class ColumnarExportTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='вул. Тестова 2')
+        for index, store in enumerate((self.kyiv, self.lviv, self.kyiv)):
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=self.beer, store=store,
+                regular_price=Decimal('40.00') + index, promo_price=Decimal('35.50') if index == 1 else None
+            )
+
+    def _export(self, dataset, format, chunk_size=2):
+        return b''.join(stream_export(get_dataset(dataset), format, chunk_size))
+
+    def test_parquet_row_groups_and_dictionary_columns(self):
+        data = self._export('products', FORMAT_PARQUET)
+
+        self.assertEqual(pq.ParquetFile(io.BytesIO(data)).metadata.num_row_groups, 2)
+        frame = pd.read_parquet(io.BytesIO(data))
+        self.assertEqual(list(frame['sku']), ['SKU000', 'SKU001', 'SKU002'])
+        self.assertEqual(list(frame['city']), ['Київ', 'Львів', 'Київ'])
+        self.assertEqual(frame['city'].dtype.name, 'category')
+        self.assertEqual(list(frame['regular_price']), [Decimal('40.00'), Decimal('41.00'), Decimal('42.00')])
+        self.assertTrue(pd.isna(frame['promo_price'][0]))
+        self.assertEqual(str(frame['created_at'].dt.tz), 'UTC')
+
+    def test_arrow_ipc_with_growing_dictionaries(self):
+        data = self._export('products', FORMAT_ARROW, chunk_size=1)
+
+        frame = pd.read_feather(io.BytesIO(data))
+        self.assertEqual(list(frame['store']), ['Сільпо Київ', 'Сільпо Львів', 'Сільпо Київ'])
+        self.assertEqual(len(frame), 3)
+
+        history = pd.read_feather(io.BytesIO(self._export('price_history', FORMAT_ARROW)))
+        self.assertEqual(list(history['regular_price_kop']), [4000, 4100, 4200])
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            stdout = io.StringIO()
+            call_command('export_catalog', output_dir, '--datasets', 'stores,product_types', stdout=stdout)
+
+            self.assertEqual(sorted(os.listdir(output_dir)), ['product_types.parquet', 'stores.parquet'])
+            stores = pd.read_parquet(os.path.join(output_dir, 'stores.parquet'))
+        self.assertEqual(list(stores['name']), ['Сільпо Київ', 'Сільпо Львів'])
+
+    def test_api(self):
+        client = APIClient()
+        url = reverse('export-dataset', args=['products'])
+        self.assertIn(client.get(url).status_code, (401, 403))
+
+        client.force_authenticate(User.objects.create_user('analyst', password='secret'))
+        response = client.get(url, {'export_format': 'arrow'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.file')
+        self.assertIn('products.arrow', response['Content-Disposition'])
+        frame = pd.read_feather(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(frame), 3)
+
+        self.assertEqual(client.get(reverse('export-dataset', args=['users'])).status_code, 400)
+        self.assertEqual(client.get(url, {'export_format': 'xlsx'}).status_code, 400)
+
+
+class TextExportTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.kyiv = Store.objects.create(name='Сільпо, Київ', city='Київ', address='вул. Тестова 1')
+        for index in range(3):
+            Product.objects.create(
+                name=f'Продукт "{index}"', sku=f'SKU{index:03d}', product_type=self.beer, store=self.kyiv,
+                regular_price=Decimal('40.00') + index, promo_price=Decimal('35.50') if index == 1 else None
+            )
+
+    def test_ndjson_streams_chunk_by_chunk(self):
+        chunks = stream_export(get_dataset('products'), FORMAT_NDJSON, chunk_size=1)
+        with self.assertNumQueries(0):
+            self.assertEqual(next(chunks), b'')
+
+        with CaptureQueriesContext(connection) as queries:
+            rest = list(chunks)
+        self.assertEqual(len(rest), 3)
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+
+        rows = [json.loads(line) for line in b''.join(rest).decode().splitlines()]
+        self.assertEqual([row['sku'] for row in rows], ['SKU000', 'SKU001', 'SKU002'])
+        self.assertEqual((rows[1]['regular_price'], rows[1]['promo_price'], rows[0]['promo_price']), ('41.00', '35.50', None))
+        self.assertEqual((rows[0]['store'], rows[0]['city'], rows[0]['product_type']), ('Сільпо, Київ', 'Київ', 'Пиво'))
+        self.assertTrue(rows[0]['created_at'].endswith('Z'))
+
+    def test_csv_api(self):
+        client = APIClient()
+        url = reverse('product-export')
+        self.assertIn(client.get(url).status_code, (401, 403))
+
+        client.force_authenticate(User.objects.create_user('analyst', password='secret'))
+        response = client.get(url, {'export_format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('products.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['name'] for row in rows], ['Продукт "0"', 'Продукт "1"', 'Продукт "2"'])
+        self.assertEqual((rows[0]['store'], rows[0]['promo_price'], rows[1]['promo_price']), ('Сільпо, Київ', '', '35.50'))
+
+        response = client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+        self.assertEqual(client.get(url, {'export_format': 'xml'}).status_code, 400)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('export_catalog', output_dir, '--format', FORMAT_CSV, '--datasets', 'stores', stdout=io.StringIO())
+            with open(os.path.join(output_dir, 'stores.csv'), encoding='utf-8') as exported:
+                self.assertEqual(exported.read().splitlines()[0], 'id,name,city,address,is_active,created_at,updated_at')
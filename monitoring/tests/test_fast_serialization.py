@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from datetime import date, datetime
+from decimal import Decimal
+import io
+
+from monitoring.api.fast_serializers import ValuesSerializer
+from monitoring.api.renderers import FastJSONRenderer
+from monitoring.api.serializers import ProductSerializer, StoreSerializer
+from monitoring.models import Product, ProductType, Store
+
+
+class FastSerializationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво "Світле"', slug='beer', description='')
+        self.kyiv = Store.objects.create(
+            name='Сільпо\u2028Київ', city='Київ', address='вул. Тестова 1\t\x01', description='😀 <b>&</b>'
+        )
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='вул. Тестова 2', is_active=False)
+        for index, store in enumerate((self.kyiv, self.lviv, self.kyiv)):
+            Product.objects.create(
+                name=f'Продукт\\{index}', sku=f'SKU{index:03d}', product_type=self.beer, store=store,
+                regular_price=Decimal('40.00') + index, promo_price=Decimal('35.5') if index == 1 else None,
+                promo_ends_at=date(2026, 10, 31) if index == 1 else None
+            )
+        Product.objects.filter(sku='SKU002').update(created_at=datetime(2026, 7, 1, 0, 30, 1, 123456, tzinfo=timezone.utc))
+
+    def _render_both(self, serializer_class, queryset):
+        fast = ValuesSerializer(serializer_class)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = FastJSONRenderer().render(fast.serialize(queryset.values(*fast.lookups)))
+        return expected, actual
+
+    def test_byte_identical_to_model_serializer(self):
+        for serializer_class, queryset in (
+            (ProductSerializer, Product.objects.order_by('id')),
+            (StoreSerializer, Store.objects.order_by('id')),
+        ):
+            expected, actual = self._render_both(serializer_class, queryset)
+            self.assertEqual(actual, expected)
+        self.assertIn(b'\\u2028', actual)
+
+        with timezone.override('Europe/Kyiv'):
+            expected, actual = self._render_both(ProductSerializer, Product.objects.order_by('id'))
+        self.assertEqual(actual, expected)
+        self.assertIn(b'"2026-07-01T03:30:01.123456+03:00"', actual)
+
+    def test_list_endpoints_match_slow_path(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        for name in ('product-list', 'store-list', 'product-type-list'):
+            with override_settings(API_FAST_LIST_SERIALIZATION=False):
+                expected = client.get(reverse(name), {'page_size': 2})
+            actual = client.get(reverse(name), {'page_size': 2})
+            self.assertEqual(actual.status_code, 200)
+            self.assertEqual(actual.content, expected.content)
+
+        pretty = client.get(reverse('product-list'), HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  "next"', pretty.content)
+
+    def test_benchmark_command(self):
+        stdout = io.StringIO()
+        call_command('benchmark_serializers', '--rows', '50', '--repeat', '1', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('ProductSerializer', output)
+        self.assertIn('ValuesSerializer', output)
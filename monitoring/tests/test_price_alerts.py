@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+import io
+
+from monitoring.alerts import ThresholdIndex
+from monitoring.ingestion import PriceFeedIngestor
+from monitoring.models import AlertEvent, AlertRule, Product, ProductType, Store
+from monitoring.repositories import repository_registry
+
+
+class PriceAlertsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.store, regular_price=Decimal('45.00')
+        )
+        self.other = Product.objects.create(
+            name='Львівське', sku='LV001', product_type=self.beer, store=self.store, regular_price=Decimal('50.00')
+        )
+
+    def _rule(self, name, threshold, kind=AlertRule.KIND_PRICE_BELOW, **scope):
+        return AlertRule.objects.create(name=name, kind=kind, threshold=Decimal(threshold), **scope)
+
+    def _fired(self):
+        return sorted(
+            (event.rule.name, event.previous_value, event.value)
+            for event in AlertEvent.objects.select_related('rule')
+        )
+
+    def test_price_drop_crosses_thresholds(self):
+        self._rule('продукт < 40', '40.00', product=self.product)
+        self._rule('тип < 35', '35.00', product_type=self.beer)
+        self._rule('магазин < 44', '44.00', store=self.store)
+        self._rule('усі < 10', '10.00')
+        AlertRule.objects.create(name='вимкнене', kind=AlertRule.KIND_PRICE_BELOW, threshold=42, is_active=False)
+        self._rule('інший продукт < 48', '48.00', product=self.other)
+
+        self.product.regular_price = Decimal('39.00')
+        self.product.save()
+        self.assertEqual(self._fired(), [
+            ('магазин < 44', Decimal('45.00'), Decimal('39.00')),
+            ('продукт < 40', Decimal('45.00'), Decimal('39.00')),
+        ])
+
+        # Промо-ціна теж ціна на полиці; поріг, уже перетнутий раніше, не спрацьовує знову
+        AlertEvent.objects.all().delete()
+        self.product.promo_price = Decimal('34.00')
+        self.product.save()
+        self.assertEqual(self._fired(), [('тип < 35', Decimal('39.00'), Decimal('34.00'))])
+
+        # Подорожчання не спрацьовує
+        AlertEvent.objects.all().delete()
+        self.product.promo_price = None
+        self.product.regular_price = Decimal('60.00')
+        self.product.save()
+        self.assertEqual(self._fired(), [])
+
+    def test_store_average_discount_crosses_threshold(self):
+        self._rule('знижка ≥ 20%', '20.00', kind=AlertRule.KIND_STORE_DISCOUNT_ABOVE, store=self.store)
+        self._rule('знижка ≥ 50%', '50.00', kind=AlertRule.KIND_STORE_DISCOUNT_ABOVE)
+
+        self.product.promo_price = Decimal('40.50')   # 10%
+        self.product.save()
+        self.assertEqual(self._fired(), [])
+
+        self.other.promo_price = Decimal('30.00')     # 40%, середня 25%
+        self.other.save()
+        event = AlertEvent.objects.get()
+        self.assertEqual(
+            (event.rule.name, event.store, event.product, event.previous_value, event.value),
+            ('знижка ≥ 20%', self.store, None, Decimal('10.00'), Decimal('25.00'))
+        )
+
+        with self.assertRaises(IntegrityError):
+            self._rule('некоректне', '5.00', kind=AlertRule.KIND_STORE_DISCOUNT_ABOVE, product=self.product)
+
+    def test_batch_loads_rules_once(self):
+        self._rule('тип < 30', '30.00', product_type=self.beer)
+        for index in range(20):
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=self.beer, store=self.store,
+                regular_price=Decimal('45.00')
+            )
+        feed = io.StringIO('\n'.join(['sku,regular_price', *(f'SKU{index:03d},{20 + index}.00' for index in range(20))]))
+
+        with CaptureQueriesContext(connection) as queries:
+            PriceFeedIngestor(chunk_size=10).ingest(feed)
+
+        rule_lookups = [query for query in queries.captured_queries if 'FROM "monitoring_alertrule"' in query['sql']]
+        self.assertEqual(len(rule_lookups), 2)
+        self.assertEqual(AlertEvent.objects.count(), 10)
+
+    def test_threshold_index(self):
+        index = ThresholdIndex([
+            (1, ('store', 1), Decimal('10')), (2, ('store', 1), Decimal('20')), (3, ('store', 1), Decimal('30')),
+            (4, ('store', 2), Decimal('25')),
+        ])
+        self.assertEqual(
+            list(index.crossed([('store', 1), ('store', 3)], Decimal('10'), Decimal('30'))),
+            [(2, Decimal('20')), (3, Decimal('30'))]
+        )
+
+    def test_outbox_repository(self):
+        self._rule('продукт < 40', '40.00', product=self.product)
+        self.product.regular_price = Decimal('39.00')
+        self.product.save()
+        repo = repository_registry.alerts
+
+        pending = list(repo.get_pending_events())
+        self.assertEqual(
+            [(event['rule__name'], event['product_id'], event['value']) for event in pending],
+            [('продукт < 40', self.product.pk, Decimal('39.00'))]
+        )
+        self.assertEqual(repo.mark_delivered([event['id'] for event in pending]), 1)
+        self.assertEqual(list(repo.get_pending_events()), [])
@@ -0,0 +1,151 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import datetime, timedelta
+from decimal import Decimal
+import io
+
+from monitoring.analytics.price_bars import (
+    RESOLUTION_DAY, RESOLUTION_HOUR, RESOLUTION_RAW, choose_resolution, compact_price_history,
+)
+from monitoring.models import PriceBar, PriceObservation, Product, ProductType, Store
+from monitoring.repositories import repository_registry
+
+
+@override_settings(PRICE_HISTORY_RAW_RETENTION_DAYS=30, PRICE_BARS_HOURLY_RETENTION_DAYS=365)
+class PriceBarsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.store, regular_price=Decimal('45.00')
+        )
+        self.day = timezone.make_aware(datetime(2025, 3, 10))
+        PriceObservation.objects.all().update(observed_at=self.day - timedelta(days=1))
+        self.repo = repository_registry.price_history
+
+    def _observe(self, offset, regular, promo=None):
+        PriceObservation.objects.create(
+            product=self.product, observed_at=self.day + offset, regular_price_kop=regular, promo_price_kop=promo
+        )
+
+    def _ohlc(self, bars):
+        return [(bar['open_kop'], bar['high_kop'], bar['low_kop'], bar['close_kop'], bar['had_promo']) for bar in bars]
+
+    def test_compaction_builds_hourly_and_daily_bars(self):
+        self._observe(timedelta(hours=9, minutes=5), 4600)
+        self._observe(timedelta(hours=9, minutes=40), 4600, 3990)
+        self._observe(timedelta(hours=11, minutes=15), 4700)
+        self._observe(timedelta(days=1, hours=8), 4800)
+
+        result = compact_price_history(now=self.day + timedelta(days=1, hours=8, minutes=30))
+
+        hourly = PriceBar.objects.filter(product=self.product, resolution=RESOLUTION_HOUR).order_by('bucket_start')
+        self.assertEqual(
+            [(bar.bucket_start, bar.open_kop, bar.high_kop, bar.low_kop, bar.close_kop, bar.had_promo, bar.observation_count)
+             for bar in hourly],
+            [
+                (self.day - timedelta(days=1), 4500, 4500, 4500, 4500, False, 1),
+                # Ціна на початок години (45.00) входить в open/high/low
+                (self.day + timedelta(hours=9), 4500, 4600, 3990, 3990, True, 2),
+                # Промо, що діяло на початок години, теж позначається
+                (self.day + timedelta(hours=11), 3990, 4700, 3990, 4700, True, 1),
+            ]
+        )
+        daily = PriceBar.objects.filter(product=self.product, resolution=RESOLUTION_DAY).order_by('bucket_start')
+        self.assertEqual(
+            [(bar.bucket_start, bar.open_kop, bar.high_kop, bar.low_kop, bar.close_kop, bar.had_promo) for bar in daily],
+            [
+                (self.day - timedelta(days=1), 4500, 4500, 4500, 4500, False),
+                (self.day, 4500, 4700, 3990, 4700, True),
+            ]
+        )
+        # Поточна година ще не завершена — лишається сирою
+        self.assertEqual((result['hourly_bars'], result['daily_bars']), (3, 2))
+
+        # Повторний запуск згортає лише нове
+        result = compact_price_history(now=self.day + timedelta(days=2, hours=1))
+        self.assertEqual((result['hourly_bars'], result['daily_bars']), (1, 1))
+        self.assertEqual(
+            PriceBar.objects.get(resolution=RESOLUTION_HOUR, bucket_start=self.day + timedelta(days=1, hours=8)).open_kop,
+            4700
+        )
+
+    def test_retention_drops_compacted_raw_rows(self):
+        self._observe(timedelta(hours=1), 4600)
+        self._observe(timedelta(hours=2), 4700)
+        self._observe(timedelta(days=40), 4800)
+
+        result = compact_price_history(now=self.day + timedelta(days=45))
+
+        # Останнє спостереження до межі лишається, щоб open наступних барів і дедуплікація працювали
+        self.assertEqual(result['raw_deleted'], 2)
+        self.assertEqual(
+            list(PriceObservation.objects.order_by('observed_at').values_list('regular_price_kop', flat=True)),
+            [4700, 4800]
+        )
+        self.product.regular_price = Decimal('47.00')
+        self.product.save()
+        self.assertEqual(PriceObservation.objects.count(), 3)
+
+        with self.settings(PRICE_BARS_HOURLY_RETENTION_DAYS=10):
+            result = compact_price_history(now=self.day + timedelta(days=45))
+        self.assertEqual(result['hourly_deleted'], 3)
+        self.assertEqual(PriceBar.objects.filter(resolution=RESOLUTION_DAY).count(), 3)
+
+    def test_choose_resolution(self):
+        now = self.day
+        self.assertEqual(choose_resolution(now - timedelta(days=1), now, now), RESOLUTION_RAW)
+        self.assertEqual(choose_resolution(now - timedelta(days=20), now, now), RESOLUTION_HOUR)
+        self.assertEqual(choose_resolution(now - timedelta(days=200), now - timedelta(days=199), now), RESOLUTION_HOUR)
+        self.assertEqual(choose_resolution(now - timedelta(days=500), now - timedelta(days=499), now), RESOLUTION_DAY)
+        self.assertEqual(choose_resolution(now - timedelta(days=90), now, now), RESOLUTION_DAY)
+        self.assertEqual(choose_resolution(None, now, now), RESOLUTION_DAY)
+
+    def test_bars_include_uncompacted_tail(self):
+        self._observe(timedelta(hours=9), 4600)
+        compact_price_history(now=self.day + timedelta(hours=10))
+        self._observe(timedelta(hours=12), 4700, 4200)
+        self._observe(timedelta(days=1, hours=3), 4800)
+
+        end = self.day + timedelta(days=2)
+        resolution, bars = self.repo.get_price_bars(self.product.pk, self.day, end, RESOLUTION_HOUR)
+        self.assertEqual(resolution, RESOLUTION_HOUR)
+        self.assertEqual(
+            self._ohlc(bars),
+            [(4500, 4600, 4500, 4600, False), (4600, 4600, 4200, 4200, True), (4200, 4800, 4200, 4800, True)]
+        )
+
+        # Денні бари: збережений день + хвіст із годинних барів і сирих даних
+        _, bars = self.repo.get_price_bars(self.product.pk, self.day - timedelta(days=1), end, RESOLUTION_DAY)
+        self.assertEqual(
+            self._ohlc(bars),
+            [(4500, 4500, 4500, 4500, False), (4500, 4600, 4200, 4200, True), (4200, 4800, 4200, 4800, True)]
+        )
+
+        _, bars = self.repo.get_price_bars(self.product.pk, self.day, end, RESOLUTION_RAW)
+        self.assertEqual([bar['close_kop'] for bar in bars], [4600, 4200, 4800])
+
+    def test_api_and_command(self):
+        client = APIClient()
+        url = reverse('product-price-bars', args=[self.product.pk])
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['resolution'], RESOLUTION_DAY)
+        self.assertEqual(
+            [(bar['open'], bar['close'], bar['had_promo']) for bar in response.data['data']],
+            [('45.00', '45.00', False)]
+        )
+
+        response = client.get(url, {'date_from': timezone.localdate().isoformat(), 'resolution': 'raw'})
+        self.assertEqual((response.data['resolution'], response.data['data']), (RESOLUTION_RAW, []))
+        self.assertEqual(client.get(url, {'resolution': 'minute'}).status_code, 400)
+
+        stdout = io.StringIO()
+        call_command('compact_price_history', stdout=stdout)
+        self.assertIn('денних барів 1', stdout.getvalue())
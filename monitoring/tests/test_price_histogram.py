@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.analytics.columnar import ColumnarAnalyticsEngine
+from monitoring.analytics.histogram import bucket_labels, parse_edges
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+class PriceHistogramTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ColumnarAnalyticsEngine.invalidate()
+
+        beer = ProductType.objects.create(name='Пиво', slug='beer')
+        whiskey = ProductType.objects.create(name='Віскі', slug='whiskey')
+        store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+
+        prices = {
+            beer: ['25.00', '35.00', '45.00', '59.99', '60.00', '120.00'],
+            whiskey: ['450.00', '800.00', '1200.00', '1500.00', '2500.00', '4000.00'],
+        }
+        index = 0
+        for product_type, type_prices in prices.items():
+            for price in type_prices:
+                Product.objects.create(
+                    name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=product_type,
+                    store=store, regular_price=Decimal(price)
+                )
+                index += 1
+
+        self.repo = AnalyticsRepository()
+
+    def counts(self, rows, product_type_name):
+        return {row['price_range']: row['count'] for row in rows if row['product_type_name'] == product_type_name}
+
+    def assertEnginesMatch(self, **kwargs):
+        self.assertEqual(
+            self.repo.get_products_by_price_ranges(engine='numpy', **kwargs),
+            self.repo.get_products_by_price_ranges(**kwargs),
+        )
+
+    def test_labels(self):
+        self.assertEqual(
+            bucket_labels(parse_edges('30,60,100')),
+            ['0-30 грн', '30-60 грн', '60-100 грн', '100+ грн'],
+        )
+        self.assertEqual(bucket_labels(parse_edges('12.5')), ['0-12.5 грн', '12.5+ грн'])
+
+    def test_default_buckets_single_query(self):
+        with self.assertNumQueries(1):
+            result = self.repo.get_products_by_price_ranges()
+
+        self.assertEqual(
+            self.counts(result, 'Пиво'),
+            {'0-30 грн': 1, '30-60 грн': 3, '60-100 грн': 1, '100+ грн': 1},
+        )
+        self.assertEqual(self.counts(result, 'Віскі'), {'100+ грн': 6})
+        self.assertAlmostEqual(sum(row['percentage'] for row in result), 100.0)
+        self.assertEqual(result[-1]['price_range'], '100+ грн')
+
+    def test_custom_edges_per_product_type(self):
+        edges = {'Віскі': [1000, 2000]}
+
+        result = self.repo.get_products_by_price_ranges(edges=edges)
+
+        self.assertEqual(
+            self.counts(result, 'Віскі'),
+            {'0-1000 грн': 2, '1000-2000 грн': 2, '2000+ грн': 2},
+        )
+        self.assertEqual(self.counts(result, 'Пиво')['30-60 грн'], 3)
+        self.assertEnginesMatch(edges=edges)
+
+    def test_equal_width_and_quantile(self):
+        for bucketing in ('equal_width', 'quantile'):
+            result = self.repo.get_products_by_price_ranges(bucketing=bucketing, bucket_count=3)
+
+            self.assertEqual(sum(self.counts(result, 'Віскі').values()), 6)
+            self.assertLessEqual(len(self.counts(result, 'Віскі')), 3)
+            self.assertEnginesMatch(bucketing=bucketing, bucket_count=3)
+
+        quantiles = self.repo.get_products_by_price_ranges(bucketing='quantile', bucket_count=3)
+        self.assertEqual(sorted(self.counts(quantiles, 'Віскі').values()), [2, 2, 2])
+
+    def test_product_type_filter_keeps_global_percentage(self):
+        result = self.repo.get_products_by_price_ranges(product_type='Віскі')
+
+        self.assertEqual(result, [
+            {'bucket': 3, 'price_range': '100+ грн', 'product_type_name': 'Віскі', 'count': 6, 'percentage': 50.0},
+        ])
+
+    def test_invalid_bucketing(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_products_by_price_ranges(bucketing='log')
+        with self.assertRaises(ValueError):
+            self.repo.get_products_by_price_ranges(edges=[-5])
+
+    def test_api_parameters(self):
+        client = APIClient()
+        url = reverse('analytics-price-ranges')
+
+        response = client.get(url, {'edges': '1000,2000', 'product_type': 'Віскі'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['statistics']['price_ranges_count'], 3)
+
+        response = client.get(url, {'bucketing': 'quantile', 'buckets': 2})
+        self.assertEqual(response.status_code, 200)
+
+        response = client.get(url, {'edges': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_edges_per_product_type(self):
+        client = APIClient()
+        url = reverse('analytics-price-ranges')
+
+        response = client.get(url, {'edges[whiskey]': '1000,2000'})
+        self.assertEqual(response.status_code, 200)
+        labels = {(row['product_type_name'], row['price_range']) for row in response.data['data']}
+        self.assertIn(('Віскі', '1000-2000 грн'), labels)
+        self.assertIn(('Пиво', '60-100 грн'), labels)
+
+        response = client.get(url, {'edges[rum]': '100'})
+        self.assertEqual(response.status_code, 400)
+
+        response = client.get(url, {'edges': '100', 'edges[whiskey]': '1000'})
+        self.assertEqual(response.status_code, 400)
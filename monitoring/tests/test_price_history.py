@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from decimal import Decimal
+
+from monitoring.analytics.price_history import backfill_price_history, latest_price_points, record_price_points
+from monitoring.models import PriceObservation, Product, ProductType, Store
+from monitoring.repositories import repository_registry
+
+
+class PriceHistoryTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.store,
+            regular_price=Decimal('45.00'), promo_price=Decimal('39.90')
+        )
+        self.repo = repository_registry.price_history
+
+    def _series(self, product=None):
+        return [
+            (row['regular_price_kop'], row['promo_price_kop'])
+            for row in self.repo.get_price_series((product or self.product).pk)
+        ]
+
+    def test_only_price_changes_are_recorded(self):
+        self.product.name = 'Оболонь Світле'
+        self.product.save()
+        self.product.promo_price = None
+        self.product.save()
+        self.product.is_active = False
+        self.product.save()
+        self.product.regular_price = Decimal('47.50')
+        self.product.save()
+
+        self.assertEqual(self._series(), [(4500, 3990), (4500, None), (4750, None)])
+
+        product_id = self.product.pk
+        self.product.delete()
+        self.assertFalse(PriceObservation.objects.filter(product_id=product_id).exists())
+
+    def test_series_and_window_queries(self):
+        other = Product.objects.create(
+            name='Львівське', sku='LV001', product_type=self.beer, store=self.store, regular_price=Decimal('30.00')
+        )
+        start = timezone.now() - timedelta(days=10)
+        PriceObservation.objects.all().update(observed_at=start)
+        for days, product, price in ((1, self.product, 4800), (2, other, 3100), (3, self.product, 4650)):
+            PriceObservation.objects.create(
+                product=product, observed_at=start + timedelta(days=days), regular_price_kop=price
+            )
+
+        self.assertEqual(
+            [row['regular_price_kop'] for row in self.repo.get_price_series(
+                self.product.pk, start=start + timedelta(days=1), end=start + timedelta(days=3)
+            )],
+            [4800]
+        )
+
+        changes = list(self.repo.get_price_changes(start + timedelta(hours=1)))
+        self.assertEqual([(row['product_id'], row['regular_price_kop']) for row in changes], [
+            (self.product.pk, 4800), (other.pk, 3100), (self.product.pk, 4650),
+        ])
+        first = changes[0]
+        self.assertEqual(
+            [row['regular_price_kop'] for row in self.repo.get_price_changes(
+                start, after=(first['observed_at'], first['id']), limit=1
+            )],
+            [3100]
+        )
+        self.assertEqual(
+            len(self.repo.get_price_changes(start, product_ids=[other.pk])), 2
+        )
+
+    def test_record_price_points_skips_unchanged(self):
+        other = Product.objects.create(
+            name='Львівське', sku='LV001', product_type=self.beer, store=self.store, regular_price=Decimal('30.00')
+        )
+
+        written = record_price_points({self.product.pk: (4500, 3990), other.pk: (2900, None)})
+
+        self.assertEqual(written, 1)
+        self.assertEqual(latest_price_points([self.product.pk, other.pk]), {
+            self.product.pk: (4500, 3990), other.pk: (2900, None),
+        })
+
+    def test_backfill_adds_missing_points(self):
+        PriceObservation.objects.all().delete()
+
+        self.assertEqual(backfill_price_history(), 1)
+        self.assertEqual(backfill_price_history(), 0)
+        self.assertEqual(self._series(), [(4500, 3990)])
+
+    def test_api(self):
+        client = APIClient()
+        for price in ('46.00', '47.00', '48.00'):
+            self.product.regular_price = Decimal(price)
+            self.product.save()
+
+        client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        response = client.get(reverse('product-price-history', args=[self.product.pk]), {'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['regular_price'] for row in response.data['data']], ['45.00', '46.00', '47.00'])
+        self.assertEqual(response.data['data'][0]['promo_price'], '39.90')
+        self.assertTrue(response.data['pagination']['has_more'])
+
+        today = timezone.localdate().isoformat()
+        response = client.get(reverse('analytics-price-changes'), {
+            'date_from': today, 'product': str(self.product.pk), 'page_size': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        second = client.get(reverse('analytics-price-changes'), {
+            'date_from': today, 'page_size': 2, 'cursor': response.data['pagination']['next_cursor'],
+        })
+        self.assertEqual(
+            [row['regular_price'] for row in response.data['data'] + second.data['data']],
+            ['45.00', '46.00', '47.00', '48.00']
+        )
+
+        self.assertEqual(client.get(reverse('analytics-price-changes')).status_code, 400)
+        self.assertEqual(client.get(reverse('analytics-price-changes'), {'date_from': 'вчора'}).status_code, 400)
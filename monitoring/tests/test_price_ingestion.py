@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from datetime import date
+from decimal import Decimal
+import io
+import json
+import tempfile
+
+from monitoring.changes import get_data_version
+from monitoring.ingestion import FORMAT_JSONL, PriceFeedIngestor
+from monitoring.models import PriceObservation, Product, ProductType, StoreSummary, Store, TopProductEntry
+
+
+class PriceFeedIngestionTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        for index in range(3):
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=self.beer, store=self.store,
+                regular_price=Decimal('40.00') + index, promo_price=None
+            )
+
+    def _csv(self, *lines):
+        return io.StringIO('\n'.join(['sku,regular_price,promo_price,promo_ends_at,name,product_type,store', *lines]))
+
+    def test_upserts_by_sku_in_chunks(self):
+        feed = self._csv(
+            'SKU000,40.00,,,,,',                                   # без змін
+            'SKU001,55.50,49.90,2025-12-31,,,',                    # оновлення
+            f'NEW001,120.00,,,Нове пиво,beer,{self.store.pk}',     # створення
+            'SKU002,abc,,,,,',                                     # помилка
+            'SKU001,56.00,49.90,2025-12-31,,,',                    # дубль — перемагає останній
+            'NEW002,10.00,,,,,',                                   # невідомий SKU без даних продукту
+        )
+        version = get_data_version()
+
+        with CaptureQueriesContext(connection) as queries:
+            report = PriceFeedIngestor(chunk_size=3).ingest(feed)
+
+        self.assertEqual(
+            (report.rows, report.created, report.updated, report.unchanged, report.duplicates, report.failed),
+            (6, 1, 2, 1, 0, 2)
+        )
+        self.assertEqual([error['line'] for error in report.errors], [5, 7])
+        self.assertGreater(report.rows_per_second, 0)
+        self.assertGreater(get_data_version(), version)
+        # Один пошук за SKU на чанк, оновлення — одним bulk_update на чанк
+        sku_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and '"monitoring_product"."sku" IN' in query['sql']
+        ]
+        self.assertEqual(len(sku_lookups), 2)
+        self.assertEqual(
+            sum(query['sql'].startswith('UPDATE "monitoring_product"') for query in queries.captured_queries), 2
+        )
+
+        updated = Product.objects.get(sku='SKU001')
+        self.assertEqual(
+            (updated.regular_price, updated.promo_price, updated.promo_ends_at),
+            (Decimal('56.00'), Decimal('49.90'), date(2025, 12, 31))
+        )
+        created = Product.objects.get(sku='NEW001')
+        self.assertEqual((created.product_type_id, created.regular_price), (self.beer.pk, Decimal('120.00')))
+
+        # Записи в обхід сигналів усе одно оновлюють похідні таблиці
+        self.assertEqual(StoreSummary.objects.get(store=self.store).product_count, 4)
+        self.assertEqual(
+            TopProductEntry.objects.filter(scope='global').order_by('-regular_price').first().product, created
+        )
+        self.assertEqual(
+            list(PriceObservation.objects.filter(product=updated).order_by('id').values_list('regular_price_kop', flat=True)),
+            [4100, 5550, 5600]
+        )
+
+    def test_duplicates_within_chunk(self):
+        report = PriceFeedIngestor().ingest(self._csv('SKU000,41.00,,,,,', 'SKU000,42.00,,,,,'))
+
+        self.assertEqual((report.updated, report.duplicates), (1, 1))
+        self.assertEqual(Product.objects.get(sku='SKU000').regular_price, Decimal('42.00'))
+
+    def test_jsonl_feed_and_validation(self):
+        feed = io.StringIO('\n'.join([
+            json.dumps({'sku': 'SKU000', 'regular_price': '39.99', 'promo_price': 35}),
+            'not json',
+            json.dumps({'sku': 'SKU001', 'regular_price': '10.005'}),
+            json.dumps({'sku': 'SKU002', 'regular_price': '10', 'promo_ends_at': 'завтра'}),
+            json.dumps({'sku': 'NEW001', 'regular_price': '10', 'name': 'Продукт 0', 'product_type': 'beer',
+                        'store': self.store.pk}),
+        ]))
+
+        report = PriceFeedIngestor(create_missing=True).ingest(feed, FORMAT_JSONL)
+
+        self.assertEqual((report.updated, report.failed), (1, 4))
+        self.assertEqual(
+            [error['error'] for error in report.errors],
+            ['row is not a JSON object', 'regular_price must have at most 2 decimal places',
+             'promo_ends_at must be a date in YYYY-MM-DD format', "product name 'Продукт 0' is taken or too long"]
+        )
+        self.assertEqual(Product.objects.get(sku='SKU000').promo_price, Decimal('35.00'))
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as feed:
+            feed.write('sku,regular_price\nSKU000,44.00\nSKU999,1.00\n')
+            feed.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command('ingest_price_feed', feed.name, '--no-create', stdout=stdout, stderr=stderr)
+
+        self.assertIn('оновлено 1', stdout.getvalue())
+        self.assertIn('рядків/с', stdout.getvalue())
+        self.assertIn('unknown sku SKU999', stderr.getvalue())
+
+    def test_api(self):
+        client = APIClient()
+        url = '/api/products/ingest/'
+        self.assertIn(client.post(url, 'sku,regular_price\n', content_type='text/csv').status_code, (401, 403))
+
+        client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        response = client.post(url, 'sku,regular_price\nSKU000,45.00\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+
+        upload = SimpleUploadedFile('feed.jsonl', b'{"sku": "SKU001", "regular_price": "46.00"}\n')
+        response = client.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(Product.objects.get(sku='SKU001').regular_price, Decimal('46.00'))
+
+        response = client.post(url + '?feed_format=xml', 'x', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
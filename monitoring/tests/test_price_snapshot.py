@@ -0,0 +1,114 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from monitoring.analytics.filters import as_of_moment
+from monitoring.analytics.price_bars import compact_price_history
+from monitoring.models import PriceObservation, Product, ProductType, Store
+from monitoring.repositories import repository_registry
+
+
+class PriceSnapshotTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='вул. Тестова 2')
+        self.obolon = Product.objects.create(
+            name='Оболонь', sku='OB001', product_type=self.beer, store=self.kyiv, regular_price=Decimal('45.00')
+        )
+        self.lvivske = Product.objects.create(
+            name='Львівське', sku='LV001', product_type=self.beer, store=self.lviv, regular_price=Decimal('30.00')
+        )
+        self.day = timezone.make_aware(datetime(2025, 3, 10))
+        PriceObservation.objects.all().update(observed_at=self.day)
+        self.repo = repository_registry.price_history
+
+    def _observe(self, product, offset, regular, promo=None):
+        PriceObservation.objects.create(
+            product=product, observed_at=self.day + offset, regular_price_kop=regular, promo_price_kop=promo
+        )
+
+    def _prices(self, at, **kwargs):
+        return [
+            (row['product_id'], row['regular_price_kop'], row['promo_price_kop'], row['source'])
+            for row in self.repo.get_prices_as_of(at, **kwargs)
+        ]
+
+    def test_prices_as_of_from_observations(self):
+        self._observe(self.obolon, timedelta(days=2), 4500, 3990)
+        self._observe(self.obolon, timedelta(days=5), 4800)
+        # Ще не існував на початку періоду
+        late = Product.objects.create(
+            name='Чернігівське', sku='CH001', product_type=self.beer, store=self.kyiv, regular_price=Decimal('35.00')
+        )
+        PriceObservation.objects.filter(product=late).update(observed_at=self.day + timedelta(days=4))
+
+        self.assertEqual(self._prices(self.day + timedelta(days=3)), [
+            (self.obolon.pk, 4500, 3990, 'raw'), (self.lvivske.pk, 3000, None, 'raw'),
+        ])
+        # Момент спостереження включно
+        self.assertEqual(self._prices(self.day + timedelta(days=5), store_ids=[self.kyiv.pk]), [
+            (self.obolon.pk, 4800, None, 'raw'), (late.pk, 3500, None, 'raw'),
+        ])
+        self.assertEqual(self._prices(self.day - timedelta(seconds=1)), [])
+
+    def test_query_count_does_not_depend_on_history_length(self):
+        for hours in range(1, 50):
+            self._observe(self.obolon, timedelta(hours=hours), 4500 + hours)
+
+        # Пачка продуктів, ціни пачки, порожня наступна пачка
+        with self.assertNumQueries(3):
+            prices = self._prices(self.day + timedelta(days=10))
+        self.assertEqual(prices[0], (self.obolon.pk, 4549, None, 'raw'))
+
+    def test_checkpoints_after_retention(self):
+        self._observe(self.obolon, timedelta(hours=5), 4700, 4200)
+        self._observe(self.obolon, timedelta(days=1, hours=2), 4800)
+        self._observe(self.obolon, timedelta(days=60), 4900)
+        self._observe(self.lvivske, timedelta(days=60), 3100)
+
+        with self.settings(PRICE_HISTORY_RAW_RETENTION_DAYS=30):
+            compact_price_history(now=self.day + timedelta(days=61))
+
+        # Сирі рядки до межі видалені, крім останнього — ціну дня 0 беремо з годинного бару;
+        # єдине спостереження Львівського до межі лишилось і воно точне
+        self.assertEqual(self._prices(self.day + timedelta(hours=12)), [
+            (self.obolon.pk, 4700, 4200, 'hour'), (self.lvivske.pk, 3000, None, 'raw'),
+        ])
+        self.assertEqual(self._prices(self.day + timedelta(days=2))[0], (self.obolon.pk, 4800, None, 'raw'))
+
+    def test_as_of_moment(self):
+        self.assertEqual(
+            as_of_moment('2025-03-10'),
+            timezone.make_aware(datetime(2025, 3, 11)) - timedelta(microseconds=1)
+        )
+        self.assertEqual(as_of_moment('2025-03-10T12:30:00'), timezone.make_aware(datetime(2025, 3, 10, 12, 30)))
+        with self.assertRaises(ValueError):
+            as_of_moment('вчора')
+
+    def test_api(self):
+        client = APIClient()
+        url = reverse('analytics-prices-as-of')
+        self._observe(self.lvivske, timedelta(days=3), 3200)
+
+        response = client.get(url, {'at': '2025-03-11', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['product'], row['store'], row['regular_price']) for row in response.data['data']],
+            [(self.obolon.pk, self.kyiv.pk, '45.00')]
+        )
+        second = client.get(url, {'at': '2025-03-11', 'page_size': 1, 'cursor': response.data['pagination']['next_cursor']})
+        self.assertEqual([row['regular_price'] for row in second.data['data']], ['30.00'])
+        self.assertFalse(second.data['pagination']['has_more'])
+
+        response = client.get(url, {'at': '2025-03-14T00:00:00', 'store': str(self.lviv.pk)})
+        self.assertEqual([row['regular_price'] for row in response.data['data']], ['32.00'])
+
+        self.assertEqual(client.get(url).status_code, 400)
+        self.assertEqual(client.get(url, {'at': 'вчора'}).status_code, 400)
@@ -0,0 +1,114 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+import io
+import threading
+
+from monitoring.changes import get_data_version
+from monitoring.models import PriceObservation, Product, ProductType, PromoExpiration, Store, StoreSummary
+from monitoring import promotions
+from monitoring.promotions import expire_promos
+from monitoring.scheduler import PeriodicRunner
+
+
+class PromoExpiryTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.today = date(2025, 3, 10)
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.expired = self._product('Оболонь', Decimal('39.90'), self.today - timedelta(days=1))
+        self.last_day = self._product('Львівське', Decimal('25.00'), self.today)
+        self.open_ended = self._product('Чернігівське', Decimal('30.00'), None)
+        self.stale_date = self._product('Рогань', None, self.today - timedelta(days=5))
+
+    def _product(self, name, promo_price, promo_ends_at):
+        return Product.objects.create(
+            name=name, sku=name[:3].upper() + '001', product_type=self.beer, store=self.store,
+            regular_price=Decimal('45.00'), promo_price=promo_price, promo_ends_at=promo_ends_at
+        )
+
+    def test_expires_with_single_update(self):
+        version = get_data_version()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(expire_promos(self.today), 1)
+
+        self.assertEqual(
+            sum(query['sql'].startswith('UPDATE "monitoring_product"') for query in queries.captured_queries), 1
+        )
+        self.expired.refresh_from_db()
+        self.assertEqual((self.expired.promo_price, self.expired.promo_ends_at), (None, None))
+        # Промо діє до кінця дня promo_ends_at включно
+        self.last_day.refresh_from_db()
+        self.assertEqual(self.last_day.promo_price, Decimal('25.00'))
+        self.assertEqual(Product.objects.get(pk=self.open_ended.pk).promo_price, Decimal('30.00'))
+        self.assertIsNone(Product.objects.get(pk=self.stale_date.pk).promo_ends_at)
+
+        expiration = PromoExpiration.objects.get()
+        self.assertEqual(
+            (expiration.product, expiration.promo_price, expiration.promo_ends_at),
+            (self.expired, Decimal('39.90'), self.today - timedelta(days=1))
+        )
+        self.assertEqual(StoreSummary.objects.get(store=self.store).promo_count, 2)
+        self.assertEqual(
+            list(PriceObservation.objects.filter(product=self.expired).order_by('id').values_list('promo_price_kop', flat=True)),
+            [3990, None]
+        )
+        self.assertGreater(get_data_version(), version)
+
+        self.assertEqual(expire_promos(self.today), 0)
+        self.assertEqual(expire_promos(self.today + timedelta(days=1)), 1)
+
+    def test_concurrent_run_does_not_propagate_twice(self):
+        read_expired_rows = promotions._expired_rows
+        raced = []
+
+        def racing_read(today):
+            rows = read_expired_rows(today)
+            # Інший процес знімає ті самі промо між нашим читанням і UPDATE (SQLite нічого не блокує)
+            if not raced:
+                raced.append(None)
+                raced[0] = expire_promos(today)
+            return rows
+
+        with mock.patch.object(promotions, '_expired_rows', racing_read):
+            self.assertEqual(expire_promos(self.today), 0)
+
+        self.assertEqual(raced, [1])
+        self.assertEqual(PromoExpiration.objects.count(), 1)
+        self.assertEqual(StoreSummary.objects.get(store=self.store).promo_count, 2)
+        self.assertEqual(PriceObservation.objects.filter(product=self.expired, promo_price_kop=None).count(), 1)
+
+    def test_periodic_runner(self):
+        calls = []
+        ran = threading.Event()
+
+        def job():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('збій не зупиняє планувальник')
+            ran.set()
+
+        runner = PeriodicRunner(job, 0.01)
+        with self.assertLogs('monitoring.scheduler', 'ERROR'):
+            runner.start()
+            self.assertTrue(ran.wait(5))
+            runner.stop()
+            runner.join(5)
+        self.assertFalse(runner.is_alive())
+        self.assertGreaterEqual(len(calls), 2)
+
+    def test_command(self):
+        Product.objects.filter(pk=self.last_day.pk).update(promo_ends_at=date(2000, 1, 1))
+        stdout = io.StringIO()
+
+        call_command('expire_promos', stdout=stdout)
+
+        self.assertIn('Знято промо: 2', stdout.getvalue())
@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.api.serializers import ProductSerializer, StoreSerializer
+from monitoring.models import Product, ProductType, Store
+from monitoring.repositories import repository_registry
+from monitoring.repositories.read_plan import read_plan
+
+from .query_budget import QueryBudgetMixin
+
+
+# Запитів на відповідь незалежно від кількості рядків: версія даних для ETag + самі рядки
+ENDPOINT_BUDGETS = {
+    'product-list': 2,
+    'product-detail': 2,
+    'store-list': 2,
+    'store-detail': 2,
+    'product-type-list': 2,
+    'product-type-detail': 2,
+}
+
+
+class QueryBudgetTestCase(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.created = 0
+
+    def _add_products(self, count):
+        for _ in range(count):
+            index = self.created
+            store = Store.objects.create(name=f'Сільпо {index}', city='Київ', address=f'вул. Тестова {index}')
+            product_type = ProductType.objects.create(name=f'Тип {index}', slug=f'type-{index}')
+            Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}', product_type=product_type, store=store,
+                regular_price=Decimal('40.00') + index
+            )
+            self.created += 1
+
+    def _urls(self):
+        product = Product.objects.first()
+        return {
+            'product-list': reverse('product-list'),
+            'product-detail': reverse('product-detail', args=[product.pk]),
+            'store-list': reverse('store-list'),
+            'store-detail': reverse('store-detail', args=[product.store_id]),
+            'product-type-list': reverse('product-type-list'),
+            'product-type-detail': reverse('product-type-detail', args=[product.product_type_id]),
+        }
+
+    def test_endpoints_stay_within_budget_as_rows_grow(self):
+        for count in (2, 10):
+            self._add_products(count)
+            for name, url in self._urls().items():
+                with self.subTest(endpoint=name, rows=self.created):
+                    with self.assertMaxQueries(ENDPOINT_BUDGETS[name]):
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+        rows = self.client.get(reverse('product-list')).data['results']
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[3]['store_info']['name'], 'Сільпо 3')
+        self.assertEqual(rows[3]['product_type_info']['slug'], 'type-3')
+
+    def test_budget_failure_lists_queries(self):
+        self._add_products(3)
+        with self.assertRaisesMessage(AssertionError, 'budget is 1'):
+            with self.assertMaxQueries(1):
+                for product in Product.objects.all():
+                    product.store.name
+
+    def test_read_plan_follows_serializer_fields(self):
+        plan = read_plan(Product, ProductSerializer)
+        self.assertEqual(plan.select_related, ('product_type', 'store'))
+        self.assertIn('store', plan.only)
+        self.assertIn('store__city', plan.only)
+        self.assertEqual(read_plan(Store, StoreSerializer).select_related, ())
+
+        self._add_products(1)
+        product = repository_registry.products.get_by_id(Product.objects.get().pk, ProductSerializer)
+        with self.assertNumQueries(0):
+            ProductSerializer(product).data
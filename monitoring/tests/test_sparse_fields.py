@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.models import Product, ProductType, Store
+
+
+class SparseFieldsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('manager', password='secret'))
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.store = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.product = Product.objects.create(
+            name='Оболонь', sku='OB001', description='Світле', product_type=self.beer, store=self.store,
+            regular_price=Decimal('45.00'), promo_price=Decimal('40.00')
+        )
+
+    def _get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, queries.captured_queries[-1]['sql']
+
+    def test_fields_project_columns_in_both_list_paths(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), override_settings(API_FAST_LIST_SERIALIZATION=fast):
+                response, sql = self._get(reverse('product-list'), {'fields': 'sku,regular_price,promo_price'})
+                self.assertEqual(response.data['results'], [
+                    {'id': self.product.pk, 'sku': 'OB001', 'regular_price': '45.00', 'promo_price': '40.00'}
+                ])
+                self.assertNotIn('description', sql)
+                self.assertNotIn('JOIN', sql)
+
+    def test_expand_joins_only_requested_relations(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), override_settings(API_FAST_LIST_SERIALIZATION=fast):
+                response, sql = self._get(reverse('product-list'), {'fields': 'sku', 'expand': 'store_info'})
+                row = response.data['results'][0]
+                self.assertEqual(list(row), ['id', 'sku', 'store_info'])
+                self.assertEqual(row['store_info']['city'], 'Київ')
+                self.assertIn('"monitoring_store"', sql)
+                self.assertNotIn('"monitoring_producttype"', sql)
+
+    def test_retrieve_and_other_endpoints(self):
+        response, sql = self._get(reverse('product-detail', args=[self.product.pk]), {'fields': 'name'})
+        self.assertEqual(response.data, {'id': self.product.pk, 'name': 'Оболонь'})
+        self.assertNotIn('regular_price', sql)
+
+        response, _ = self._get(reverse('store-list'), {'fields': 'city'})
+        self.assertEqual(response.data['results'], [{'id': self.store.pk, 'city': 'Київ'}])
+        response, _ = self._get(reverse('product-type-detail', args=[self.beer.pk]), {'fields': 'slug'})
+        self.assertEqual(response.data, {'id': self.beer.pk, 'slug': 'beer'})
+
+        # Без ?fields= відповідь повна
+        response, _ = self._get(reverse('product-list'), {'expand': 'store_info'})
+        self.assertIn('product_type_info', response.data['results'][0])
+
+    def test_unknown_fields_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('product-list'), {'fields': 'sku,password'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('product-list'), {'fields': 'sku', 'expand': 'owner'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('store-list'), {'fields': 'city', 'expand': 'store_info'}).status_code, 400)
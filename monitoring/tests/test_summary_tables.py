@@ -0,0 +1,114 @@
+from django.test import TestCase
+from decimal import Decimal
+
+from monitoring.analytics.summaries import rebuild_summaries
+from monitoring.models import Product, ProductType, Store, CitySummary, StoreSummary
+from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories.summary import SummaryAnalyticsRepository
+
+
+def _normalize(rows, key):
+    result = {}
+    for row in rows:
+        result[row[key]] = {
+            field: round(float(value), 6) if isinstance(value, (Decimal, float)) else value
+            for field, value in row.items()
+        }
+    return result
+
+
+class SummaryTablesTestCase(TestCase):
+
+    def setUp(self):
+        self.beer_type = ProductType.objects.create(name='Пиво', slug='beer')
+        self.snacks_type = ProductType.objects.create(name='Снеки', slug='snacks')
+
+        self.store_kyiv_1 = Store.objects.create(name='Сільпо Хрещатик', city='Київ', address='вул. Хрещатик 1')
+        self.store_kyiv_2 = Store.objects.create(name='Сільпо Оболонь', city='Київ', address='пр. Оболонський 5')
+        self.store_lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+        self.store_empty = Store.objects.create(name='Сільпо Одеса', city='Одеса', address='вул. Дерибасівська 1')
+
+        self.beer_1 = Product.objects.create(
+            name='Оболонь Світле', sku='BEER001', product_type=self.beer_type,
+            store=self.store_kyiv_1, regular_price=Decimal('45.00'), promo_price=Decimal('38.00')
+        )
+        self.beer_2 = Product.objects.create(
+            name='Львівське 1715', sku='BEER002', product_type=self.beer_type,
+            store=self.store_kyiv_1, regular_price=Decimal('55.50')
+        )
+        self.beer_3 = Product.objects.create(
+            name='Чернігівське', sku='BEER003', product_type=self.beer_type,
+            store=self.store_lviv, regular_price=Decimal('42.00'), promo_price=Decimal('35.00')
+        )
+        self.snack_1 = Product.objects.create(
+            name='Чіпси', sku='SNACK001', product_type=self.snacks_type,
+            store=self.store_kyiv_2, regular_price=Decimal('28.00'), promo_price=Decimal('22.00')
+        )
+
+        self.live_repo = AnalyticsRepository()
+        self.summary_repo = SummaryAnalyticsRepository()
+
+    def assertReposMatch(self):
+        self.assertEqual(
+            _normalize(self.summary_repo.get_avg_prices_by_product_type(), 'id'),
+            _normalize(self.live_repo.get_avg_prices_by_product_type(), 'id'),
+        )
+        self.assertEqual(
+            _normalize(self.summary_repo.get_store_statistics_by_city(), 'city'),
+            _normalize(self.live_repo.get_store_statistics_by_city(), 'city'),
+        )
+        self.assertEqual(
+            _normalize(self.summary_repo.get_promo_analysis_by_store(), 'id'),
+            _normalize(self.live_repo.get_promo_analysis_by_store(), 'id'),
+        )
+
+    def test_summaries_match_live_queries_after_inserts(self):
+        self.assertReposMatch()
+
+    def test_price_and_promo_updates(self):
+        self.beer_2.promo_price = Decimal('50.00')
+        self.beer_2.save()
+        self.beer_1.regular_price = Decimal('47.10')
+        self.beer_1.promo_price = None
+        self.beer_1.save()
+
+        self.assertReposMatch()
+
+    def test_deactivate_and_move_product(self):
+        self.beer_3.is_active = False
+        self.beer_3.save()
+        self.snack_1.store = self.store_lviv
+        self.snack_1.product_type = self.beer_type
+        self.snack_1.save()
+
+        self.assertReposMatch()
+
+    def test_delete_product(self):
+        self.beer_1.delete()
+
+        self.assertReposMatch()
+        self.assertEqual(StoreSummary.objects.get(store=self.store_kyiv_1).promo_count, 0)
+
+    def test_store_city_change_and_deactivation(self):
+        self.store_kyiv_2.city = 'Львів'
+        self.store_kyiv_2.save()
+        self.assertReposMatch()
+
+        self.store_lviv.is_active = False
+        self.store_lviv.save()
+        self.assertReposMatch()
+
+    def test_delete_store_cascades_products(self):
+        self.store_kyiv_1.delete()
+
+        self.assertReposMatch()
+        self.assertEqual(CitySummary.objects.get(city='Київ').store_count, 1)
+
+    def test_rebuild_summaries_after_bulk_update(self):
+        Product.objects.filter(store=self.store_kyiv_1).update(regular_price=Decimal('99.99'))
+
+        result = rebuild_summaries()
+
+        self.assertEqual(result['product_types'], 2)
+        self.assertEqual(result['cities'], 3)
+        self.assertReposMatch()
@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from decimal import Decimal
+
+from monitoring.analytics.top_products import rebuild_top_products
+from monitoring.models import Product, ProductType, Store, TopProductEntry
+from monitoring.repositories import repository_registry
+from monitoring.repositories.analytics import AnalyticsRepository
+
+
+def _expected_skus(limit, product_type=None, city=None):
+    products = Product.objects.filter(is_active=True)
+    if product_type:
+        products = products.filter(product_type__name=product_type)
+    if city:
+        products = products.filter(store__city=city)
+    return [product.sku for product in sorted(products, key=lambda product: (-product.regular_price, product.pk))][:limit]
+
+
+def _index_rows():
+    return sorted(TopProductEntry.objects.values_list('scope', 'product_id', 'regular_price'))
+
+
+@override_settings(TOP_PRODUCTS_K=3)
+class TopProductsIndexTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.beer = ProductType.objects.create(name='Пиво', slug='beer')
+        self.wine = ProductType.objects.create(name='Вино', slug='wine')
+        self.kyiv = Store.objects.create(name='Сільпо Київ', city='Київ', address='вул. Тестова 1')
+        self.lviv = Store.objects.create(name='Сільпо Львів', city='Львів', address='пл. Ринок 1')
+
+        self.products = []
+        prices = ['40.00', '55.00', '55.00', '70.00', '120.00', '300.00', '90.00', '35.00']
+        for index, price in enumerate(prices):
+            self.products.append(Product.objects.create(
+                name=f'Продукт {index}', sku=f'SKU{index:03d}',
+                product_type=self.beer if index < 4 else self.wine,
+                store=self.kyiv if index % 2 == 0 else self.lviv,
+                regular_price=Decimal(price),
+            ))
+
+        self.repo = AnalyticsRepository()
+
+    def assertIndexMatchesCatalog(self):
+        for product_type in (None, 'Пиво', 'Вино'):
+            for city in (None, 'Київ', 'Львів'):
+                result = self.repo.get_top_expensive_products(limit=3, product_type=product_type, city=city)
+                self.assertEqual(
+                    [row['sku'] for row in result],
+                    _expected_skus(3, product_type, city),
+                    (product_type, city)
+                )
+
+    def test_index_follows_writes(self):
+        self.assertIndexMatchesCatalog()
+
+        repository_registry.products.update(self.products[0].pk, regular_price=Decimal('500.00'))
+        self.assertIndexMatchesCatalog()
+
+        repository_registry.products.update(self.products[5].pk, regular_price=Decimal('10.00'))
+        self.assertIndexMatchesCatalog()
+
+        self.products[4].is_active = False
+        self.products[4].save()
+        self.assertIndexMatchesCatalog()
+
+        self.products[6].delete()
+        self.assertIndexMatchesCatalog()
+
+        repository_registry.products.update(self.products[1].pk, product_type=self.wine, store=self.kyiv)
+        self.assertIndexMatchesCatalog()
+
+    def test_store_move_refreshes_city_scopes(self):
+        self.lviv.city = 'Київ'
+        self.lviv.save()
+
+        self.assertIndexMatchesCatalog()
+        self.assertFalse(TopProductEntry.objects.filter(scope__contains='city:Львів').exists())
+
+    def test_rebuild_matches_incremental(self):
+        repository_registry.products.update(self.products[3].pk, regular_price=Decimal('15.00'))
+        incremental = _index_rows()
+
+        rebuild_top_products()
+
+        self.assertEqual(_index_rows(), incremental)
+
+    def test_index_read_is_single_query(self):
+        with self.assertNumQueries(1):
+            result = list(self.repo.get_top_expensive_products(limit=2, city='Львів'))
+
+        self.assertEqual([row['sku'] for row in result], ['SKU005', 'SKU003'])
+
+    def test_index_rows_match_live_query(self):
+        live = list(self.repo.get_top_expensive_products(limit=50))
+
+        self.assertEqual(list(self.repo.get_top_expensive_products(limit=3)), live[:3])
+
+    def test_api_filters(self):
+        response = APIClient().get(
+            reverse('analytics-top-expensive'), {'limit': 2, 'product_type': 'Вино', 'city': 'Київ'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['sku'] for row in response.data['data']], ['SKU004', 'SKU006'])
+
+    def test_api_statistics_reuse_page_rows(self):
+        cache.clear()
+
+        # Версія даних (ETag і ключ кешу) та одне читання індексу — без другого агрегату
+        with self.assertNumQueries(3):
+            response = APIClient().get(reverse('analytics-top-expensive'), {'limit': 2, 'city': 'Львів'})
+
+        self.assertEqual(response.status_code, 200)
+        statistics = response.data['statistics']
+        prices = [float(row['regular_price']) for row in response.data['data']]
+        self.assertEqual(statistics['avg_regular_price'], sum(prices) / len(prices))
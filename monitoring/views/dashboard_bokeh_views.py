@@ -1,6 +1,6 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories import repository_registry
 from monitoring.charts.bokeh_charts import BokehChartsGenerator
 from bokeh.resources import CDN
 from decimal import Decimal
@@ -26,26 +26,28 @@ def _convert_decimals_in_list(data):
 @login_required
 def dashboard_v2_view(request):
     try:
-        analytics_repo = AnalyticsRepository()
+        analytics_repo = repository_registry.analytics
         charts_generator = BokehChartsGenerator()
         
-        # Конвертуємо QuerySet в list та Decimal в float
-        avg_prices_data = _convert_decimals_in_list(list(analytics_repo.get_avg_prices_by_product_type()))
+        # Усі шість звітів за одне сканування продуктів, Decimal конвертуємо в float
+        snapshot = analytics_repo.get_analytics_snapshot()
+        
+        avg_prices_data = _convert_decimals_in_list(snapshot['avg_prices_by_product_type'])
         avg_prices_script, avg_prices_div = charts_generator.create_avg_prices_chart_bokeh(avg_prices_data)
         
-        store_stats_data = _convert_decimals_in_list(list(analytics_repo.get_store_statistics_by_city()))
+        store_stats_data = _convert_decimals_in_list(snapshot['store_statistics_by_city'])
         store_stats_script, store_stats_div = charts_generator.create_store_statistics_chart(store_stats_data)
         
-        top_products_data = _convert_decimals_in_list(list(analytics_repo.get_top_expensive_products()))
+        top_products_data = _convert_decimals_in_list(snapshot['top_expensive_products'])
         top_products_script, top_products_div = charts_generator.create_top_expensive_products_chart(top_products_data)
         
-        price_ranges_data = _convert_decimals_in_list(list(analytics_repo.get_products_by_price_ranges()))
+        price_ranges_data = _convert_decimals_in_list(snapshot['products_by_price_ranges'])
         price_ranges_script, price_ranges_div = charts_generator.create_price_ranges_chart(price_ranges_data)
         
-        promo_data = _convert_decimals_in_list(list(analytics_repo.get_promo_analysis_by_store()))
+        promo_data = _convert_decimals_in_list(snapshot['promo_analysis_by_store'])
         promo_script, promo_div = charts_generator.create_promo_analysis_chart(promo_data)
         
-        dynamics_data = _convert_decimals_in_list(list(analytics_repo.get_product_creation_dynamics()))
+        dynamics_data = _convert_decimals_in_list(snapshot['product_creation_dynamics'])
         dynamics_script, dynamics_div = charts_generator.create_product_creation_dynamics_chart(dynamics_data)
     except Exception as e:
         logger.error(f"Error generating dashboard: {e}")
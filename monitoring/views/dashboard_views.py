@@ -1,14 +1,14 @@
 from django.shortcuts import render
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from monitoring.repositories.analytics import AnalyticsRepository
+from monitoring.repositories import repository_registry
 from monitoring.charts.plotly_charts import PlotlyChartsGenerator
 from monitoring.models import Store, ProductType, Product
 from datetime import datetime
 from decimal import Decimal
 
 
-analytics_repo = AnalyticsRepository()
+analytics_repo = repository_registry.analytics
 
 
 def _convert_decimals_in_list(data):
@@ -33,13 +33,14 @@ def dashboard_v1_view(request):
     paginator = Paginator(products_list, 20)  # 20 продуктів на сторінку
     page_obj = paginator.get_page(page_number)
     
-    # Отримуємо дані з репозиторію та конвертуємо в list
-    data1 = _convert_decimals_in_list(list(analytics_repo.get_avg_prices_by_product_type()))
-    data2 = _convert_decimals_in_list(list(analytics_repo.get_store_statistics_by_city()))
-    data3 = _convert_decimals_in_list(list(analytics_repo.get_top_expensive_products(limit=10)))
-    data4 = _convert_decimals_in_list(list(analytics_repo.get_products_by_price_ranges()))
-    data5 = _convert_decimals_in_list(list(analytics_repo.get_promo_analysis_by_store()))
-    data6 = _convert_decimals_in_list(list(analytics_repo.get_product_creation_dynamics()))
+    # Усі шість звітів за одне сканування продуктів
+    snapshot = analytics_repo.get_analytics_snapshot(top_limit=10)
+    data1 = _convert_decimals_in_list(snapshot['avg_prices_by_product_type'])
+    data2 = _convert_decimals_in_list(snapshot['store_statistics_by_city'])
+    data3 = _convert_decimals_in_list(snapshot['top_expensive_products'])
+    data4 = _convert_decimals_in_list(snapshot['products_by_price_ranges'])
+    data5 = _convert_decimals_in_list(snapshot['promo_analysis_by_store'])
+    data6 = _convert_decimals_in_list(snapshot['product_creation_dynamics'])
     
     chart_generator = PlotlyChartsGenerator()
     
@@ -7,11 +7,12 @@ import pandas as pd
 
 @login_required
 def performance_dashboard_view(request):
-    experiments = DatabaseOptimizationExperiments()
-    charts_generator = PerformanceChartsGenerator()
-    
     num_queries = int(request.GET.get('num_queries', 50))
     max_workers = int(request.GET.get('max_workers', 20))
+    use_snapshot = request.GET.get('snapshot') == '1'
+    
+    experiments = DatabaseOptimizationExperiments(use_snapshot=use_snapshot)
+    charts_generator = PerformanceChartsGenerator()
     
     df = experiments.run_full_experiment(num_queries=num_queries, max_workers=max_workers)
     
@@ -37,6 +38,7 @@ def performance_dashboard_view(request):
         'optimal_params': optimal_params,
         'num_queries': num_queries,
         'max_workers': max_workers,
+        'use_snapshot': use_snapshot,
     }
     
     return render(request, 'monitoring/performance_dashboard.html', context)
@@ -127,3 +127,64 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
 }
+
+# Читати агрегати аналітики з таблиць-зведень (див. rebuild_analytics_summaries)
+ANALYTICS_USE_SUMMARY_TABLES = os.getenv("ANALYTICS_USE_SUMMARY_TABLES", "0") == "1"
+
+# Кеш результатів аналітики. Версія даних, під якою лежать результати, зберігається в базі
+# (monitoring.DataVersion), тож LocMemCache безпечний і для кількох процесів; спільний
+# бекенд (Redis/Memcached) лише дає спільні попадання.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "silpo-monitor",
+    }
+}
+ANALYTICS_CACHE_ENABLED = os.getenv("ANALYTICS_CACHE_ENABLED", "1") == "1"
+ANALYTICS_CACHE_ALIAS = "default"
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", "3600"))
+
+# Наближений режим аналітики (?approximate=true): як часто можна перебудовувати скетчі
+ANALYTICS_SKETCH_REFRESH_SECONDS = int(os.getenv("ANALYTICS_SKETCH_REFRESH_SECONDS", "60"))
+
+# engine=numpy: як часто можна перечитувати колонковий знімок після змін (до того віддається попередній)
+ANALYTICS_COLUMNAR_REFRESH_SECONDS = int(os.getenv("ANALYTICS_COLUMNAR_REFRESH_SECONDS", "5"))
+
+# Скільки найдорожчих продуктів тримати в індексі для кожного типу/міста
+TOP_PRODUCTS_K = int(os.getenv("TOP_PRODUCTS_K", "100"))
+
+# Розмір сторінки звітів /api/analytics/* (?page_size=) і верхня межа для нього
+ANALYTICS_PAGE_SIZE = int(os.getenv("ANALYTICS_PAGE_SIZE", "100"))
+ANALYTICS_MAX_PAGE_SIZE = int(os.getenv("ANALYTICS_MAX_PAGE_SIZE", "1000"))
+
+# Скільки рядків фіду цін валідувати й записувати за одну транзакцію (ingest_price_feed)
+PRICE_FEED_CHUNK_SIZE = int(os.getenv("PRICE_FEED_CHUNK_SIZE", "5000"))
+
+# Скільки днів зберігати сирі спостереження цін і годинні бари (compact_price_history);
+# денні бари зберігаються без обмеження
+PRICE_HISTORY_RAW_RETENTION_DAYS = int(os.getenv("PRICE_HISTORY_RAW_RETENTION_DAYS", "30"))
+PRICE_BARS_HOURLY_RETENTION_DAYS = int(os.getenv("PRICE_BARS_HOURLY_RETENTION_DAYS", "365"))
+
+# Як часто знімати промо після promo_ends_at у фоновому потоці веб-процесу, секунд;
+# 0 — вимкнено (тоді expire_promos з cron)
+PROMO_EXPIRY_INTERVAL_SECONDS = int(os.getenv("PROMO_EXPIRY_INTERVAL_SECONDS", "0"))
+
+# Рядків в одній row group / record batch колонкового експорту (export_catalog, /api/export/)
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "100000"))
+# NDJSON/CSV стрімляться дрібнішими чанками, щоб перші рядки приходили одразу
+EXPORT_TEXT_CHUNK_SIZE = int(os.getenv("EXPORT_TEXT_CHUNK_SIZE", "2000"))
+
+# Курсорна пагінація списків /api/products/, /api/stores/, /api/product-types/ (?page_size=)
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
+# Списки CRUD без ModelSerializer: рядки values() + скомпільовані конвертери та швидкий JSON-рендерер
+API_FAST_LIST_SERIALIZATION = os.getenv("API_FAST_LIST_SERIALIZATION", "1") == "1"
+
+# Пакетні ендпоінти /api/products/bulk/: найбільше елементів в одному запиті
+API_BULK_MAX_ITEMS = int(os.getenv("API_BULK_MAX_ITEMS", "1000"))
+
+# Умовні GET (ETag / Last-Modified з версії даних) для каталогу й аналітики
+API_CONDITIONAL_GET = os.getenv("API_CONDITIONAL_GET", "1") == "1"
+# max-age у Cache-Control: скільки секунд реверс-проксі може віддавати відповідь без ревалідації
+API_CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", "0"))
@@ -12,8 +12,12 @@ from monitoring.api.analytics_views import (
     top_expensive_products_view,
     products_by_price_ranges_view,
     promo_analysis_by_store_view,
-    product_creation_dynamics_view
+    product_creation_dynamics_view,
+    price_changes_view,
+    prices_as_of_view,
+    analytics_cache_stats_view
 )
+from monitoring.api.export_views import export_dataset_view
 from monitoring.views.dashboard_views import dashboard_v1_view
 from monitoring.views.dashboard_bokeh_views import dashboard_v2_view
 from monitoring.views.performance_views import performance_dashboard_view
@@ -35,6 +39,10 @@ urlpatterns = [
     path("api/analytics/products-by-price-ranges/", products_by_price_ranges_view, name="analytics-price-ranges"),
     path("api/analytics/promo-analysis/", promo_analysis_by_store_view, name="analytics-promo"),
     path("api/analytics/product-creation-dynamics/", product_creation_dynamics_view, name="analytics-dynamics"),
+    path("api/analytics/price-changes/", price_changes_view, name="analytics-price-changes"),
+    path("api/analytics/prices-as-of/", prices_as_of_view, name="analytics-prices-as-of"),
+    path("api/export/<str:dataset>/", export_dataset_view, name="export-dataset"),
+    path("api/analytics/cache-stats/", analytics_cache_stats_view, name="analytics-cache-stats"),
     path("dashboard/v1/", dashboard_v1_view, name="dashboard_v1"),
     path("dashboard/v2/", dashboard_v2_view, name="dashboard_v2"),
     path("dashboard/performance/", performance_dashboard_view, name="performance_dashboard"),
@@ -10,3 +10,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "silpo_monitor.settings")
 
 application = get_wsgi_application()
 
+# Фоновий потік лише у веб-процесі: не в migrate/shell/тестах і не в батьківському процесі автоперезавантаження
+from monitoring.scheduler import start_promo_expiry_runner  # noqa: E402
+
+start_promo_expiry_runner()
@@ -32,15 +32,24 @@ class NetworkHelper:
             pass
     
     def get_list(self) -> List[Dict[str, Any]]:
+        # Списки API курсорно пагіновані: проходимо сторінки за посиланням next
         try:
-            response = self.session.get(
-                f"{self.base_url}/", 
-                auth=self.auth, 
-                headers=self.headers, 
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            results = []
+            url = f"{self.base_url}/"
+            while url:
+                response = self.session.get(
+                    url, 
+                    auth=self.auth, 
+                    headers=self.headers, 
+                    timeout=10
+                )
+                response.raise_for_status()
+                payload = response.json()
+                if isinstance(payload, list):
+                    return payload
+                results.extend(payload.get('results', []))
+                url = payload.get('next')
+            return results
         except requests.exceptions.ConnectionError:
             print(f"Помилка підключення до {self.base_url}")
             return []